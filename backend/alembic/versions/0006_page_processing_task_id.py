@@ -0,0 +1,24 @@
+"""add page processing task id
+
+Revision ID: 0006_page_processing_task_id
+Revises: 0005_doc_locale_type
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_page_processing_task_id"
+down_revision = "0005_doc_locale_type"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("document_pages", sa.Column("processing_task_id", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("document_pages", "processing_task_id")
@@ -0,0 +1,24 @@
+"""add document language
+
+Revision ID: 0007_document_language
+Revises: 0006_page_processing_task_id
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_document_language"
+down_revision = "0006_page_processing_task_id"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("language", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("documents", "language")
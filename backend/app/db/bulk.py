@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import os
+
+from sqlalchemy import Table
+from sqlalchemy.orm import Session
+
+
+def _copy_rows(session: Session, table: Table, rows: list[dict]) -> None:
+    columns = list(rows[0].keys())
+    column_sql = ", ".join(f'"{column}"' for column in columns)
+    driver_connection = session.connection().connection.driver_connection
+    with driver_connection.cursor() as cursor:
+        with cursor.copy(f'COPY "{table.name}" ({column_sql}) FROM STDIN') as copy:
+            for row in rows:
+                copy.write_row([row[column] for column in columns])
+
+
+def bulk_insert(session: Session, table: Table, rows: list[dict]) -> None:
+    if not rows:
+        return
+    dialect = session.get_bind().dialect
+    if dialect.name == "postgresql" and dialect.driver == "psycopg" and os.getenv("DB_BULK_COPY", "1") == "1":
+        _copy_rows(session, table, rows)
+        return
+    session.execute(table.insert(), rows)
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import os
-from contextlib import contextmanager
+import threading
+from contextlib import asynccontextmanager, contextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import NullPool
 
 DEFAULT_SQLITE_PATH = os.getenv("SQLITE_PATH", "./data/vera.db")
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -20,6 +23,47 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def _async_database_url(url: str) -> str:
+    scheme, _, rest = url.partition("://")
+    driver_map = {
+        "sqlite": "sqlite+aiosqlite",
+        "postgresql": "postgresql+psycopg",
+        "postgres": "postgresql+psycopg",
+        "postgresql+psycopg2": "postgresql+psycopg",
+    }
+    return f"{driver_map.get(scheme, scheme)}://{rest}"
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(DATABASE_URL)
+if ASYNC_DATABASE_URL.startswith("sqlite"):
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+else:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    )
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def ensure_schema() -> None:
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        if os.getenv("DB_AUTO_CREATE", "1") == "1":
+            import app.models.documents  # noqa: F401
+
+            Base.metadata.create_all(bind=engine)
+        _schema_ready = True
+
+
 @contextmanager
 def get_session():
     session = SessionLocal()
@@ -27,3 +71,12 @@ def get_session():
         yield session
     finally:
         session.close()
+
+
+@asynccontextmanager
+async def get_async_session():
+    session: AsyncSession = AsyncSessionLocal()
+    try:
+        yield session
+    finally:
+        await session.close()
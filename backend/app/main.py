@@ -2,14 +2,14 @@ import json
 import os
 import uuid
 
-import asyncio
 import logging
 import time
 
 import httpx
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, File, HTTPException, UploadFile, Request
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse, Response
@@ -22,12 +22,15 @@ from slowapi import _rate_limit_exceeded_handler
 from sqlalchemy import case, func, select, update
 from sqlalchemy import text as sql_text
 
-from app.services.storage import save_upload
+from app.services.events import get_status_broker, publish_status_change
+from app.services.language import normalize_language
+from app.services.ocr import reocr_region, warm_engine_pool
+from app.services.storage import store_upload
 from app.services.validation import apply_corrections, apply_page_corrections
 from app.services.summary import build_summary, build_page_summary
 from app.services.ollama import list_models, pull_model, stream_pull_model
-from app.schemas.documents import StructuredFieldsUpdateRequest, ValidateRequest
-from app.db.session import Base, engine, get_session
+from app.schemas.documents import ReocrRequest, StructuredFieldsUpdateRequest, ValidateRequest
+from app.db.session import ensure_schema, get_async_session
 from app.models.documents import AuditLog, Document, DocumentPage
 from app.schemas.documents import DocumentStatus
 from app.models.documents import Token
@@ -63,7 +66,12 @@ logger = logging.getLogger("vera")
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Startup: initializing database")
-    Base.metadata.create_all(bind=engine)
+    await run_in_threadpool(ensure_schema)
+    if os.getenv("REOCR_PRELOAD", "0") == "1":
+        try:
+            await run_in_threadpool(warm_engine_pool)
+        except RuntimeError:
+            logger.exception("Startup: OCR engine preload for re-OCR failed")
     yield
 
 
@@ -111,11 +119,14 @@ async def log_requests(request: Request, call_next):
 
 @app.post("/documents/upload")
 @limiter.limit(upload_rate_limit)
-async def upload_document(request: Request, file: UploadFile = File(...)):
+async def upload_document(
+    request: Request, file: UploadFile = File(...), language: str | None = Form(None)
+):
     logger.info("Upload started filename=%s", file.filename)
     try:
-        document_id, image_path, image_url, pages = save_upload(file)
-        with get_session() as session:
+        language = normalize_language(language)
+        document_id, image_path, image_url = await run_in_threadpool(store_upload, file)
+        async with get_async_session() as session:
             session.add(
                 Document(
                     id=document_id,
@@ -124,37 +135,22 @@ async def upload_document(request: Request, file: UploadFile = File(...)):
                     image_height=0,
                     status=DocumentStatus.uploaded.value,
                     structured_fields=json.dumps({}),
-                    page_count=len(pages),
+                    page_count=0,
+                    language=language,
                 )
             )
-            for page in pages:
-                session.add(
-                    DocumentPage(
-                        id=uuid.uuid4().hex,
-                        document_id=document_id,
-                        page_index=page["page_index"],
-                        image_path=page["image_path"],
-                        image_width=0,
-                        image_height=0,
-                        status=DocumentStatus.uploaded.value,
-                    )
-                )
-            session.commit()
-        task_result = celery_app.send_task("vera.process_document", args=[document_id])
-        with get_session() as session:
-            session.execute(
+            await session.commit()
+        task_result = await run_in_threadpool(celery_app.send_task, "vera.process_document", args=[document_id])
+        async with get_async_session() as session:
+            await session.execute(
                 update(Document)
                 .where(Document.id == document_id)
                 .values(processing_task_id=task_result.id)
             )
-            session.commit()
+            await session.commit()
     except RuntimeError as error:
         if str(error) == "celery_not_installed":
             raise HTTPException(status_code=503, detail="Background worker is not available")
-        if str(error) == "pdf_support_not_installed":
-            raise HTTPException(status_code=503, detail="PDF support is not installed")
-        if str(error) == "pdf_no_pages":
-            raise HTTPException(status_code=400, detail="PDF has no pages")
         if str(error) == "mime_support_not_installed":
             raise HTTPException(status_code=503, detail="MIME validation is not installed")
         raise
@@ -165,40 +161,22 @@ async def upload_document(request: Request, file: UploadFile = File(...)):
             raise HTTPException(status_code=415, detail="Unsupported MIME type")
         if str(error) == "file_too_large":
             raise HTTPException(status_code=413, detail="File exceeds upload size limit")
-        if str(error) == "virus_detected":
-            raise HTTPException(status_code=400, detail="File failed security scan")
+        if str(error) == "unsupported_language":
+            raise HTTPException(status_code=422, detail="Unsupported document language")
         raise
     except Exception:
         logger.exception("Upload failed")
         raise
     logger.info("Upload queued document_id=%s", document_id)
-    with get_session() as session:
-        page_rows = session.execute(
-            select(DocumentPage)
-            .where(DocumentPage.document_id == document_id)
-            .order_by(DocumentPage.page_index.asc())
-        ).scalars().all()
-
-    page_payload = [
-        {
-            "page_id": page.id,
-            "page_index": int(getattr(page, "page_index")),
-            "image_url": f"/files/{os.path.basename(str(getattr(page, 'image_path')))}",
-            "status": page.status,
-            "review_complete": bool(getattr(page, "review_complete_at")),
-            "version": int(getattr(page, "version", 1)),
-        }
-        for page in page_rows
-    ]
-
     payload = {
         "document_id": document_id,
         "image_url": image_url,
         "image_width": 0,
         "image_height": 0,
         "status": DocumentStatus.uploaded.value,
-        "page_count": len(page_payload),
-        "pages": page_payload,
+        "page_count": 0,
+        "language": language,
+        "pages": [],
         "structured_fields": {},
         "review_complete": False,
     }
@@ -209,7 +187,8 @@ async def upload_document(request: Request, file: UploadFile = File(...)):
 async def validate_document(document_id: str, payload: ValidateRequest):
     logger.info("Validate started document_id=%s review_complete=%s", document_id, payload.review_complete)
     try:
-        validated_text, status, validated_at = apply_corrections(
+        validated_text, status, validated_at = await run_in_threadpool(
+            apply_corrections,
             document_id,
             [item.model_dump() for item in payload.corrections],
             payload.reviewed_token_ids,
@@ -244,7 +223,8 @@ async def validate_document_page(document_id: str, page_id: str, payload: Valida
         payload.review_complete,
     )
     try:
-        validated_text, status, validated_at = apply_page_corrections(
+        validated_text, status, validated_at = await run_in_threadpool(
+            apply_page_corrections,
             document_id,
             page_id,
             [item.model_dump() for item in payload.corrections],
@@ -276,21 +256,14 @@ async def validate_document_page(document_id: str, page_id: str, payload: Valida
     )
 
 
-def _build_page_status(session, page: DocumentPage) -> dict:
-    token_count = session.execute(
-        select(func.count(Token.id)).where(Token.page_id == page.id)
-    ).scalar_one()
-    forced_review_count = session.execute(
-        select(func.count(Token.id))
-        .where(Token.page_id == page.id)
-        .where(Token.forced_review.is_(True))
-    ).scalar_one()
+def _build_page_status(page: DocumentPage, token_count: int | None, forced_review_count: int | None) -> dict:
     updated_at = getattr(page, "updated_at", None)
     updated_at_value = updated_at.isoformat() if updated_at else None
 
     return {
         "page_id": page.id,
         "page_index": int(getattr(page, "page_index")),
+        "image_url": f"/files/{os.path.basename(str(getattr(page, 'image_path')))}",
         "status": page.status,
         "review_complete": bool(getattr(page, "review_complete_at")),
         "token_count": int(token_count or 0),
@@ -300,21 +273,41 @@ def _build_page_status(session, page: DocumentPage) -> dict:
     }
 
 
+async def _load_page_statuses(session, document_id: str, page_id: str | None = None) -> list[dict]:
+    token_counts = select(
+        Token.page_id.label("page_id"),
+        func.count(Token.id).label("token_count"),
+        func.sum(case((Token.forced_review.is_(True), 1), else_=0)).label("forced_review_count"),
+    ).where(Token.document_id == document_id)
+    page_query = select(DocumentPage).where(DocumentPage.document_id == document_id)
+    if page_id is not None:
+        token_counts = token_counts.where(Token.page_id == page_id)
+        page_query = page_query.where(DocumentPage.id == page_id)
+    token_counts = token_counts.group_by(Token.page_id).subquery()
+
+    rows = (await session.execute(
+        page_query.add_columns(token_counts.c.token_count, token_counts.c.forced_review_count)
+        .outerjoin(token_counts, token_counts.c.page_id == DocumentPage.id)
+        .order_by(DocumentPage.page_index.asc())
+    )).all()
+    return [_build_page_status(page, token_count, forced_count) for page, token_count, forced_count in rows]
+
+
 @app.get("/documents/{document_id}")
 async def get_document(document_id: str):
     logger.debug("Get document document_id=%s", document_id)
-    with get_session() as session:
-        document = session.get(Document, document_id)
+    async with get_async_session() as session:
+        document = await session.get(Document, document_id)
         if document is None:
             raise HTTPException(status_code=404, detail="Document not found")
         structured_fields_raw = getattr(document, "structured_fields")
         structured_fields = json.loads(str(structured_fields_raw)) if structured_fields_raw else {}
 
-        pages = session.execute(
+        pages = (await session.execute(
             select(DocumentPage)
             .where(DocumentPage.document_id == document_id)
             .order_by(DocumentPage.page_index.asc())
-        ).scalars().all()
+        )).scalars().all()
         page_payload = [
             {
                 "page_id": page.id,
@@ -347,18 +340,12 @@ async def get_document(document_id: str):
 @app.get("/documents/{document_id}/pages/status")
 async def get_document_page_statuses(document_id: str):
     logger.debug("Get document statuses document_id=%s", document_id)
-    with get_session() as session:
-        document = session.get(Document, document_id)
+    async with get_async_session() as session:
+        document = await session.get(Document, document_id)
         if document is None:
             raise HTTPException(status_code=404, detail="Document not found")
 
-        pages = session.execute(
-            select(DocumentPage)
-            .where(DocumentPage.document_id == document_id)
-            .order_by(DocumentPage.page_index.asc())
-        ).scalars().all()
-
-        page_payload = [_build_page_status(session, page) for page in pages]
+        page_payload = await _load_page_statuses(session, document_id)
 
         return JSONResponse(
             {
@@ -373,64 +360,142 @@ async def get_document_page_statuses(document_id: str):
 @app.get("/documents/{document_id}/pages/{page_id}/status")
 async def get_document_page_status(document_id: str, page_id: str):
     logger.debug("Get document page status document_id=%s page_id=%s", document_id, page_id)
-    with get_session() as session:
-        document = session.get(Document, document_id)
-        page = session.get(DocumentPage, page_id)
-        if document is None or page is None or page.document_id != document_id:
+    async with get_async_session() as session:
+        document = await session.get(Document, document_id)
+        page_statuses = await _load_page_statuses(session, document_id, page_id) if document is not None else []
+        if not page_statuses:
             raise HTTPException(status_code=404, detail="Document not found")
 
-        payload = _build_page_status(session, page)
+        payload = page_statuses[0]
         payload["document_id"] = document.id
         payload["document_status"] = document.status
         payload["document_review_complete"] = bool(getattr(document, "review_complete_at"))
         return JSONResponse(payload)
 
 
+async def _load_status_snapshot(document_id: str, page_id: str | None = None) -> dict | None:
+    async with get_async_session() as session:
+        document = await session.get(Document, document_id)
+        if document is None:
+            return None
+        return {
+            "document_id": document.id,
+            "status": document.status,
+            "review_complete": bool(getattr(document, "review_complete_at")),
+            "pages": await _load_page_statuses(session, document_id, page_id),
+        }
+
+
+async def _status_event_stream(document_id: str, heartbeat: float, resync: float):
+    subscription = await get_status_broker().subscribe(document_id)
+    try:
+        snapshot = await _load_status_snapshot(document_id)
+        if snapshot is None:
+            yield f"data: {json.dumps({'error': 'document_not_found'})}\n\n"
+            return
+        yield f"data: {json.dumps(snapshot)}\n\n"
+        sent_pages = {page["page_id"]: page for page in snapshot["pages"]}
+        sent_document = (snapshot["status"], snapshot["review_complete"])
+        last_sync = time.monotonic()
+
+        while True:
+            event = await subscription.get(timeout=heartbeat)
+            if event is None and time.monotonic() - last_sync < resync:
+                yield ": heartbeat\n\n"
+                continue
+
+            page_id = event.get("page_id") if event else None
+            snapshot = await _load_status_snapshot(document_id, page_id)
+            last_sync = time.monotonic()
+            if snapshot is None:
+                yield f"data: {json.dumps({'error': 'document_not_found'})}\n\n"
+                return
+
+            changed_pages = [page for page in snapshot["pages"] if sent_pages.get(page["page_id"]) != page]
+            document_state = (snapshot["status"], snapshot["review_complete"])
+            if not changed_pages and document_state == sent_document:
+                if event is None:
+                    yield ": heartbeat\n\n"
+                continue
+
+            sent_pages.update((page["page_id"], page) for page in changed_pages)
+            sent_document = document_state
+            yield f"data: {json.dumps({**snapshot, 'pages': changed_pages})}\n\n"
+    finally:
+        await subscription.close()
+
+
 @app.get("/documents/{document_id}/status/stream")
-async def stream_document_status(document_id: str, interval: float = 2.0):
+async def stream_document_status(document_id: str, heartbeat: float = 15.0):
     logger.info("Status stream requested document_id=%s", document_id)
+    resync = float(os.getenv("STATUS_STREAM_RESYNC_SECONDS", "30"))
+    return StreamingResponse(
+        _status_event_stream(document_id, max(1.0, heartbeat), resync),
+        media_type="text/event-stream",
+    )
 
-    async def event_stream():
-        while True:
-            with get_session() as session:
-                document = session.get(Document, document_id)
-                if document is None:
-                    yield f"data: {json.dumps({'error': 'document_not_found'})}\n\n"
-                    break
-
-                pages = session.execute(
-                    select(DocumentPage)
-                    .where(DocumentPage.document_id == document_id)
-                    .order_by(DocumentPage.page_index.asc())
-                ).scalars().all()
-
-                payload = {
-                    "document_id": document.id,
-                    "status": document.status,
-                    "review_complete": bool(getattr(document, "review_complete_at")),
-                    "pages": [_build_page_status(session, page) for page in pages],
-                }
-            yield f"data: {json.dumps(payload)}\n\n"
-            await asyncio.sleep(max(0.5, interval))
 
-    return StreamingResponse(event_stream(), media_type="text/event-stream")
+@app.post("/documents/{document_id}/pages/{page_id}/reocr")
+async def reocr_document_page(document_id: str, page_id: str, payload: ReocrRequest):
+    logger.info(
+        "Re-OCR started document_id=%s page_id=%s tokens=%s bbox=%s",
+        document_id,
+        page_id,
+        len(payload.token_ids),
+        payload.bbox,
+    )
+    try:
+        result = await run_in_threadpool(
+            reocr_region,
+            document_id,
+            page_id,
+            payload.bbox,
+            payload.token_ids,
+            payload.scale,
+            payload.page_version,
+        )
+    except ValueError as error:
+        if str(error) == "document_not_found":
+            raise HTTPException(status_code=404, detail="Document not found")
+        if str(error) == "token_not_found":
+            raise HTTPException(status_code=404, detail="Token not found")
+        if str(error) == "region_required":
+            raise HTTPException(status_code=400, detail="Provide either a bbox or token_ids")
+        if str(error) == "invalid_scale":
+            raise HTTPException(status_code=400, detail="Scale is out of range")
+        if str(error) == "region_empty":
+            raise HTTPException(status_code=422, detail="No tokens in the selected region")
+        if str(error) == "region_multiline":
+            raise HTTPException(status_code=422, detail="Select tokens on a single line")
+        if str(error) == "version_conflict":
+            raise HTTPException(status_code=409, detail="Review out of date")
+        if str(error) == "region_has_corrections":
+            raise HTTPException(status_code=409, detail="Region contains corrected tokens")
+        raise
+    except RuntimeError as error:
+        if str(error) in ("paddleocr_not_installed", "onnxruntime_ocr_not_installed", "ocr_init_failed"):
+            raise HTTPException(status_code=503, detail="OCR engine is not available")
+        if str(error) == "ocr_failed":
+            raise HTTPException(status_code=502, detail="OCR engine failed to read the region")
+        raise
+    return JSONResponse(jsonable_encoder(result))
 
 
 @app.get("/documents/{document_id}/pages/{page_id}")
 async def get_document_page(document_id: str, page_id: str):
     logger.debug("Get document page document_id=%s page_id=%s", document_id, page_id)
-    with get_session() as session:
-        document = session.get(Document, document_id)
-        page = session.get(DocumentPage, page_id)
+    async with get_async_session() as session:
+        document = await session.get(Document, document_id)
+        page = await session.get(DocumentPage, page_id)
         if document is None or page is None or page.document_id != document_id:
             raise HTTPException(status_code=404, detail="Document not found")
 
-        tokens = session.execute(
+        tokens = (await session.execute(
             select(Token)
             .where(Token.document_id == document_id)
             .where(Token.page_id == page_id)
             .order_by(Token.line_index.asc(), Token.token_index.asc())
-        ).scalars().all()
+        )).scalars().all()
 
         token_payload = []
         for token in tokens:
@@ -475,8 +540,8 @@ async def cancel_document(document_id: str):
     if not hasattr(celery_app, "control"):
         raise HTTPException(status_code=503, detail="Background worker is not available")
 
-    with get_session() as session:
-        document = session.get(Document, document_id)
+    async with get_async_session() as session:
+        document = await session.get(Document, document_id)
         if document is None:
             raise HTTPException(status_code=404, detail="Document not found")
 
@@ -487,31 +552,38 @@ async def cancel_document(document_id: str):
         if not task_id:
             raise HTTPException(status_code=409, detail="No active task to cancel")
 
+        page_task_ids = (await session.execute(
+            select(DocumentPage.processing_task_id)
+            .where(DocumentPage.document_id == document_id)
+            .where(DocumentPage.processing_task_id.is_not(None))
+        )).scalars().all()
+
         try:
-            celery_app.control.revoke(task_id, terminate=True)
+            await run_in_threadpool(celery_app.control.revoke, [task_id, *page_task_ids], terminate=True)
         except Exception:  # pragma: no cover
             logger.exception("Failed to revoke task document_id=%s task_id=%s", document_id, task_id)
             raise HTTPException(status_code=500, detail="Failed to cancel processing")
 
-        session.execute(
+        await session.execute(
             update(Document)
             .where(Document.id == document_id)
             .values(status=DocumentStatus.canceled.value, processing_task_id=None)
         )
-        session.execute(
+        await session.execute(
             update(DocumentPage)
             .where(DocumentPage.document_id == document_id)
-            .values(status=DocumentStatus.canceled.value)
+            .values(status=DocumentStatus.canceled.value, processing_task_id=None)
         )
         session.add(
             AuditLog(
                 id=os.urandom(16).hex(),
                 document_id=document_id,
                 event_type="ocr_canceled",
-                detail=json.dumps({"task_id": task_id}),
+                detail=json.dumps({"task_id": task_id, "page_task_count": len(page_task_ids)}),
             )
         )
-        session.commit()
+        await session.commit()
+    await run_in_threadpool(publish_status_change, document_id)
 
     return JSONResponse({"status": DocumentStatus.canceled.value})
 
@@ -520,7 +592,7 @@ async def cancel_document(document_id: str):
 async def get_summary(document_id: str, model: str | None = None):
     logger.info("Summary requested document_id=%s", document_id)
     try:
-        summary = build_summary(document_id, model_override=model)
+        summary = await run_in_threadpool(build_summary, document_id, model_override=model)
     except ValueError as error:
         if str(error) == "document_not_found":
             raise HTTPException(status_code=404, detail="Document not found")
@@ -535,7 +607,7 @@ async def get_summary(document_id: str, model: str | None = None):
 async def get_page_summary(document_id: str, page_id: str, model: str | None = None):
     logger.info("Summary requested document_id=%s page_id=%s", document_id, page_id)
     try:
-        summary = build_page_summary(document_id, page_id, model_override=model)
+        summary = await run_in_threadpool(build_page_summary, document_id, page_id, model_override=model)
     except ValueError as error:
         if str(error) == "document_not_found":
             raise HTTPException(status_code=404, detail="Document not found")
@@ -595,12 +667,12 @@ async def pull_llm_model_stream(payload: dict):
 @app.post("/documents/{document_id}/fields")
 async def update_structured_fields(document_id: str, payload: StructuredFieldsUpdateRequest):
     logger.info("Fields update document_id=%s count=%s", document_id, len(payload.structured_fields))
-    with get_session() as session:
-        document = session.get(Document, document_id)
+    async with get_async_session() as session:
+        document = await session.get(Document, document_id)
         if document is None:
             raise HTTPException(status_code=404, detail="Document not found")
 
-        session.execute(
+        await session.execute(
             update(Document)
             .where(Document.id == document_id)
             .values(structured_fields=json.dumps(payload.structured_fields))
@@ -613,7 +685,7 @@ async def update_structured_fields(document_id: str, payload: StructuredFieldsUp
                 detail=json.dumps({"field_count": len(payload.structured_fields)}),
             )
         )
-        session.commit()
+        await session.commit()
 
     return JSONResponse({"structured_fields": payload.structured_fields})
 
@@ -621,16 +693,16 @@ async def update_structured_fields(document_id: str, payload: StructuredFieldsUp
 @app.get("/documents/{document_id}/audit")
 async def get_audit_log(document_id: str):
     logger.debug("Audit log requested document_id=%s", document_id)
-    with get_session() as session:
-        document = session.get(Document, document_id)
+    async with get_async_session() as session:
+        document = await session.get(Document, document_id)
         if document is None:
             raise HTTPException(status_code=404, detail="Document not found")
 
-        entries = session.execute(
+        entries = (await session.execute(
             select(AuditLog)
             .where(AuditLog.document_id == document_id)
             .order_by(AuditLog.created_at.desc())
-        ).scalars().all()
+        )).scalars().all()
 
         payload = []
         for entry in entries:
@@ -652,8 +724,8 @@ async def get_audit_log(document_id: str):
 @app.get("/documents/{document_id}/export")
 async def export_document(document_id: str, format: str = "json"):
     logger.info("Export requested document_id=%s format=%s", document_id, format)
-    with get_session() as session:
-        document = session.get(Document, document_id)
+    async with get_async_session() as session:
+        document = await session.get(Document, document_id)
         if document is None:
             raise HTTPException(status_code=404, detail="Document not found")
         document_status = str(document.status)
@@ -663,7 +735,7 @@ async def export_document(document_id: str, format: str = "json"):
         validated_text = document.validated_text if document.validated_text is not None else ""
         structured_fields_raw = getattr(document, "structured_fields")
         structured_fields = json.loads(str(structured_fields_raw)) if structured_fields_raw else {}
-        session.execute(
+        await session.execute(
             update(Document)
             .where(Document.id == document_id)
             .values(status=DocumentStatus.exported.value)
@@ -676,13 +748,14 @@ async def export_document(document_id: str, format: str = "json"):
                 detail=json.dumps({"format": format.lower()}),
             )
         )
-        session.commit()
+        await session.commit()
 
         payload = {
             "document_id": document_id,
             "validated_text": validated_text,
             "structured_fields": structured_fields,
         }
+    await run_in_threadpool(publish_status_change, document_id)
 
     if format.lower() == "txt":
         return PlainTextResponse(validated_text, media_type="text/plain")
@@ -702,9 +775,9 @@ async def export_document(document_id: str, format: str = "json"):
 @app.get("/documents/{document_id}/pages/{page_id}/export")
 async def export_document_page(document_id: str, page_id: str, format: str = "json"):
     logger.info("Export requested document_id=%s page_id=%s format=%s", document_id, page_id, format)
-    with get_session() as session:
-        document = session.get(Document, document_id)
-        page = session.get(DocumentPage, page_id)
+    async with get_async_session() as session:
+        document = await session.get(Document, document_id)
+        page = await session.get(DocumentPage, page_id)
         if document is None or page is None or page.document_id != document_id:
             raise HTTPException(status_code=404, detail="Document not found")
         if page.status not in (DocumentStatus.validated.value, DocumentStatus.summarized.value):
@@ -714,7 +787,7 @@ async def export_document_page(document_id: str, page_id: str, format: str = "js
         structured_fields_raw = getattr(page, "structured_fields")
         structured_fields = json.loads(str(structured_fields_raw)) if structured_fields_raw else {}
 
-        session.execute(
+        await session.execute(
             update(DocumentPage)
             .where(DocumentPage.id == page_id)
             .values(status=DocumentStatus.exported.value)
@@ -728,7 +801,7 @@ async def export_document_page(document_id: str, page_id: str, format: str = "js
                 detail=json.dumps({"format": format.lower(), "scope": "page"}),
             )
         )
-        session.commit()
+        await session.commit()
 
         payload = {
             "document_id": document_id,
@@ -736,6 +809,7 @@ async def export_document_page(document_id: str, page_id: str, format: str = "js
             "validated_text": validated_text,
             "structured_fields": structured_fields,
         }
+    await run_in_threadpool(publish_status_change, document_id, page_id)
 
     if format.lower() == "txt":
         return PlainTextResponse(validated_text, media_type="text/plain")
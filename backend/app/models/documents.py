@@ -22,6 +22,7 @@ class Document(Base):
     version = Column(Integer, nullable=False, default=1)
     doc_type = Column(String, nullable=True)
     locale = Column(String, nullable=True)
+    language = Column(String, nullable=True)
     created_at = Column(DateTime, default=utcnow, nullable=False)
     updated_at = Column(DateTime, default=utcnow, onupdate=utcnow, nullable=False)
 
@@ -36,6 +37,7 @@ class DocumentPage(Base):
     image_width = Column(Integer, nullable=False)
     image_height = Column(Integer, nullable=False)
     status = Column(String, nullable=False)
+    processing_task_id = Column(String, nullable=True)
     validated_text = Column(Text, nullable=True)
     structured_fields = Column(Text, nullable=False, default="{}")
     review_complete_at = Column(DateTime, nullable=True)
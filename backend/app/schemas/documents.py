@@ -72,6 +72,13 @@ class ValidateRequest(BaseModel):
     page_version: int | None = None
 
 
+class ReocrRequest(BaseModel):
+    bbox: tuple[float, float, float, float] | None = None
+    token_ids: list[str] = Field(default_factory=list)
+    scale: float | None = None
+    page_version: int | None = None
+
+
 class ValidateResponse(BaseModel):
     validated_text: str
     validation_status: DocumentStatus
@@ -1,36 +1,115 @@
 from __future__ import annotations
 
 import re
+from dataclasses import dataclass
+from typing import Sequence
 
+import numpy as np
 
-CURRENCY_PATTERN = re.compile(r"^(£|\$|€)\s*\d{1,3}(?:,\d{3})*(?:\.\d{2})?$")
-DATE_PATTERN = re.compile(r"^(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}-\d{2}-\d{2})$")
-TOTAL_PATTERN = re.compile(r"\b(total|amount\s+due|balance\s+due|grand\s+total)\b", re.IGNORECASE)
-INVOICE_PATTERN = re.compile(r"\b(invoice|inv|receipt)\s*#?\s*\d+\b", re.IGNORECASE)
-MALFORMED_PRICE_PATTERN = re.compile(r"\d+\.\d$")
+from app.services.rules import load_rules
+
+DEFAULT_THRESHOLDS = {"trusted": 0.92, "medium": 0.80}
+DEFAULT_FLAG_PATTERNS: dict[str, dict] = {
+    "currency_amount": {"pattern": r"^(£|\$|€)\s*\d{1,3}(?:,\d{3})*(?:\.\d{2})?$"},
+    "date": {"pattern": r"^(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}-\d{2}-\d{2})$"},
+    "total_keyword": {
+        "pattern": r"\b(total|amount\s+due|balance\s+due|grand\s+total)\b",
+        "search": True,
+        "ignore_case": True,
+    },
+    "invoice_number": {
+        "pattern": r"\b(invoice|inv|receipt)\s*#?\s*\d+\b",
+        "search": True,
+        "ignore_case": True,
+    },
+    "malformed_price": {"pattern": r"\d+\.\d$", "search": True},
+}
+
+
+def _compile_flag_pattern(flag_patterns: dict[str, dict]) -> re.Pattern[str]:
+    lookaheads = []
+    for name, spec in flag_patterns.items():
+        pattern = spec["pattern"]
+        if spec.get("ignore_case"):
+            pattern = f"(?i:{pattern})"
+        if spec.get("search"):
+            pattern = f".*?{pattern}"
+        lookaheads.append(f"(?=(?P<{name}>{pattern}))?")
+    return re.compile("^" + "".join(lookaheads), re.DOTALL)
+
+
+@dataclass(frozen=True)
+class ConfidenceRules:
+    trusted_threshold: float
+    medium_threshold: float
+    flag_names: tuple[str, ...]
+    flag_pattern: re.Pattern[str]
+
+    @classmethod
+    def build(cls, thresholds: dict[str, float], flag_patterns: dict[str, dict]) -> ConfidenceRules:
+        return cls(
+            trusted_threshold=float(thresholds["trusted"]),
+            medium_threshold=float(thresholds["medium"]),
+            flag_names=tuple(flag_patterns),
+            flag_pattern=_compile_flag_pattern(flag_patterns),
+        )
+
+    def classify(self, score: float) -> str:
+        if score >= self.trusted_threshold:
+            return "trusted"
+        if score >= self.medium_threshold:
+            return "medium"
+        return "low"
+
+    def classify_batch(self, scores: np.ndarray) -> list[str]:
+        labels = np.where(
+            scores >= self.trusted_threshold,
+            "trusted",
+            np.where(scores >= self.medium_threshold, "medium", "low"),
+        )
+        return labels.tolist()
+
+    def flags(self, text: str) -> list[str]:
+        groups = self.flag_pattern.match(text.strip()).groupdict()
+        return [name for name in self.flag_names if groups[name] is not None]
+
+    def flags_batch(self, texts: Sequence[str]) -> list[list[str]]:
+        seen: dict[str, list[str]] = {}
+        results = []
+        for text in texts:
+            flags = seen.get(text)
+            if flags is None:
+                flags = seen[text] = self.flags(text)
+            results.append(flags)
+        return results
+
+
+_rules_by_doc_type: dict[str | None, ConfidenceRules] = {}
+
+
+def get_confidence_rules(doc_type: str | None = None) -> ConfidenceRules:
+    rules = _rules_by_doc_type.get(doc_type)
+    if rules is not None:
+        return rules
+
+    configured = load_rules().get("confidence_rules", {})
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    flag_patterns = dict(DEFAULT_FLAG_PATTERNS)
+    for section in ("default", doc_type):
+        overrides = configured.get(section, {}) if section else {}
+        thresholds.update(overrides.get("thresholds", {}))
+        for name, spec in overrides.get("flags", {}).items():
+            if spec is None:
+                flag_patterns.pop(name, None)
+            else:
+                flag_patterns[name] = spec
+    rules = _rules_by_doc_type[doc_type] = ConfidenceRules.build(thresholds, flag_patterns)
+    return rules
 
 
 def classify_confidence(score: float) -> str:
-    if score >= 0.92:
-        return "trusted"
-    if score >= 0.80:
-        return "medium"
-    return "low"
+    return get_confidence_rules().classify(score)
 
 
 def detect_forced_flags(text: str) -> list[str]:
-    flags: list[str] = []
-    trimmed = text.strip()
-
-    if CURRENCY_PATTERN.match(trimmed):
-        flags.append("currency_amount")
-    if DATE_PATTERN.match(trimmed):
-        flags.append("date")
-    if TOTAL_PATTERN.search(trimmed):
-        flags.append("total_keyword")
-    if INVOICE_PATTERN.search(trimmed):
-        flags.append("invoice_number")
-    if MALFORMED_PRICE_PATTERN.search(trimmed):
-        flags.append("malformed_price")
-
-    return flags
+    return get_confidence_rules().flags(text)
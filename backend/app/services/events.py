@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import Protocol
+
+STATUS_CHANNEL_PREFIX = "vera:status:"
+logger = logging.getLogger("vera.events")
+
+
+class StatusSubscription(Protocol):
+    async def get(self, timeout: float) -> dict | None: ...
+
+    async def close(self) -> None: ...
+
+
+class StatusBroker(Protocol):
+    def publish(self, document_id: str, event: dict) -> None: ...
+
+    async def subscribe(self, document_id: str) -> StatusSubscription: ...
+
+
+class _QueueSubscription:
+    def __init__(self, broker: InProcessStatusBroker, document_id: str) -> None:
+        self._broker = broker
+        self._document_id = document_id
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[dict] = asyncio.Queue()
+
+    def deliver(self, event: dict) -> None:
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+
+    async def get(self, timeout: float) -> dict | None:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self) -> None:
+        self._broker._remove(self._document_id, self)
+
+
+class InProcessStatusBroker:
+    def __init__(self) -> None:
+        self._subscriptions: dict[str, set[_QueueSubscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, document_id: str, event: dict) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(document_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.deliver(event)
+            except RuntimeError:
+                logger.debug("Dropped status event for closed loop document_id=%s", document_id)
+
+    async def subscribe(self, document_id: str) -> StatusSubscription:
+        subscription = _QueueSubscription(self, document_id)
+        with self._lock:
+            self._subscriptions.setdefault(document_id, set()).add(subscription)
+        return subscription
+
+    def _remove(self, document_id: str, subscription: _QueueSubscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(document_id)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[document_id]
+
+
+class _RedisSubscription:
+    def __init__(self, client, pubsub) -> None:
+        self._client = client
+        self._pubsub = pubsub
+
+    async def get(self, timeout: float) -> dict | None:
+        message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        try:
+            return json.loads(message["data"])
+        except (TypeError, ValueError):
+            return {}
+
+    async def close(self) -> None:
+        await self._pubsub.unsubscribe()
+        await self._pubsub.aclose()
+        await self._client.aclose()
+
+
+class RedisStatusBroker:
+    def __init__(self, url: str) -> None:
+        self._url = url
+        self._publisher = None
+
+    def publish(self, document_id: str, event: dict) -> None:
+        if self._publisher is None:
+            import redis
+
+            self._publisher = redis.Redis.from_url(self._url, socket_timeout=2, socket_connect_timeout=2)
+        self._publisher.publish(f"{STATUS_CHANNEL_PREFIX}{document_id}", json.dumps(event))
+
+    async def subscribe(self, document_id: str) -> StatusSubscription:
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self._url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(f"{STATUS_CHANNEL_PREFIX}{document_id}")
+        return _RedisSubscription(client, pubsub)
+
+
+_broker: StatusBroker | None = None
+
+
+def get_status_broker() -> StatusBroker:
+    global _broker
+    if _broker is None:
+        backend = os.getenv("STATUS_EVENTS_BACKEND", "memory")
+        if backend == "redis":
+            url = os.getenv("STATUS_EVENTS_URL") or os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
+            _broker = RedisStatusBroker(url)
+        else:
+            _broker = InProcessStatusBroker()
+    return _broker
+
+
+def set_status_broker(broker: StatusBroker | None) -> None:
+    global _broker
+    _broker = broker
+
+
+def publish_status_change(document_id: str, page_id: str | None = None) -> None:
+    event: dict[str, str] = {"document_id": document_id}
+    if page_id is not None:
+        event["page_id"] = page_id
+    try:
+        get_status_broker().publish(document_id, event)
+    except Exception:
+        logger.warning("Status event publish failed document_id=%s", document_id, exc_info=True)
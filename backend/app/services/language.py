@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import os
+import re
+from typing import Sequence
+
+STOPWORDS = {
+    "en": {
+        "the", "and", "of", "to", "for", "in", "is", "on", "with", "by", "at", "from", "this", "that",
+        "your", "you", "are", "be", "or", "please", "due", "date", "amount", "payment",
+    },
+    "de": {
+        "der", "die", "das", "und", "ist", "nicht", "mit", "von", "für", "fur", "auf", "den", "dem", "des",
+        "ein", "eine", "zu", "im", "bei", "sie", "wir", "oder", "bitte", "betrag", "datum", "rechnung",
+    },
+    "fr": {
+        "le", "la", "les", "et", "est", "des", "du", "un", "une", "pour", "avec", "dans", "sur", "au",
+        "aux", "par", "vous", "nous", "ou", "pas", "montant", "facture", "date",
+    },
+}
+WORD_PATTERN = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+
+def supported_languages() -> list[str]:
+    return [code.strip() for code in os.getenv("OCR_LANGUAGES", "en,de,fr").split(",") if code.strip()]
+
+
+def default_language() -> str:
+    return os.getenv("OCR_DEFAULT_LANGUAGE", "en")
+
+
+def normalize_language(value: str | None) -> str | None:
+    if value is None or not value.strip():
+        return None
+    language = value.strip().lower().split("-")[0].split("_")[0]
+    if language not in supported_languages():
+        raise ValueError("unsupported_language")
+    return language
+
+
+def detect_language(texts: Sequence[str]) -> str | None:
+    min_hits = int(os.getenv("LANGUAGE_DETECT_MIN_HITS", "3"))
+    words = [word.lower() for text in texts for word in WORD_PATTERN.findall(text)]
+    scores = {
+        language: sum(1 for word in words if word in STOPWORDS.get(language, ()))
+        for language in supported_languages()
+    }
+    if not scores:
+        return None
+    best = max(scores, key=lambda language: scores[language])
+    ranked = sorted(scores.values(), reverse=True)
+    if ranked[0] < min_hits or (len(ranked) > 1 and ranked[0] == ranked[1]):
+        return None
+    return best
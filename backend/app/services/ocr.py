@@ -4,20 +4,41 @@ from dataclasses import dataclass
 import hashlib
 import json
 import logging
+import os
 import time
 import uuid
 from typing import Any
 
+import numpy as np
 from fastapi import UploadFile
-from sqlalchemy import select
-from PIL import Image
-
-from app.db.session import Base, engine, get_session
-from app.models.documents import AuditLog, Document, DocumentPage, Token
-from app.schemas.documents import DocumentStatus, TokenConfidenceLabel, TokenSchema
-from app.services.confidence import classify_confidence, detect_forced_flags
-from app.services.storage import save_upload
-from app.utils.metrics import OCR_DURATION
+from sqlalchemy import select, update
+from PIL import Image, ImageDraw
+
+from app.db.bulk import bulk_insert
+from app.db.session import get_session
+from app.models.documents import AuditLog, Correction, Document, DocumentPage, Token
+from app.schemas.documents import DocumentStatus, TokenConfidenceLabel
+from app.services import ocr_cache
+from app.services.confidence import get_confidence_rules
+from app.services.ocr_engines import OcrEngine, create_ocr_engine
+from app.services.language import default_language, detect_language
+from app.services.ocr_batcher import RecognitionBatcher
+from app.services.ocr_pool import OcrEngineRegistry
+from app.services.preprocess import preprocess_enabled, preprocess_page, preprocess_settings
+from app.services.orientation import detect_orientation
+from app.services.storage import bgr_pixels, open_upright, save_upload
+from app.services.text_layer import extract_text_layer
+from app.services.token_batch import TokenBatch
+from app.utils.metrics import (
+    OCR_DURATION,
+    OCR_EXTRACT_DURATION,
+    OCR_ORIENTATION_PAGES,
+    OCR_PAGE_SOURCE,
+    OCR_PERSIST_DURATION,
+    OCR_REFINE_DURATION,
+    OCR_REFINE_TOKENS,
+    REOCR_DURATION,
+)
 
 
 @dataclass
@@ -25,7 +46,7 @@ class OcrResult:
     document_id: str
     page_id: str
     image_url: str
-    tokens: list[TokenSchema]
+    tokens: TokenBatch
     status: DocumentStatus
     image_width: int
     image_height: int
@@ -36,78 +57,287 @@ def _bbox_hash(bbox: tuple[float, float, float, float]) -> str:
     return hashlib.sha1(raw).hexdigest()[:10]
 
 
-def _line_group_tokens(raw_tokens: list[dict]) -> list[dict]:
-    if not raw_tokens:
-        return []
+def _refine_enabled() -> bool:
+    return os.getenv("OCR_REFINE", "0") == "1"
+
+
+def _batch_enabled() -> bool:
+    return os.getenv("OCR_BATCH", "0") == "1"
+
+
+def _engine_settings(language: str | None = None, use_cls: bool = True) -> dict[str, Any]:
+    settings = {
+        "engine": os.getenv("OCR_ENGINE", "paddleocr"),
+        "lang": language or default_language(),
+        "use_angle_cls": use_cls,
+    }
+    if preprocess_enabled():
+        settings["preprocess"] = preprocess_settings()
+    if _refine_enabled():
+        settings["refine_scale"] = float(os.getenv("OCR_REFINE_SCALE", "2.0"))
+    if _batch_enabled():
+        settings["rec_batch_num"] = int(os.getenv("OCR_BATCH_MAX_CROPS", "64"))
+    return settings
 
-    sorted_tokens = sorted(raw_tokens, key=lambda t: (t["bbox"][1], t["bbox"][0]))
-    lines: list[list[dict]] = []
-    current: list[dict] = []
-    current_y: float | None = None
-    threshold = 12.0
-
-    for token in sorted_tokens:
-        y = token["bbox"][1]
-        if current_y is None or abs(y - current_y) <= threshold:
-            current.append(token)
-            current_y = y if current_y is None else (current_y + y) / 2
-        else:
-            lines.append(sorted(current, key=lambda t: t["bbox"][0]))
-            current = [token]
-            current_y = y
-    if current:
-        lines.append(sorted(current, key=lambda t: t["bbox"][0]))
-
-    flattened: list[dict] = []
-    for line_index, line in enumerate(lines):
-        for token_index, token in enumerate(line):
-            token["line_index"] = line_index
-            token["token_index"] = token_index
-            token["line_id"] = f"line-{line_index}"
-            flattened.append(token)
-    return flattened
-
-
-def _extract_tokens(image_path: str) -> list[dict]:
-    try:
-        from paddleocr import PaddleOCR  # type: ignore[import-not-found]
-    except ImportError as exc:  # pragma: no cover
-        logger.exception("PaddleOCR import failed")
-        raise RuntimeError("paddleocr_not_installed") from exc
 
+def _create_engine(language: str) -> OcrEngine:
     try:
-        ocr = PaddleOCR(use_angle_cls=True, lang="en", show_log=False)
+        return create_ocr_engine(_engine_settings(language))
+    except (RuntimeError, ValueError):
+        raise
     except Exception as exc:  # pragma: no cover
         logger.exception("OCR init failed")
         raise RuntimeError("ocr_init_failed") from exc
 
+
+_engine_registry = OcrEngineRegistry(_create_engine, int(os.getenv("OCR_ENGINE_POOL_SIZE", "1")))
+
+
+def _warmup_image() -> np.ndarray:
+    image = Image.new("RGB", (320, 64), "white")
+    ImageDraw.Draw(image).text((16, 24), "VERA 0123 Total", fill="black")
+    return np.ascontiguousarray(np.asarray(image)[:, :, ::-1])
+
+
+def _prime_engine(engine: OcrEngine) -> None:
     try:
-        result = ocr.ocr(image_path, cls=True)
+        engine.recognize(_warmup_image())
     except Exception as exc:  # pragma: no cover
-        logger.exception("OCR failed image_path=%s", image_path)
+        logger.exception("OCR warm-up inference failed")
+        raise RuntimeError("ocr_warmup_failed") from exc
+
+
+def warm_engine_pool() -> int:
+    prime = _prime_engine if os.getenv("OCR_ENGINE_WARMUP", "1") == "1" else None
+    languages = os.getenv("OCR_PRELOAD_LANGUAGES") or default_language()
+    return sum(
+        _engine_registry.warm(language.strip(), prime=prime) for language in languages.split(",") if language.strip()
+    )
+
+
+def _recognize_crops(language: str, crops: list[np.ndarray]) -> list[tuple[str, float]]:
+    with _engine_registry.lease(language) as engine:
+        return engine.recognize_crops(crops)
+
+
+_recognition_batcher = RecognitionBatcher(
+    _recognize_crops,
+    int(os.getenv("OCR_BATCH_MAX_CROPS", "64")),
+    float(os.getenv("OCR_BATCH_MAX_WAIT_MS", "25")) / 1000,
+)
+
+
+def _extract_tokens_batched(image: str | np.ndarray, language: str) -> TokenBatch:
+    start_time = time.perf_counter()
+    with _engine_registry.lease(language) as engine:
+        try:
+            polygons = engine.detect(image)
+        except Exception as exc:  # pragma: no cover
+            logger.exception("OCR detection failed image=%s", image if isinstance(image, str) else image.shape)
+            raise RuntimeError("ocr_failed") from exc
+    if not polygons:
+        return TokenBatch.empty()
+
+    pixels = bgr_pixels(open_upright(image)) if isinstance(image, str) else image
+    boxes = TokenBatch.from_polygons(polygons, [""] * len(polygons), [0.0] * len(polygons)).boxes
+    crops = _crop_regions(pixels, boxes, 1.0, 0)
+    try:
+        results = _recognition_batcher.submit(language, crops).result(
+            timeout=float(os.getenv("OCR_BATCH_TIMEOUT_S", "60"))
+        )
+        if len(results) != len(crops):
+            raise RuntimeError("ocr_result_mismatch")
+    except Exception as exc:
         raise RuntimeError("ocr_failed") from exc
-    tokens: list[dict[str, Any]] = []
+    drop_score = float(os.getenv("OCR_BATCH_DROP_SCORE", "0.5"))
+    kept = [index for index, (text, confidence) in enumerate(results) if text.strip() and confidence >= drop_score]
+    tokens = TokenBatch.from_polygons(
+        [polygons[index] for index in kept],
+        [results[index][0] for index in kept],
+        [results[index][1] for index in kept],
+    )
+    OCR_EXTRACT_DURATION.labels("off").observe(time.perf_counter() - start_time)
+    logger.info("OCR extracted tokens count=%s batched=True", len(tokens))
+    return tokens
+
 
-    for line in result:
-        for item in line:
-            bbox_points = item[0]
-            text = item[1][0]
-            confidence = float(item[1][1])
+def _extract_tokens(image: str | np.ndarray, language: str | None = None, use_cls: bool = True) -> TokenBatch:
+    if _batch_enabled() and not use_cls:
+        return _extract_tokens_batched(image, language or default_language())
+    with _engine_registry.lease(language or default_language()) as engine:
+        start_time = time.perf_counter()
+        try:
+            tokens = engine.recognize(image, use_cls=use_cls)
+        except Exception as exc:  # pragma: no cover
+            logger.exception("OCR failed image=%s", image if isinstance(image, str) else image.shape)
+            raise RuntimeError("ocr_failed") from exc
+        OCR_EXTRACT_DURATION.labels("on" if use_cls else "off").observe(time.perf_counter() - start_time)
 
-            xs = [point[0] for point in bbox_points]
-            ys = [point[1] for point in bbox_points]
-            x_min, y_min = min(xs), min(ys)
-            x_max, y_max = max(xs), max(ys)
-            bbox = (float(x_min), float(y_min), float(x_max - x_min), float(y_max - y_min))
+    logger.info("OCR extracted tokens count=%s angle_cls=%s", len(tokens), use_cls)
+    return tokens
+
+
+def _crop_regions(pixels: np.ndarray, boxes: np.ndarray, scale: float, padding: int) -> list[np.ndarray]:
+    height, width = pixels.shape[:2]
+    crops = []
+    for x, y, box_width, box_height in boxes.tolist():
+        left = max(0, int(x) - padding)
+        top = max(0, int(y) - padding)
+        right = min(width, int(np.ceil(x + box_width)) + padding)
+        bottom = min(height, int(np.ceil(y + box_height)) + padding)
+        crop = Image.fromarray(np.ascontiguousarray(pixels[top:bottom, left:right]))
+        size = (max(1, round(crop.width * scale)), max(1, round(crop.height * scale)))
+        crops.append(np.asarray(crop.resize(size, Image.Resampling.LANCZOS)))
+    return crops
+
+
+def _refine_low_confidence(image: str | np.ndarray, tokens: TokenBatch, language: str | None) -> TokenBatch:
+    below = get_confidence_rules().trusted_threshold
+    candidates = np.flatnonzero(tokens.confidences < below)[: int(os.getenv("OCR_REFINE_MAX_TOKENS", "200"))]
+    if not len(candidates):
+        return tokens
+    start_time = time.perf_counter()
+    pixels = bgr_pixels(open_upright(image)) if isinstance(image, str) else image
+    crops = _crop_regions(
+        pixels,
+        tokens.boxes[candidates],
+        float(os.getenv("OCR_REFINE_SCALE", "2.0")),
+        int(os.getenv("OCR_REFINE_PADDING", "4")),
+    )
+    try:
+        with _engine_registry.lease(language or default_language()) as engine:
+            results = engine.recognize_crops(crops)
+        if len(results) != len(crops):
+            raise RuntimeError("ocr_result_mismatch")
+    except Exception:
+        logger.exception("OCR refinement failed tokens=%s", len(candidates))
+        return tokens
+
+    refined = tokens.take(np.arange(len(tokens)))
+    improved = 0
+    for index, (text, confidence) in zip(candidates.tolist(), results):
+        if text.strip() and confidence > refined.confidences[index]:
+            refined.texts[index] = text
+            refined.confidences[index] = confidence
+            improved += 1
+    OCR_REFINE_TOKENS.labels("improved").inc(improved)
+    OCR_REFINE_TOKENS.labels("kept").inc(len(candidates) - improved)
+    OCR_REFINE_DURATION.observe(time.perf_counter() - start_time)
+    logger.info("OCR refinement candidates=%s improved=%s", len(candidates), improved)
+    return refined
+
+
+def _recognize_page(image: str | np.ndarray, language: str | None, use_cls: bool = True) -> TokenBatch:
+    if preprocess_enabled():
+        prepared = preprocess_page(image)
+        tokens = prepared.transform.map_tokens(_extract_tokens(prepared.pixels, language, use_cls=use_cls))
+    else:
+        tokens = _extract_tokens(image, language, use_cls=use_cls)
+    if _refine_enabled():
+        tokens = _refine_low_confidence(image, tokens, language)
+    return tokens
 
-            tokens.append({"text": text, "confidence": confidence, "bbox": bbox})
 
-    logger.info("OCR extracted tokens count=%s", len(tokens))
+def _build_token_rows(
+    document_id: str, page_id: str, tokens: TokenBatch, doc_type: str | None = None
+) -> list[dict]:
+    if not len(tokens):
+        return []
+    rules = get_confidence_rules(doc_type)
+    token_rows: list[dict] = []
+    for text, confidence, confidence_label, flags, bbox, line_index, token_index in zip(
+        tokens.texts,
+        tokens.confidences.tolist(),
+        rules.classify_batch(tokens.confidences),
+        rules.flags_batch(tokens.texts),
+        tokens.boxes.tolist(),
+        tokens.line_indices.tolist(),
+        tokens.token_indices.tolist(),
+    ):
+        token_rows.append(
+            {
+                "id": f"{document_id}-p{page_id}-l{line_index}-t{token_index}-{_bbox_hash(bbox)}",
+                "document_id": document_id,
+                "page_id": page_id,
+                "line_index": line_index,
+                "token_index": token_index,
+                "text": text,
+                "confidence": confidence,
+                "confidence_label": confidence_label,
+                "forced_review": confidence_label != TokenConfidenceLabel.trusted.value or len(flags) > 0,
+                "line_id": f"line-{line_index}",
+                "bbox": json.dumps(bbox),
+                "flags": json.dumps(flags),
+            }
+        )
+    return token_rows
+
+
+def _cached_extract_tokens(
+    image_path: str, pixels: np.ndarray | None = None, language: str | None = None, use_cls: bool = True
+) -> TokenBatch:
+    image = image_path if pixels is None else pixels
+    if not ocr_cache.cache_enabled():
+        return _recognize_page(image, language, use_cls)
+
+    if pixels is None:
+        key = ocr_cache.cache_key(image_path, _engine_settings(language, use_cls))
+    else:
+        key = ocr_cache.pixels_cache_key(pixels, _engine_settings(language, use_cls))
+    cached_tokens = ocr_cache.get_tokens(key)
+    if cached_tokens is not None:
+        logger.info("OCR cache hit tokens=%s", len(cached_tokens))
+        return cached_tokens
+
+    raw_tokens = _recognize_page(image, language, use_cls)
+    ocr_cache.put_tokens(key, raw_tokens)
+    return raw_tokens
+
+
+def _text_layer_tokens(pdf_path: str, page_index: int, image_width: int, image_height: int) -> TokenBatch | None:
+    min_words = int(os.getenv("TEXT_LAYER_MIN_WORDS", "5"))
+    if min_words <= 0:
+        return None
+    try:
+        tokens = extract_text_layer(pdf_path, page_index, image_width, image_height)
+    except RuntimeError:
+        logger.warning("Text layer unavailable pdf_path=%s page_index=%s", pdf_path, page_index)
+        return None
+    if len(tokens) < min_words:
+        logger.info("Text layer too sparse words=%s page_index=%s", len(tokens), page_index)
+        return None
     return tokens
 
 
-def run_ocr_for_page(document_id: str, page_id: str, image_path: str, image_url: str) -> OcrResult:
-    Base.metadata.create_all(bind=engine)
+def _store_detected_language(document_id: str, tokens: TokenBatch) -> str | None:
+    if os.getenv("OCR_LANGUAGE_DETECT", "1") != "1":
+        return None
+    detected = detect_language(tokens.texts)
+    if detected is None:
+        return None
+    with get_session() as session:
+        session.execute(
+            update(Document)
+            .where(Document.id == document_id)
+            .where(Document.language.is_(None))
+            .values(language=detected)
+        )
+        session.commit()
+        language = session.execute(select(Document.language).where(Document.id == document_id)).scalar_one()
+    logger.info("Document language detected document_id=%s language=%s", document_id, language)
+    return language
+
+
+def run_ocr_for_page(
+    document_id: str,
+    page_id: str,
+    image_path: str,
+    image_url: str,
+    pdf_path: str | None = None,
+    page_index: int = 0,
+    image_size: tuple[int, int] | None = None,
+    pixels: np.ndarray | None = None,
+) -> OcrResult:
     logger.info("OCR start document_id=%s page_id=%s", document_id, page_id)
     start_time = time.perf_counter()
     with get_session() as session:
@@ -121,42 +351,47 @@ def run_ocr_for_page(document_id: str, page_id: str, image_path: str, image_url:
                 document_id=document_id,
                 page_id=page_id,
                 image_url=image_url,
-                tokens=[],
+                tokens=TokenBatch.empty(),
                 status=DocumentStatus.canceled,
                 image_width=int(getattr(document, "image_width")),
                 image_height=int(getattr(document, "image_height")),
             )
-
-    with Image.open(image_path) as image:
-        image_width, image_height = image.size
-
-    raw_tokens = _extract_tokens(image_path)
-    grouped_tokens = _line_group_tokens(raw_tokens)
-    token_schemas: list[TokenSchema] = []
-
+        doc_type = document.doc_type
+        language = document.language
+
+    if image_size is None:
+        with Image.open(image_path) as image:
+            image_size = image.size
+    image_width, image_height = image_size
+
+    raw_tokens = None
+    if pdf_path:
+        raw_tokens = _text_layer_tokens(pdf_path, page_index, image_width, image_height)
+    token_source = "ocr" if raw_tokens is None else "text_layer"
+    use_cls = True
+    if raw_tokens is None:
+        orientation = detect_orientation(
+            image_path if pixels is None else pixels,
+            rendered_from_pdf=pdf_path is not None or pixels is not None,
+        )
+        OCR_ORIENTATION_PAGES.labels(orientation.source).inc()
+        use_cls = not orientation.upright
+        raw_tokens = _cached_extract_tokens(image_path, pixels, language, use_cls)
+    if language is None:
+        detected = _store_detected_language(document_id, raw_tokens)
+        if token_source == "ocr" and detected not in (None, default_language()):
+            raw_tokens = _cached_extract_tokens(image_path, pixels, detected, use_cls)
+    OCR_PAGE_SOURCE.labels(token_source).inc()
+    grouped_tokens = raw_tokens.group_lines()
+
+    token_rows = _build_token_rows(document_id, page_id, grouped_tokens, doc_type)
+    persist_start = time.perf_counter()
     with get_session() as session:
-        document = session.get(Document, document_id)
-        page = session.get(DocumentPage, page_id)
-        if document is None or page is None:
-            raise ValueError("document_not_found")
-
-        if document.status == DocumentStatus.canceled.value:
-            logger.info("OCR canceled after extraction document_id=%s", document_id)
-            OCR_DURATION.labels("canceled").observe(time.perf_counter() - start_time)
-            return OcrResult(
-                document_id=document_id,
-                page_id=page_id,
-                image_url=image_url,
-                tokens=[],
-                status=DocumentStatus.canceled,
-                image_width=image_width,
-                image_height=image_height,
-            )
-
-        session.execute(Token.__table__.delete().where(Token.page_id == page_id))
-        session.execute(
+        claimed = session.execute(
             DocumentPage.__table__.update()
             .where(DocumentPage.id == page_id)
+            .where(DocumentPage.document_id == document_id)
+            .where(DocumentPage.status != DocumentStatus.canceled.value)
             .values(
                 image_path=image_path,
                 image_width=image_width,
@@ -164,75 +399,204 @@ def run_ocr_for_page(document_id: str, page_id: str, image_path: str, image_url:
                 status=DocumentStatus.ocr_done.value,
             )
         )
-
-        for raw in grouped_tokens:
-            confidence_label = TokenConfidenceLabel(classify_confidence(raw["confidence"]))
-            flags = detect_forced_flags(raw["text"])
-            forced_review = confidence_label != TokenConfidenceLabel.trusted or len(flags) > 0
-            bbox = raw["bbox"]
-            token_id = (
-                f"{document_id}-p{page_id}-l{raw['line_index']}-t{raw['token_index']}-{_bbox_hash(bbox)}"
-            )
-
-            token = Token(
-                id=token_id,
+        if claimed.rowcount == 0:
+            session.rollback()
+            if session.get(DocumentPage, page_id) is None:
+                raise ValueError("document_not_found")
+            logger.info("OCR canceled after extraction document_id=%s", document_id)
+            OCR_DURATION.labels("canceled").observe(time.perf_counter() - start_time)
+            return OcrResult(
                 document_id=document_id,
                 page_id=page_id,
-                line_index=raw["line_index"],
-                token_index=raw["token_index"],
-                text=raw["text"],
-                confidence=raw["confidence"],
-                confidence_label=confidence_label.value,
-                forced_review=forced_review,
-                line_id=raw["line_id"],
-                bbox=json.dumps(bbox),
-                flags=json.dumps(flags),
-            )
-            session.add(token)
-
-            token_schemas.append(
-                TokenSchema(
-                    id=token_id,
-                    line_id=raw["line_id"],
-                    line_index=raw["line_index"],
-                    token_index=raw["token_index"],
-                    text=raw["text"],
-                    confidence=raw["confidence"],
-                    confidence_label=confidence_label,
-                    forced_review=forced_review,
-                    bbox=bbox,
-                    flags=flags,
-                )
+                image_url=image_url,
+                tokens=TokenBatch.empty(),
+                status=DocumentStatus.canceled,
+                image_width=image_width,
+                image_height=image_height,
             )
 
-        session.commit()
-
-    with get_session() as session:
+        session.execute(Token.__table__.delete().where(Token.page_id == page_id))
+        bulk_insert(session, Token.__table__, token_rows)
         session.add(
             AuditLog(
                 id=uuid.uuid4().hex,
                 document_id=document_id,
                 page_id=page_id,
                 event_type="ocr_completed",
-                detail=json.dumps({"token_count": len(token_schemas)}),
+                detail=json.dumps({"token_count": len(grouped_tokens), "source": token_source}),
             )
         )
         session.commit()
+    OCR_PERSIST_DURATION.observe(time.perf_counter() - persist_start)
 
     OCR_DURATION.labels("success").observe(time.perf_counter() - start_time)
     return OcrResult(
         document_id=document_id,
         page_id=page_id,
         image_url=image_url,
-        tokens=token_schemas,
+        tokens=grouped_tokens,
         status=DocumentStatus.ocr_done,
         image_width=image_width,
         image_height=image_height,
     )
 
 
+def _region_contains(region: tuple[float, float, float, float], bbox: list[float]) -> bool:
+    center_x = bbox[0] + bbox[2] / 2
+    center_y = bbox[1] + bbox[3] / 2
+    return region[0] <= center_x <= region[0] + region[2] and region[1] <= center_y <= region[1] + region[3]
+
+
+def reocr_region(
+    document_id: str,
+    page_id: str,
+    bbox: tuple[float, float, float, float] | None = None,
+    token_ids: list[str] | None = None,
+    scale: float | None = None,
+    page_version: int | None = None,
+) -> dict[str, Any]:
+    if (bbox is None) == (not token_ids):
+        raise ValueError("region_required")
+    scale = scale or float(os.getenv("REOCR_SCALE", "3.0"))
+    if not 1.0 <= scale <= float(os.getenv("REOCR_MAX_SCALE", "6.0")):
+        raise ValueError("invalid_scale")
+    start_time = time.perf_counter()
+    with get_session() as session:
+        document = session.get(Document, document_id)
+        page = session.get(DocumentPage, page_id)
+        if document is None or page is None or page.document_id != document_id:
+            raise ValueError("document_not_found")
+        current_version = int(getattr(page, "version"))
+        if page_version is not None and page_version != current_version:
+            raise ValueError("version_conflict")
+        tokens = session.execute(
+            select(Token.id, Token.text, Token.bbox, Token.line_index, Token.token_index)
+            .where(Token.page_id == page_id)
+            .order_by(Token.line_index.asc(), Token.token_index.asc())
+        ).all()
+        doc_type = document.doc_type
+        language = document.language
+        image_path = str(page.image_path)
+
+    token_boxes = {token.id: json.loads(token.bbox) for token in tokens}
+    if token_ids:
+        targets = [token for token in tokens if token.id in set(token_ids)]
+        if len(targets) != len(set(token_ids)):
+            raise ValueError("token_not_found")
+        regions = [token_boxes[token.id] for token in targets]
+    else:
+        targets = [token for token in tokens if _region_contains(bbox, token_boxes[token.id])]
+        if not targets:
+            raise ValueError("region_empty")
+        if len({token.line_index for token in targets}) > 1:
+            raise ValueError("region_multiline")
+        regions = [list(bbox)]
+
+    padding = int(os.getenv("OCR_REFINE_PADDING", "4"))
+    boxes = np.asarray(regions, dtype=np.float64)
+    upright = open_upright(image_path)
+    page_width, page_height = upright.size
+    left = max(0, int(boxes[:, 0].min()) - padding)
+    top = max(0, int(boxes[:, 1].min()) - padding)
+    right = min(page_width, int(np.ceil((boxes[:, 0] + boxes[:, 2]).max())) + padding)
+    bottom = min(page_height, int(np.ceil((boxes[:, 1] + boxes[:, 3]).max())) + padding)
+    pixels = bgr_pixels(upright.crop((left, top, right, bottom)))
+    crops = _crop_regions(pixels, boxes - np.array([left, top, 0.0, 0.0]), scale, padding)
+    try:
+        with _engine_registry.lease(language or default_language()) as engine:
+            results = engine.recognize_crops(crops)
+        if len(results) != len(crops):
+            raise ValueError("ocr_result_mismatch")
+    except RuntimeError:
+        raise
+    except Exception as exc:
+        logger.exception("Re-OCR failed document_id=%s page_id=%s", document_id, page_id)
+        raise RuntimeError("ocr_failed") from exc
+
+    rules = get_confidence_rules(doc_type)
+    updated: list[dict] = []
+    removed_ids = [token.id for token in targets[len(results):]] if bbox is not None else []
+    for token, region, (text, confidence) in zip(targets, regions, results):
+        if bbox is not None:
+            left, top = max(0.0, region[0]), max(0.0, region[1])
+            right = min(float(page_width), region[0] + region[2])
+            bottom = min(float(page_height), region[1] + region[3])
+            region = [left, top, right - left, bottom - top]
+        confidence_label = rules.classify(confidence)
+        flags = rules.flags(text)
+        updated.append(
+            {
+                "id": token.id,
+                "line_id": f"line-{token.line_index}",
+                "line_index": token.line_index,
+                "token_index": token.token_index,
+                "text": text,
+                "confidence": confidence,
+                "confidence_label": confidence_label,
+                "forced_review": confidence_label != TokenConfidenceLabel.trusted.value or len(flags) > 0,
+                "bbox": region,
+                "flags": flags,
+            }
+        )
+
+    with get_session() as session:
+        claimed = session.execute(
+            DocumentPage.__table__.update()
+            .where(DocumentPage.id == page_id)
+            .where(DocumentPage.version == current_version)
+            .values(version=DocumentPage.version + 1)
+        )
+        if claimed.rowcount == 0:
+            session.rollback()
+            raise ValueError("version_conflict")
+        if removed_ids and session.execute(
+            select(Correction.id).where(Correction.token_id.in_(removed_ids)).limit(1)
+        ).first():
+            session.rollback()
+            raise ValueError("region_has_corrections")
+        for token in updated:
+            session.execute(
+                Token.__table__.update()
+                .where(Token.id == token["id"])
+                .values(
+                    text=token["text"],
+                    confidence=token["confidence"],
+                    confidence_label=token["confidence_label"],
+                    forced_review=token["forced_review"],
+                    bbox=json.dumps(token["bbox"]),
+                    flags=json.dumps(token["flags"]),
+                )
+            )
+        if removed_ids:
+            session.execute(Token.__table__.delete().where(Token.id.in_(removed_ids)))
+        session.add(
+            AuditLog(
+                id=uuid.uuid4().hex,
+                document_id=document_id,
+                page_id=page_id,
+                event_type="tokens_reocr",
+                detail=json.dumps(
+                    {
+                        "token_ids": [token["id"] for token in updated],
+                        "removed_token_ids": removed_ids,
+                        "scale": scale,
+                    }
+                ),
+            )
+        )
+        session.commit()
+    REOCR_DURATION.observe(time.perf_counter() - start_time)
+    logger.info(
+        "Re-OCR completed document_id=%s page_id=%s tokens=%s removed=%s",
+        document_id,
+        page_id,
+        len(updated),
+        len(removed_ids),
+    )
+    return {"tokens": updated, "removed_token_ids": removed_ids, "page_version": current_version + 1}
+
+
 async def run_ocr(file: UploadFile) -> OcrResult:
-    Base.metadata.create_all(bind=engine)
     logger.info("OCR start filename=%s", file.filename)
     document_id, image_path, image_url, pages = save_upload(file)
     with get_session() as session:
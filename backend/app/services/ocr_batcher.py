@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+
+from app.utils.metrics import OCR_BATCH_CROPS, OCR_BATCH_PAGES, OCR_BATCH_WAIT
+
+logger = logging.getLogger("vera.ocr_batcher")
+
+
+@dataclass
+class _BatchRequest:
+    crops: list[np.ndarray]
+    future: Future = field(default_factory=Future)
+    submitted: float = field(default_factory=time.monotonic)
+
+
+class RecognitionBatcher:
+    def __init__(
+        self,
+        recognize: Callable[[str, list[np.ndarray]], list[tuple[str, float]]],
+        max_crops: int = 64,
+        max_wait: float = 0.025,
+    ) -> None:
+        self._recognize = recognize
+        self._max_crops = max(1, max_crops)
+        self._max_wait = max(0.0, max_wait)
+        self._reset()
+        _batchers.add(self)
+
+    def _reset(self) -> None:
+        self._pending: dict[str, list[_BatchRequest]] = {}
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+
+    def submit(self, language: str, crops: list[np.ndarray]) -> Future:
+        request = _BatchRequest(crops)
+        if not crops:
+            request.future.set_result([])
+            return request.future
+        with self._condition:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="vera-ocr-batcher", daemon=True)
+                self._thread.start()
+            self._pending.setdefault(language, []).append(request)
+            self._condition.notify()
+        return request.future
+
+    def _next_batch(self) -> tuple[str, list[_BatchRequest]] | None:
+        now = time.monotonic()
+        for language, requests in self._pending.items():
+            if sum(len(request.crops) for request in requests) < self._max_crops and (
+                now - requests[0].submitted < self._max_wait
+            ):
+                continue
+            batch: list[_BatchRequest] = []
+            crop_count = 0
+            while requests and (not batch or crop_count + len(requests[0].crops) <= self._max_crops):
+                request = requests.pop(0)
+                batch.append(request)
+                crop_count += len(request.crops)
+            if not requests:
+                del self._pending[language]
+            return language, batch
+        return None
+
+    def _wait_timeout(self) -> float | None:
+        if not self._pending:
+            return None
+        oldest = min(requests[0].submitted for requests in self._pending.values())
+        return max(0.0, oldest + self._max_wait - time.monotonic())
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                batch = self._next_batch()
+                while batch is None:
+                    self._condition.wait(self._wait_timeout())
+                    batch = self._next_batch()
+            self._flush(*batch)
+
+    def _flush(self, language: str, requests: list[_BatchRequest]) -> None:
+        crops = [crop for request in requests for crop in request.crops]
+        OCR_BATCH_CROPS.observe(len(crops))
+        OCR_BATCH_PAGES.observe(len(requests))
+        OCR_BATCH_WAIT.observe(time.monotonic() - requests[0].submitted)
+        try:
+            results = self._recognize(language, crops)
+            if len(results) != len(crops):
+                raise RuntimeError("ocr_result_mismatch")
+        except Exception as exc:
+            logger.exception("Batched recognition failed language=%s crops=%s", language, len(crops))
+            for request in requests:
+                request.future.set_exception(exc)
+            return
+        offset = 0
+        for request in requests:
+            request.future.set_result(results[offset : offset + len(request.crops)])
+            offset += len(request.crops)
+        logger.debug("Batched recognition language=%s pages=%s crops=%s", language, len(requests), len(crops))
+
+
+_batchers: weakref.WeakSet[RecognitionBatcher] = weakref.WeakSet()
+
+
+def _reset_after_fork() -> None:
+    for batcher in list(_batchers):
+        batcher._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
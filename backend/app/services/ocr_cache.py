@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import uuid
+
+import numpy as np
+
+from app.services.storage import ensure_data_dir
+from app.services.token_batch import TokenBatch
+from app.utils.metrics import OCR_CACHE_LOOKUPS
+
+logger = logging.getLogger("vera.ocr_cache")
+
+
+def _cache_dir() -> str:
+    cache_dir = os.getenv("OCR_CACHE_DIR") or os.path.join(ensure_data_dir(), "ocr_cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def _max_bytes() -> int:
+    return int(float(os.getenv("OCR_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
+
+def cache_enabled() -> bool:
+    return _max_bytes() > 0
+
+
+def cache_key(image_path: str, settings: dict) -> str:
+    digest = hashlib.sha256()
+    with open(image_path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def pixels_cache_key(pixels: np.ndarray, settings: dict) -> str:
+    digest = hashlib.sha256()
+    digest.update(repr((pixels.shape, pixels.dtype.str)).encode("utf-8"))
+    digest.update(np.ascontiguousarray(pixels).data)
+    digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get_tokens(key: str) -> TokenBatch | None:
+    path = os.path.join(_cache_dir(), f"{key}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            cached = json.load(handle)
+        os.utime(path)
+    except FileNotFoundError:
+        OCR_CACHE_LOOKUPS.labels("miss").inc()
+        return None
+    except (OSError, ValueError):
+        logger.warning("OCR cache entry unreadable key=%s", key)
+        OCR_CACHE_LOOKUPS.labels("miss").inc()
+        return None
+
+    OCR_CACHE_LOOKUPS.labels("hit").inc()
+    if isinstance(cached, list):
+        return TokenBatch.from_dicts(cached)
+    return TokenBatch.from_columns(cached["texts"], cached["confidences"], cached["boxes"])
+
+
+def put_tokens(key: str, tokens: TokenBatch) -> None:
+    cache_dir = _cache_dir()
+    path = os.path.join(cache_dir, f"{key}.json")
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    payload = {
+        "texts": tokens.texts,
+        "confidences": tokens.confidences.tolist(),
+        "boxes": tokens.boxes.tolist(),
+    }
+    try:
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle)
+        os.replace(temp_path, path)
+    except OSError:
+        logger.warning("OCR cache write failed key=%s", key)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return
+    _evict(cache_dir, _max_bytes())
+
+
+def _evict(cache_dir: str, max_bytes: int) -> None:
+    entries = []
+    total_bytes = 0
+    with os.scandir(cache_dir) as scanner:
+        for entry in scanner:
+            if not entry.name.endswith(".json"):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total_bytes += stat.st_size
+    if total_bytes <= max_bytes:
+        return
+
+    entries.sort()
+    evicted = 0
+    for _mtime, size, path in entries:
+        if total_bytes <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_bytes -= size
+        evicted += 1
+    logger.info("OCR cache evicted entries=%s", evicted)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any, Protocol
+
+import numpy as np
+from PIL import Image
+
+from app.services.token_batch import TokenBatch
+
+logger = logging.getLogger("vera.ocr_engines")
+
+PADDLE_LANGUAGES = {"en": "en", "de": "german", "fr": "french"}
+
+
+class OcrEngine(Protocol):
+    name: str
+
+    def recognize(self, image: str | np.ndarray, use_cls: bool = True) -> TokenBatch: ...
+
+    def detect(self, image: str | np.ndarray) -> list: ...
+
+    def recognize_crops(self, crops: list[np.ndarray]) -> list[tuple[str, float]]: ...
+
+
+def _batch_from_items(items: list) -> TokenBatch:
+    return TokenBatch.from_polygons(
+        [item[0] for item in items],
+        [item[1] for item in items],
+        [item[2] for item in items],
+    )
+
+
+class PaddleOcrEngine:
+    name = "paddleocr"
+
+    def __init__(self, lang: str = "en", use_angle_cls: bool = True, rec_batch_num: int = 6) -> None:
+        try:
+            from paddleocr import PaddleOCR  # type: ignore[import-not-found]
+        except ImportError as exc:  # pragma: no cover
+            logger.exception("PaddleOCR import failed")
+            raise RuntimeError("paddleocr_not_installed") from exc
+
+        self._use_angle_cls = use_angle_cls
+        self._ocr = PaddleOCR(
+            use_angle_cls=use_angle_cls,
+            lang=PADDLE_LANGUAGES.get(lang, lang),
+            rec_batch_num=rec_batch_num,
+            show_log=False,
+        )
+
+    def recognize(self, image: str | np.ndarray, use_cls: bool = True) -> TokenBatch:
+        result = self._ocr.ocr(image, cls=self._use_angle_cls and use_cls)
+        items = [(item[0], item[1][0], item[1][1]) for line in result for item in (line or [])]
+        return _batch_from_items(items)
+
+    def detect(self, image: str | np.ndarray) -> list:
+        result = self._ocr.ocr(image, det=True, rec=False, cls=False)
+        return list(result[0] or [])
+
+    def recognize_crops(self, crops: list[np.ndarray]) -> list[tuple[str, float]]:
+        result = self._ocr.ocr([crops], det=False, cls=False)[0]
+        return [(text, float(score)) for text, score in result]
+
+
+class OnnxOcrEngine:
+    name = "onnxruntime"
+
+    def __init__(
+        self, lang: str = "en", use_angle_cls: bool = True, intra_op_threads: int = 0, rec_batch_num: int = 6
+    ) -> None:
+        try:
+            from rapidocr_onnxruntime import RapidOCR  # type: ignore[import-not-found]
+        except ImportError as exc:  # pragma: no cover
+            logger.exception("ONNX Runtime OCR import failed")
+            raise RuntimeError("onnxruntime_ocr_not_installed") from exc
+
+        options: dict[str, Any] = {
+            "use_cls": use_angle_cls,
+            "intra_op_num_threads": intra_op_threads or -1,
+            "inter_op_num_threads": 1,
+            "rec_batch_num": rec_batch_num,
+        }
+        det_model_path = os.getenv("OCR_ONNX_DET_MODEL")
+        rec_model_path = os.getenv(f"OCR_ONNX_REC_MODEL_{lang.upper()}") or os.getenv("OCR_ONNX_REC_MODEL")
+        if det_model_path:
+            options["det_model_path"] = det_model_path
+        if rec_model_path:
+            options["rec_model_path"] = rec_model_path
+        self._use_angle_cls = use_angle_cls
+        self._ocr = RapidOCR(**options)
+
+    def recognize(self, image: str | np.ndarray, use_cls: bool = True) -> TokenBatch:
+        result, _elapse = self._ocr(image, use_cls=self._use_angle_cls and use_cls)
+        return _batch_from_items([(item[0], item[1], float(item[2])) for item in (result or [])])
+
+    def detect(self, image: str | np.ndarray) -> list:
+        result, _elapse = self._ocr(image, use_det=True, use_cls=False, use_rec=False)
+        return list(result or [])
+
+    def recognize_crops(self, crops: list[np.ndarray]) -> list[tuple[str, float]]:
+        result, _elapse = self._ocr.text_rec(crops)
+        return [(text, float(score)) for text, score in result]
+
+
+class FakeOcrEngine:
+    name = "fake"
+
+    def __init__(self, tokens: TokenBatch | None = None) -> None:
+        self._tokens = tokens
+
+    def _page_tokens(self, image: str | np.ndarray) -> TokenBatch:
+        if self._tokens is not None:
+            return self._tokens.take(np.arange(len(self._tokens)))
+        if isinstance(image, str):
+            with Image.open(image) as opened:
+                width, height = opened.size
+        else:
+            height, width = image.shape[:2]
+        return TokenBatch.from_columns(["FAKE"], [0.99], [(0.0, 0.0, float(width), float(height))])
+
+    def recognize(self, image: str | np.ndarray, use_cls: bool = True) -> TokenBatch:
+        return self._page_tokens(image)
+
+    def detect(self, image: str | np.ndarray) -> list:
+        return [
+            [[x, y], [x + width, y], [x + width, y + height], [x, y + height]]
+            for x, y, width, height in self._page_tokens(image).boxes.tolist()
+        ]
+
+    def recognize_crops(self, crops: list[np.ndarray]) -> list[tuple[str, float]]:
+        if not self._tokens:
+            return [("FAKE", 0.99) for _ in crops]
+        texts, confidences = self._tokens.texts, self._tokens.confidences.tolist()
+        return [(texts[index % len(texts)], confidences[index % len(texts)]) for index in range(len(crops))]
+
+
+def create_ocr_engine(settings: dict[str, Any]) -> OcrEngine:
+    engine_name = settings["engine"]
+    if engine_name == PaddleOcrEngine.name:
+        return PaddleOcrEngine(
+            lang=settings["lang"],
+            use_angle_cls=settings["use_angle_cls"],
+            rec_batch_num=settings.get("rec_batch_num", 6),
+        )
+    if engine_name == OnnxOcrEngine.name:
+        return OnnxOcrEngine(
+            lang=settings["lang"],
+            use_angle_cls=settings["use_angle_cls"],
+            intra_op_threads=int(os.getenv("OCR_ONNX_THREADS", "0")),
+            rec_batch_num=settings.get("rec_batch_num", 6),
+        )
+    if engine_name == FakeOcrEngine.name:
+        return FakeOcrEngine()
+    raise ValueError("unsupported_ocr_engine")
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import logging
+import os
+import resource
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from app.utils.metrics import (
+    OCR_ENGINE_EVICTIONS,
+    OCR_ENGINE_LANGUAGES_LOADED,
+    OCR_ENGINE_LEASES,
+    OCR_ENGINE_LOAD_DURATION,
+    OCR_ENGINE_MODEL_BYTES,
+    OCR_ENGINE_POOL_IDLE,
+)
+
+logger = logging.getLogger("vera.ocr_pool")
+
+
+def current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class OcrEnginePool:
+    def __init__(self, factory: Callable[[], Any], max_idle: int = 1, label: str = "default") -> None:
+        self._factory = factory
+        self._max_idle = max(1, max_idle)
+        self._label = label
+        self._idle: list[Any] = []
+        self._lock = threading.Lock()
+        self._footprints: dict[int, int] = {}
+        self.footprint_bytes = 0
+
+    @property
+    def idle_count(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    def _build(self) -> Any:
+        start_time = time.perf_counter()
+        rss_before = current_rss_bytes()
+        engine = self._factory()
+        duration = time.perf_counter() - start_time
+        with self._lock:
+            self._footprints[id(engine)] = max(0, current_rss_bytes() - rss_before)
+            self.footprint_bytes += self._footprints[id(engine)]
+            OCR_ENGINE_MODEL_BYTES.labels(self._label).set(self.footprint_bytes)
+        OCR_ENGINE_LOAD_DURATION.observe(duration)
+        logger.info("OCR engine loaded label=%s duration_s=%.2f", self._label, duration)
+        return engine
+
+    def warm(self, count: int | None = None, prime: Callable[[Any], None] | None = None) -> int:
+        target = self._max_idle if count is None else min(count, self._max_idle)
+        while self.idle_count < target:
+            engine = self._build()
+            if prime is not None:
+                prime(engine)
+            with self._lock:
+                self._idle.append(engine)
+                OCR_ENGINE_POOL_IDLE.labels(self._label).set(len(self._idle))
+        return self.idle_count
+
+    @contextmanager
+    def lease(self) -> Iterator[Any]:
+        with self._lock:
+            engine = self._idle.pop() if self._idle else None
+            OCR_ENGINE_POOL_IDLE.labels(self._label).set(len(self._idle))
+        if engine is None:
+            OCR_ENGINE_LEASES.labels("cold").inc()
+            engine = self._build()
+        else:
+            OCR_ENGINE_LEASES.labels("warm").inc()
+        try:
+            yield engine
+        finally:
+            with self._lock:
+                if len(self._idle) < self._max_idle:
+                    self._idle.append(engine)
+                else:
+                    self.footprint_bytes -= self._footprints.pop(id(engine), 0)
+                    OCR_ENGINE_MODEL_BYTES.labels(self._label).set(self.footprint_bytes)
+                OCR_ENGINE_POOL_IDLE.labels(self._label).set(len(self._idle))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+            self._footprints.clear()
+            self.footprint_bytes = 0
+            OCR_ENGINE_POOL_IDLE.labels(self._label).set(0)
+            OCR_ENGINE_MODEL_BYTES.labels(self._label).set(0)
+
+
+class OcrEngineRegistry:
+    def __init__(self, factory: Callable[[str], Any], max_idle: int = 1) -> None:
+        self._factory = factory
+        self._max_idle = max_idle
+        self._pools: OrderedDict[str, OcrEnginePool] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def languages(self) -> list[str]:
+        with self._lock:
+            return list(self._pools)
+
+    def _pool(self, language: str) -> OcrEnginePool:
+        with self._lock:
+            pool = self._pools.get(language)
+            if pool is None:
+                pool = OcrEnginePool(lambda: self._factory(language), self._max_idle, label=language)
+                self._pools[language] = pool
+                OCR_ENGINE_LANGUAGES_LOADED.set(len(self._pools))
+            self._pools.move_to_end(language)
+            return pool
+
+    def _enforce_budget(self, keep: str) -> None:
+        budget_bytes = int(float(os.getenv("OCR_MODEL_RSS_BUDGET_MB", "0")) * 1024 * 1024)
+        if budget_bytes <= 0:
+            return
+        with self._lock:
+            while sum(pool.footprint_bytes for pool in self._pools.values()) > budget_bytes:
+                language = next((language for language in self._pools if language != keep), None)
+                if language is None:
+                    break
+                self._pools.pop(language).clear()
+                OCR_ENGINE_EVICTIONS.labels(language).inc()
+                logger.info("OCR engine evicted language=%s budget_bytes=%s", language, budget_bytes)
+            OCR_ENGINE_LANGUAGES_LOADED.set(len(self._pools))
+
+    def warm(self, language: str, prime: Callable[[Any], None] | None = None) -> int:
+        count = self._pool(language).warm(prime=prime)
+        self._enforce_budget(language)
+        return count
+
+    @contextmanager
+    def lease(self, language: str) -> Iterator[Any]:
+        with self._pool(language).lease() as engine:
+            self._enforce_budget(language)
+            yield engine
+
+    def clear(self) -> None:
+        with self._lock:
+            for pool in self._pools.values():
+                pool.clear()
+            self._pools.clear()
+            OCR_ENGINE_LANGUAGES_LOADED.set(0)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+from app.services.preprocess import otsu_threshold
+from app.utils.metrics import OCR_ORIENTATION_PROBE_DURATION
+
+logger = logging.getLogger("vera.orientation")
+
+EXIF_ORIENTATION_TAG = 0x0112
+PROBE_WIDTH = 800
+
+
+@dataclass(frozen=True)
+class PageOrientation:
+    upright: bool
+    source: str
+
+
+def probe_upright(gray: np.ndarray) -> bool:
+    if gray.shape[1] > PROBE_WIDTH:
+        scale = PROBE_WIDTH / gray.shape[1]
+        gray = np.asarray(
+            Image.fromarray(gray).resize((PROBE_WIDTH, max(1, round(gray.shape[0] * scale))), Image.Resampling.BOX)
+        )
+    profile = (gray < otsu_threshold(gray)).sum(axis=1).astype(np.float64)
+    if not profile.any():
+        return False
+    rows = profile > profile.max() * 0.01
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], rows.astype(np.int8), [0]))))
+    ascender_votes = 0
+    line_count = 0
+    for start, end in zip(edges[::2].tolist(), edges[1::2].tolist()):
+        if end - start < 4:
+            continue
+        band = profile[start:end]
+        core = np.flatnonzero(band >= band.max() * 0.5)
+        above = band[: core[0]].sum()
+        below = band[core[-1] + 1 :].sum()
+        if above == below:
+            continue
+        line_count += 1
+        ascender_votes += above > below
+    min_lines = int(os.getenv("OCR_ORIENTATION_PROBE_MIN_LINES", "8"))
+    agreement = float(os.getenv("OCR_ORIENTATION_PROBE_AGREEMENT", "0.9"))
+    return line_count >= min_lines and ascender_votes >= line_count * agreement
+
+
+def _probe_gray(image: Image.Image) -> np.ndarray:
+    reduced = image if image.mode in ("L", "RGB") else image.convert("RGB")
+    if reduced.width // PROBE_WIDTH > 1:
+        reduced = reduced.reduce(reduced.width // PROBE_WIDTH)
+    return np.asarray(reduced.convert("L"))
+
+
+def _probe(gray: np.ndarray, start_time: float) -> PageOrientation:
+    upright = probe_upright(gray)
+    OCR_ORIENTATION_PROBE_DURATION.observe(time.perf_counter() - start_time)
+    return PageOrientation(upright=upright, source="probe" if upright else "unknown")
+
+
+def detect_orientation(image: str | np.ndarray, rendered_from_pdf: bool = False) -> PageOrientation:
+    if os.getenv("OCR_ORIENTATION_DETECT", "1") != "1":
+        return PageOrientation(upright=False, source="disabled")
+    if rendered_from_pdf:
+        return PageOrientation(upright=True, source="pdf")
+    probe = os.getenv("OCR_ORIENTATION_PROBE", "1") == "1"
+    start_time = time.perf_counter()
+    if isinstance(image, np.ndarray):
+        if not probe:
+            return PageOrientation(upright=False, source="unknown")
+        return _probe(np.ascontiguousarray(image[:, :, 1]), start_time)
+    try:
+        with Image.open(image) as opened:
+            opened.draft("L", (PROBE_WIDTH, max(1, PROBE_WIDTH * opened.height // opened.width)))
+            if opened.getexif().get(EXIF_ORIENTATION_TAG):
+                return PageOrientation(upright=True, source="exif")
+            if not probe:
+                return PageOrientation(upright=False, source="unknown")
+            gray = _probe_gray(opened)
+    except OSError:
+        logger.warning("Orientation probe could not read image=%s", image)
+        return PageOrientation(upright=False, source="unknown")
+    return _probe(gray, start_time)
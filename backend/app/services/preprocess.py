@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+from app.services.storage import open_upright
+from app.services.token_batch import TokenBatch
+from app.utils.metrics import OCR_PREPROCESS_DURATION, OCR_PREPROCESS_PIXEL_RATIO
+
+logger = logging.getLogger("vera.preprocess")
+
+ANALYSIS_WIDTH = 1000
+SKEW_SAMPLE_POINTS = 20000
+
+
+def preprocess_enabled() -> bool:
+    return os.getenv("OCR_PREPROCESS", "0") == "1"
+
+
+def preprocess_settings() -> dict[str, float | bool]:
+    return {
+        "text_height": float(os.getenv("OCR_PREPROCESS_TEXT_HEIGHT", "32")),
+        "max_megapixels": float(os.getenv("OCR_PREPROCESS_MAX_MEGAPIXELS", "6")),
+        "max_skew": float(os.getenv("OCR_PREPROCESS_MAX_SKEW", "5")),
+        "binarize": os.getenv("OCR_PREPROCESS_BINARIZE", "0") == "1",
+    }
+
+
+@dataclass(frozen=True)
+class PageTransform:
+    scale: float
+    angle: float
+    source_size: tuple[int, int]
+    output_size: tuple[int, int]
+
+    def to_source(self, boxes: np.ndarray) -> np.ndarray:
+        if not len(boxes) or (self.scale == 1.0 and self.angle == 0.0):
+            return boxes
+        xs = np.stack([boxes[:, 0], boxes[:, 0] + boxes[:, 2], boxes[:, 0] + boxes[:, 2], boxes[:, 0]], axis=1)
+        ys = np.stack([boxes[:, 1], boxes[:, 1], boxes[:, 1] + boxes[:, 3], boxes[:, 1] + boxes[:, 3]], axis=1)
+        dx = xs - self.output_size[0] / 2
+        dy = ys - self.output_size[1] / 2
+        theta = math.radians(self.angle)
+        cos, sin = math.cos(theta), math.sin(theta)
+        source_x = (dx * cos - dy * sin + self.source_size[0] * self.scale / 2) / self.scale
+        source_y = (dx * sin + dy * cos + self.source_size[1] * self.scale / 2) / self.scale
+        left = np.clip(source_x.min(axis=1), 0, self.source_size[0])
+        top = np.clip(source_y.min(axis=1), 0, self.source_size[1])
+        right = np.clip(source_x.max(axis=1), 0, self.source_size[0])
+        bottom = np.clip(source_y.max(axis=1), 0, self.source_size[1])
+        return np.column_stack((left, top, right - left, bottom - top))
+
+    def map_tokens(self, tokens: TokenBatch) -> TokenBatch:
+        return TokenBatch(
+            tokens.texts,
+            tokens.confidences,
+            self.to_source(tokens.boxes),
+            tokens.line_indices,
+            tokens.token_indices,
+        )
+
+
+@dataclass
+class PreprocessedPage:
+    pixels: np.ndarray
+    transform: PageTransform
+
+
+def otsu_threshold(gray: np.ndarray) -> int:
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256, dtype=np.float64)
+    weight_low = np.cumsum(histogram)
+    weight_high = weight_low[-1] - weight_low
+    mass_low = np.cumsum(histogram * levels)
+    mean_low = mass_low / np.maximum(weight_low, 1)
+    mean_high = (mass_low[-1] - mass_low) / np.maximum(weight_high, 1)
+    variance = weight_low * weight_high * (mean_low - mean_high) ** 2
+    return int(np.argmax(variance))
+
+
+def _projection_profiles(xs: np.ndarray, ys: np.ndarray, angles: np.ndarray) -> np.ndarray:
+    radians = np.radians(angles)
+    projected = ys[None, :] * np.cos(radians)[:, None] - xs[None, :] * np.sin(radians)[:, None]
+    bins = np.floor(projected - projected.min()).astype(np.int64)
+    bin_count = int(bins.max()) + 1
+    offsets = bins + np.arange(len(angles))[:, None] * bin_count
+    return np.bincount(offsets.ravel(), minlength=len(angles) * bin_count).reshape(len(angles), bin_count)
+
+
+def estimate_layout(ink: np.ndarray, max_skew: float) -> tuple[float, float | None]:
+    ys, xs = np.nonzero(ink)
+    if len(xs) < 200:
+        return 0.0, None
+    if len(xs) > SKEW_SAMPLE_POINTS:
+        sample = np.random.default_rng(0).choice(len(xs), SKEW_SAMPLE_POINTS, replace=False)
+        xs, ys = xs[sample], ys[sample]
+    xs = xs.astype(np.float64) - xs.mean()
+    ys = ys.astype(np.float64) - ys.mean()
+
+    coarse = np.arange(-max_skew, max_skew + 0.01, 0.5)
+    coarse_best = coarse[np.argmax((_projection_profiles(xs, ys, coarse).astype(np.float64) ** 2).sum(axis=1))]
+    fine = np.arange(coarse_best - 0.5, coarse_best + 0.51, 0.1)
+    profiles = _projection_profiles(xs, ys, fine)
+    best_index = int(np.argmax((profiles.astype(np.float64) ** 2).sum(axis=1)))
+    angle = float(np.round(fine[best_index], 1))
+
+    rows = profiles[best_index] > profiles[best_index].max() * 0.05
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], rows.astype(np.int8), [0]))))
+    heights = edges[1::2] - edges[::2]
+    heights = heights[heights >= 2]
+    text_height = float(np.median(heights)) if len(heights) else None
+    return angle, text_height
+
+
+def preprocess_page(image: str | np.ndarray) -> PreprocessedPage:
+    start_time = time.perf_counter()
+    settings = preprocess_settings()
+    if isinstance(image, str):
+        source = open_upright(image)
+    else:
+        source = Image.fromarray(np.ascontiguousarray(image[:, :, ::-1]))
+    source_width, source_height = source.size
+
+    analysis_scale = min(1.0, ANALYSIS_WIDTH / source_width)
+    analysis = source.convert("L")
+    if analysis_scale < 1.0:
+        analysis = analysis.resize(
+            (max(1, round(source_width * analysis_scale)), max(1, round(source_height * analysis_scale))),
+            Image.Resampling.BOX,
+        )
+    gray = np.asarray(analysis)
+    angle, text_height = estimate_layout(gray < otsu_threshold(gray), float(settings["max_skew"]))
+    if abs(angle) < 0.2:
+        angle = 0.0
+
+    scale = math.sqrt(float(settings["max_megapixels"]) * 1e6 / (source_width * source_height))
+    if text_height is not None:
+        scale = min(scale, float(settings["text_height"]) / (text_height / analysis_scale))
+    scale = min(1.0, max(scale, float(os.getenv("OCR_PREPROCESS_MIN_SCALE", "0.25"))))
+
+    if scale >= 1.0:
+        scale = 1.0
+    if scale == 1.0 and not angle:
+        output_size = (source_width, source_height)
+        output = source
+    else:
+        theta = math.radians(angle)
+        cos, sin = math.cos(theta), math.sin(theta)
+        scaled_width, scaled_height = source_width * scale, source_height * scale
+        output_size = (
+            max(1, math.ceil(abs(scaled_width * cos) + abs(scaled_height * sin))),
+            max(1, math.ceil(abs(scaled_width * sin) + abs(scaled_height * cos))),
+        )
+        reduce_factor = max(1, int(0.5 / scale))
+        if reduce_factor > 1:
+            source = source.reduce(reduce_factor)
+        half_width, half_height = output_size[0] / 2, output_size[1] / 2
+        coefficients = [
+            cos / scale,
+            -sin / scale,
+            (-half_width * cos + half_height * sin) / scale + source_width / 2,
+            sin / scale,
+            cos / scale,
+            (-half_width * sin - half_height * cos) / scale + source_height / 2,
+        ]
+        output = source.transform(
+            output_size,
+            Image.Transform.AFFINE,
+            [value / reduce_factor for value in coefficients],
+            resample=Image.Resampling.BILINEAR,
+            fillcolor=(255, 255, 255),
+        )
+    if settings["binarize"]:
+        gray_output = np.asarray(output.convert("L"))
+        binary = np.where(gray_output < otsu_threshold(gray_output), 0, 255).astype(np.uint8)
+        pixels = np.ascontiguousarray(np.repeat(binary[:, :, None], 3, axis=2))
+    else:
+        pixels = np.asarray(Image.merge("RGB", output.split()[::-1]))
+
+    transform = PageTransform(
+        scale=scale,
+        angle=angle,
+        source_size=(source_width, source_height),
+        output_size=output_size,
+    )
+    OCR_PREPROCESS_DURATION.observe(time.perf_counter() - start_time)
+    OCR_PREPROCESS_PIXEL_RATIO.observe(output_size[0] * output_size[1] / (source_width * source_height))
+    logger.info(
+        "Page preprocessed scale=%.2f angle=%.1f text_height=%s size=%sx%s",
+        scale,
+        angle,
+        text_height,
+        output_size[0],
+        output_size[1],
+    )
+    return PreprocessedPage(pixels=pixels, transform=transform)
@@ -6,7 +6,7 @@ from datetime import timedelta
 
 from sqlalchemy import delete, func, select
 
-from app.db.session import Base, engine, get_session
+from app.db.session import get_session
 from app.models.documents import AuditLog, Correction, Document, DocumentPage, Token
 from app.schemas.documents import DocumentStatus
 from app.utils.time import utcnow
@@ -21,7 +21,6 @@ def _archive_file(source_path: str, archive_root: str, document_id: str) -> None
 
 
 def cleanup_documents() -> dict[str, int | str]:
-    Base.metadata.create_all(bind=engine)
     retention_days = int(os.getenv("RETENTION_DAYS", "30"))
     if retention_days <= 0:
         return {"status": "disabled", "deleted": 0}
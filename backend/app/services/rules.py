@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import json
+import os
+
+_RULES_CACHE: dict = {}
+
+
+def load_rules() -> dict:
+    global _RULES_CACHE
+    if _RULES_CACHE:
+        return _RULES_CACHE
+    rules_path = os.getenv("EXTRACTION_RULES_PATH", "app/config/extraction_rules.json")
+    try:
+        with open(rules_path, "r", encoding="utf-8") as handle:
+            _RULES_CACHE = json.load(handle)
+    except FileNotFoundError:
+        _RULES_CACHE = {}
+    return _RULES_CACHE
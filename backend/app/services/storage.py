@@ -4,9 +4,14 @@ import logging
 import os
 import shutil
 import uuid
-from typing import BinaryIO, Protocol
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Iterator, Protocol
 
+import numpy as np
 from fastapi import UploadFile
+from PIL import Image, ImageOps
+
+from app.utils.metrics import PDF_RASTER_PEAK_BYTES
 
 SUPPORTED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
 SUPPORTED_PDF_EXTENSIONS = {".pdf"}
@@ -20,6 +25,14 @@ def ensure_data_dir() -> str:
     return data_dir
 
 
+def source_pdf_path(document_id: str) -> str | None:
+    for extension in SUPPORTED_PDF_EXTENSIONS:
+        candidate = os.path.join(ensure_data_dir(), f"{document_id}{extension}")
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
 class UploadLike(Protocol):
     filename: str | None
     file: BinaryIO
@@ -61,7 +74,100 @@ def _run_virus_scan(path: str) -> None:
         raise ValueError("virus_detected")
 
 
-def save_upload(file: UploadFile | UploadLike) -> tuple[str, str, str, list[dict]]:
+_png_executor: ThreadPoolExecutor | None = None
+
+
+def _encode_png(image: Image.Image, image_path: str) -> None:
+    temp_path = f"{image_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        image.save(temp_path, "PNG")
+        os.replace(temp_path, image_path)
+    finally:
+        image.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _encode_png_async(image: Image.Image, image_path: str) -> Future:
+    global _png_executor
+    if _png_executor is None:
+        _png_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("PDF_ENCODE_THREADS", "1")), thread_name_prefix="vera-png"
+        )
+    return _png_executor.submit(_encode_png, image, image_path)
+
+
+def bgr_pixels(image: Image.Image) -> np.ndarray:
+    rgb = image if image.mode == "RGB" else image.convert("RGB")
+    return np.ascontiguousarray(np.asarray(rgb)[:, :, ::-1])
+
+
+def open_upright(image_path: str) -> Image.Image:
+    with Image.open(image_path) as opened:
+        return ImageOps.exif_transpose(opened).convert("RGB")
+
+
+def page_image_filename(document_id: str, page_index: int) -> str:
+    return f"{document_id}-page-{page_index}.png"
+
+
+def rasterize_pdf(
+    document_id: str, pdf_path: str, data_dir: str, keep_pixels: int = 0, start_page: int = 0
+) -> Iterator[dict]:
+    try:
+        from pdf2image import convert_from_path, pdfinfo_from_path
+    except ImportError as exc:  # pragma: no cover
+        raise RuntimeError("pdf_support_not_installed") from exc
+
+    dpi = int(os.getenv("PDF_RASTER_DPI", "200"))
+    thread_count = int(os.getenv("PDF_RASTER_THREADS", "1"))
+    window = max(1, int(os.getenv("PDF_RASTER_WINDOW", "1")))
+    try:
+        page_count = int(pdfinfo_from_path(pdf_path)["Pages"])
+    except Exception as exc:
+        logger.exception("PDF info failed pdf_path=%s", pdf_path)
+        raise RuntimeError("pdf_no_pages") from exc
+    if page_count <= 0:
+        raise RuntimeError("pdf_no_pages")
+
+    peak_bytes = 0
+    for first_page in range(start_page + 1, page_count + 1, window):
+        last_page = min(first_page + window - 1, page_count)
+        images = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            first_page=first_page,
+            last_page=last_page,
+            thread_count=thread_count,
+            fmt="png",
+        )
+        peak_bytes = max(peak_bytes, sum(image.width * image.height * len(image.getbands()) for image in images))
+        for offset, image in enumerate(images):
+            index = first_page - 1 + offset
+            image_filename = page_image_filename(document_id, index)
+            image_path = os.path.join(data_dir, image_filename)
+            image_width, image_height = image.size
+            page = {
+                "page_index": index,
+                "image_path": image_path,
+                "image_url": f"/files/{image_filename}",
+                "image_width": image_width,
+                "image_height": image_height,
+                "page_count": page_count,
+            }
+            if index < keep_pixels:
+                page["pixels"] = bgr_pixels(image)
+                page["encoded"] = _encode_png_async(image, image_path)
+            else:
+                image.save(image_path, "PNG")
+                image.close()
+            yield page
+        del images
+    PDF_RASTER_PEAK_BYTES.observe(peak_bytes)
+    logger.debug("PDF rasterized pdf_path=%s pages=%s peak_bytes=%s", pdf_path, page_count, peak_bytes)
+
+
+def store_upload(file: UploadFile | UploadLike) -> tuple[str, str, str]:
     data_dir = ensure_data_dir()
     extension = os.path.splitext(file.filename or "")[-1].lower()
     logger.debug("Save upload filename=%s extension=%s", file.filename, extension)
@@ -81,39 +187,38 @@ def save_upload(file: UploadFile | UploadLike) -> tuple[str, str, str, list[dict
     original_path = os.path.join(data_dir, filename)
     with open(original_path, "wb") as buffer:
         shutil.copyfileobj(file.file, buffer)
+    if extension in SUPPORTED_PDF_EXTENSIONS:
+        return document_id, original_path, f"/files/{page_image_filename(document_id, 0)}"
+    return document_id, original_path, f"/files/{filename}"
 
+
+def split_pages(document_id: str, source_path: str, keep_pixels: int = 0, start_page: int = 0) -> Iterator[dict]:
     try:
-        _run_virus_scan(original_path)
+        _run_virus_scan(source_path)
     except ValueError:
-        os.remove(original_path)
+        os.remove(source_path)
         raise
 
+    extension = os.path.splitext(source_path)[-1].lower()
     if extension in SUPPORTED_PDF_EXTENSIONS:
-        try:
-            from pdf2image import convert_from_path
-        except ImportError as exc:  # pragma: no cover
-            raise RuntimeError("pdf_support_not_installed") from exc
-
-        images = convert_from_path(original_path, fmt="png")
-        if not images:
-            raise RuntimeError("pdf_no_pages")
-        logger.info("PDF converted filename=%s pages=%s", file.filename, len(images))
-        pages: list[dict] = []
-        for index, image in enumerate(images):
-            image_filename = f"{document_id}-page-{index}.png"
-            image_path = os.path.join(data_dir, image_filename)
-            image.save(image_path, "PNG")
-            pages.append(
-                {
-                    "page_index": index,
-                    "image_path": image_path,
-                    "image_url": f"/files/{image_filename}",
-                }
-            )
-
-        first_page = pages[0]
-        return document_id, first_page["image_path"], first_page["image_url"], pages
-
-    image_url = f"/files/{filename}"
-    pages = [{"page_index": 0, "image_path": original_path, "image_url": image_url}]
-    return document_id, original_path, image_url, pages
+        yield from rasterize_pdf(document_id, source_path, os.path.dirname(source_path), keep_pixels, start_page)
+        return
+
+    with Image.open(source_path) as image:
+        image_width, image_height = image.size
+    yield {
+        "page_index": 0,
+        "image_path": source_path,
+        "image_url": f"/files/{os.path.basename(source_path)}",
+        "image_width": image_width,
+        "image_height": image_height,
+        "page_count": 1,
+    }
+
+
+def save_upload(file: UploadFile | UploadLike) -> tuple[str, str, str, list[dict]]:
+    document_id, original_path, image_url = store_upload(file)
+    pages = list(split_pages(document_id, original_path))
+    logger.info("Upload split filename=%s pages=%s", file.filename, len(pages))
+    first_page = pages[0]
+    return document_id, first_page["image_path"], first_page["image_url"], pages
@@ -10,27 +10,13 @@ import httpx
 import time
 from sqlalchemy import select, update
 
-from app.db.session import Base, engine, get_session
+from app.db.session import get_session
 from app.models.documents import AuditLog, Document, DocumentPage
 from app.schemas.documents import DocumentStatus
+from app.services.events import publish_status_change
+from app.services.rules import load_rules
 from app.utils.metrics import SUMMARY_DURATION, SUMMARY_LLM_FAILURES
 
-_RULES_CACHE: dict = {}
-
-
-def _load_rules() -> dict:
-    global _RULES_CACHE
-    if _RULES_CACHE:
-        return _RULES_CACHE
-    rules_path = os.getenv("EXTRACTION_RULES_PATH", "app/config/extraction_rules.json")
-    try:
-        with open(rules_path, "r", encoding="utf-8") as handle:
-            _RULES_CACHE = json.load(handle)
-    except FileNotFoundError:
-        _RULES_CACHE = {}
-    return _RULES_CACHE
-
-
 def _detect_doc_type(lines: list[str], rules: dict) -> str:
     keywords = rules.get("doc_type_keywords", {})
     normalized_lines = "\n".join(line.lower() for line in lines)
@@ -59,7 +45,7 @@ def _build_summary_from_text(
     raw_lines = validated_text.splitlines()
     lines = [line.strip() for line in raw_lines if line.strip()]
 
-    rules = _load_rules()
+    rules = load_rules()
     doc_type = doc_type_override or _detect_doc_type(lines, rules)
     locale = locale_override or _detect_locale(lines)
 
@@ -436,7 +422,6 @@ def _build_summary_from_text(
 
 
 def build_summary(document_id: str, model_override: str | None = None) -> dict:
-    Base.metadata.create_all(bind=engine)
     logger.info("Build summary document_id=%s", document_id)
     start_time = time.perf_counter()
     with get_session() as session:
@@ -491,6 +476,7 @@ def build_summary(document_id: str, model_override: str | None = None) -> dict:
         )
         session.commit()
 
+    publish_status_change(document_id)
     SUMMARY_DURATION.labels("document").observe(time.perf_counter() - start_time)
     return {
         "bullet_summary": bullet_summary,
@@ -500,7 +486,6 @@ def build_summary(document_id: str, model_override: str | None = None) -> dict:
 
 
 def build_page_summary(document_id: str, page_id: str, model_override: str | None = None) -> dict:
-    Base.metadata.create_all(bind=engine)
     logger.info("Build summary document_id=%s page_id=%s", document_id, page_id)
     start_time = time.perf_counter()
     with get_session() as session:
@@ -537,6 +522,7 @@ def build_page_summary(document_id: str, page_id: str, model_override: str | Non
         )
         session.commit()
 
+    publish_status_change(document_id, page_id)
     SUMMARY_DURATION.labels("page").observe(time.perf_counter() - start_time)
     return {
         "bullet_summary": bullet_summary,
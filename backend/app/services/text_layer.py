@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import html
+import logging
+import re
+import subprocess
+
+import numpy as np
+
+from app.services.token_batch import TokenBatch
+
+PAGE_PATTERN = re.compile(r'<page width="([\d.]+)" height="([\d.]+)">')
+WORD_PATTERN = re.compile(
+    r'<word xMin="([\d.-]+)" yMin="([\d.-]+)" xMax="([\d.-]+)" yMax="([\d.-]+)">(.*?)</word>',
+    re.DOTALL,
+)
+logger = logging.getLogger("vera.text_layer")
+
+
+def parse_bbox_layout(markup: str, image_width: int, image_height: int) -> TokenBatch:
+    page_match = PAGE_PATTERN.search(markup)
+    if page_match is None:
+        return TokenBatch.empty()
+    page_width, page_height = float(page_match.group(1)), float(page_match.group(2))
+    if page_width <= 0 or page_height <= 0:
+        return TokenBatch.empty()
+
+    texts: list[str] = []
+    corners: list[tuple[str, str, str, str]] = []
+    for match in WORD_PATTERN.finditer(markup):
+        text = html.unescape(match.group(5)).strip()
+        if not text:
+            continue
+        texts.append(text)
+        corners.append(match.group(1, 2, 3, 4))
+    if not texts:
+        return TokenBatch.empty()
+
+    x_min, y_min, x_max, y_max = np.array(corners, dtype=np.float64).T
+    scale_x = image_width / page_width
+    scale_y = image_height / page_height
+    boxes = np.column_stack(
+        (x_min * scale_x, y_min * scale_y, (x_max - x_min) * scale_x, (y_max - y_min) * scale_y)
+    )
+    return TokenBatch(texts, np.ones(len(texts), dtype=np.float64), boxes)
+
+
+def extract_text_layer(pdf_path: str, page_index: int, image_width: int, image_height: int) -> TokenBatch:
+    page_number = str(page_index + 1)
+    command = ["pdftotext", "-bbox", "-f", page_number, "-l", page_number, pdf_path, "-"]
+    try:
+        completed = subprocess.run(command, capture_output=True, check=True, timeout=60)
+    except FileNotFoundError as exc:
+        raise RuntimeError("pdf_support_not_installed") from exc
+    except subprocess.CalledProcessError as exc:
+        logger.warning("Text layer extraction failed pdf_path=%s page=%s", pdf_path, page_number)
+        raise RuntimeError("text_layer_failed") from exc
+    except subprocess.TimeoutExpired as exc:
+        logger.warning("Text layer extraction timed out pdf_path=%s page=%s", pdf_path, page_number)
+        raise RuntimeError("text_layer_failed") from exc
+    return parse_bbox_layout(completed.stdout.decode("utf-8", "replace"), image_width, image_height)
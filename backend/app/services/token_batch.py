@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+LINE_THRESHOLD_MIN = 12.0
+LINE_THRESHOLD_HEIGHT_RATIO = 0.5
+
+
+def _line_numbers(sorted_ys: list[float], threshold: float) -> np.ndarray:
+    lines = np.empty(len(sorted_ys), dtype=np.int64)
+    line = 0
+    anchor = sorted_ys[0]
+    for index, y in enumerate(sorted_ys):
+        if y - anchor > threshold:
+            line += 1
+            anchor = y
+        else:
+            anchor = (anchor + y) / 2
+        lines[index] = line
+    return lines
+
+
+@dataclass(slots=True)
+class TokenBatch:
+    texts: list[str]
+    confidences: np.ndarray
+    boxes: np.ndarray
+    line_indices: np.ndarray | None = None
+    token_indices: np.ndarray | None = None
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @classmethod
+    def empty(cls) -> TokenBatch:
+        return cls([], np.zeros(0, dtype=np.float64), np.zeros((0, 4), dtype=np.float64))
+
+    @classmethod
+    def from_columns(
+        cls, texts: list[str], confidences: Sequence[float], boxes: Sequence[Sequence[float]]
+    ) -> TokenBatch:
+        if not texts:
+            return cls.empty()
+        return cls(
+            list(texts),
+            np.asarray(confidences, dtype=np.float64),
+            np.asarray(boxes, dtype=np.float64).reshape(-1, 4),
+        )
+
+    @classmethod
+    def from_polygons(
+        cls, polygons: Sequence[Sequence[Sequence[float]]], texts: list[str], confidences: Sequence[float]
+    ) -> TokenBatch:
+        if not texts:
+            return cls.empty()
+        points = np.asarray(polygons, dtype=np.float64)
+        if points.ndim == 3:
+            mins = points.min(axis=1)
+            maxs = points.max(axis=1)
+        else:
+            ragged = [np.asarray(polygon, dtype=np.float64) for polygon in polygons]
+            mins = np.array([polygon.min(axis=0) for polygon in ragged])
+            maxs = np.array([polygon.max(axis=0) for polygon in ragged])
+        boxes = np.column_stack((mins, maxs - mins))
+        return cls(list(texts), np.asarray(confidences, dtype=np.float64), boxes)
+
+    @classmethod
+    def from_dicts(cls, tokens: list[dict]) -> TokenBatch:
+        return cls.from_columns(
+            [token["text"] for token in tokens],
+            [token["confidence"] for token in tokens],
+            [token["bbox"] for token in tokens],
+        )
+
+    def to_dicts(self) -> list[dict]:
+        confidences = self.confidences.tolist()
+        boxes = [tuple(box) for box in self.boxes.tolist()]
+        if self.line_indices is None or self.token_indices is None:
+            return [
+                {"text": text, "confidence": confidence, "bbox": bbox}
+                for text, confidence, bbox in zip(self.texts, confidences, boxes)
+            ]
+        return [
+            {
+                "text": text,
+                "confidence": confidence,
+                "bbox": bbox,
+                "line_index": line_index,
+                "token_index": token_index,
+                "line_id": f"line-{line_index}",
+            }
+            for text, confidence, bbox, line_index, token_index in zip(
+                self.texts, confidences, boxes, self.line_indices.tolist(), self.token_indices.tolist()
+            )
+        ]
+
+    def take(self, order: np.ndarray) -> TokenBatch:
+        return TokenBatch(
+            [self.texts[index] for index in order.tolist()],
+            self.confidences[order],
+            self.boxes[order],
+            None if self.line_indices is None else self.line_indices[order],
+            None if self.token_indices is None else self.token_indices[order],
+        )
+
+    def line_threshold(self) -> float:
+        if not len(self):
+            return LINE_THRESHOLD_MIN
+        return max(LINE_THRESHOLD_MIN, LINE_THRESHOLD_HEIGHT_RATIO * float(np.median(self.boxes[:, 3])))
+
+    def group_lines(self) -> TokenBatch:
+        if not len(self):
+            return TokenBatch.empty()
+        xs = self.boxes[:, 0]
+        ys = self.boxes[:, 1]
+        by_position = np.lexsort((xs, ys))
+        sorted_lines = _line_numbers(ys[by_position].tolist(), self.line_threshold())
+
+        within_line = np.lexsort((xs[by_position], sorted_lines))
+        order = by_position[within_line]
+        ordered_lines = sorted_lines[within_line]
+        line_starts = np.flatnonzero(np.concatenate(([True], ordered_lines[1:] != ordered_lines[:-1])))
+        line_lengths = np.diff(np.append(line_starts, len(order)))
+        token_indices = np.arange(len(order)) - np.repeat(line_starts, line_lengths)
+
+        grouped = self.take(order)
+        grouped.line_indices = ordered_lines
+        grouped.token_indices = token_indices
+        return grouped
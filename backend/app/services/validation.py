@@ -6,9 +6,10 @@ import logging
 import uuid
 from sqlalchemy import func, select
 
-from app.db.session import Base, engine, get_session
+from app.db.session import get_session
 from app.models.documents import AuditLog, Correction, Document, DocumentPage, Token
 from app.schemas.documents import DocumentStatus
+from app.services.events import publish_status_change
 from app.utils.time import utcnow
 
 
@@ -19,7 +20,6 @@ def apply_corrections(
     review_complete: bool,
     structured_fields: dict[str, str] | None = None,
 ) -> tuple[str, DocumentStatus, datetime | None]:
-    Base.metadata.create_all(bind=engine)
     corrections_by_token = {item["token_id"]: item["corrected_text"] for item in corrections}
     reviewed_set = set(reviewed_token_ids) | set(corrections_by_token.keys())
 
@@ -137,6 +137,7 @@ def apply_corrections(
 
         session.commit()
 
+    publish_status_change(document_id)
     return validated_text, status_value, validated_at
 logger = logging.getLogger("vera.validation")
 
@@ -150,7 +151,6 @@ def apply_page_corrections(
     structured_fields: dict[str, str] | None = None,
     page_version: int | None = None,
 ) -> tuple[str, DocumentStatus, datetime | None]:
-    Base.metadata.create_all(bind=engine)
     corrections_by_token = {item["token_id"]: item["corrected_text"] for item in corrections}
     reviewed_set = set(reviewed_token_ids) | set(corrections_by_token.keys())
 
@@ -323,4 +323,5 @@ def apply_page_corrections(
             )
         session.commit()
 
+    publish_status_change(document_id, page_id)
     return validated_text, status_value, validated_at
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 REQUEST_COUNT = Counter(
     "vera_http_requests_total",
@@ -17,6 +17,122 @@ OCR_DURATION = Histogram(
     "OCR page processing duration",
     ["status"],
 )
+OCR_PERSIST_DURATION = Histogram(
+    "vera_ocr_persist_duration_seconds",
+    "OCR page persistence duration (page update, tokens and audit entry)",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+OCR_PAGE_SOURCE = Counter(
+    "vera_ocr_page_source_total",
+    "Pages by token source",
+    ["source"],
+)
+OCR_PREPROCESS_DURATION = Histogram(
+    "vera_ocr_preprocess_duration_seconds",
+    "Page preprocessing duration (deskew, downscale, binarize)",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+OCR_PREPROCESS_PIXEL_RATIO = Histogram(
+    "vera_ocr_preprocess_pixel_ratio",
+    "Pixels sent to OCR after preprocessing as a fraction of the source page",
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5),
+)
+OCR_BATCH_CROPS = Histogram(
+    "vera_ocr_batch_crops",
+    "Text crops per batched recognizer call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+OCR_BATCH_PAGES = Histogram(
+    "vera_ocr_batch_pages",
+    "Pages sharing one batched recognizer call",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16),
+)
+OCR_BATCH_WAIT = Histogram(
+    "vera_ocr_batch_wait_seconds",
+    "Time the oldest page in a recognition batch waited for the batch to fill",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5),
+)
+OCR_EXTRACT_DURATION = Histogram(
+    "vera_ocr_extract_duration_seconds",
+    "OCR engine inference time per page, split by whether the angle classifier ran",
+    ["angle_cls"],
+)
+OCR_ORIENTATION_PAGES = Counter(
+    "vera_ocr_orientation_pages_total",
+    "Pages by how their orientation was established before OCR",
+    ["source"],
+)
+OCR_ORIENTATION_PROBE_DURATION = Histogram(
+    "vera_ocr_orientation_probe_duration_seconds",
+    "Time spent probing page orientation from a low-resolution copy",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+OCR_REFINE_TOKENS = Counter(
+    "vera_ocr_refine_tokens_total",
+    "Low-confidence tokens re-recognized from upsampled crops",
+    ["result"],
+)
+OCR_REFINE_DURATION = Histogram(
+    "vera_ocr_refine_duration_seconds",
+    "Per-page duration of the low-confidence refinement pass",
+)
+REOCR_DURATION = Histogram(
+    "vera_reocr_duration_seconds",
+    "Interactive region re-OCR request duration",
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0),
+)
+OCR_ENGINE_LOAD_DURATION = Histogram(
+    "vera_ocr_engine_load_duration_seconds",
+    "OCR engine construction duration",
+)
+FIRST_PAGE_REVIEWABLE_DURATION = Histogram(
+    "vera_first_page_reviewable_seconds",
+    "Time from upload until the first page has OCR tokens and can be reviewed",
+    buckets=(1, 2, 5, 10, 20, 30, 60, 120, 300, 600),
+)
+OCR_ENGINE_WARMUP_DURATION = Histogram(
+    "vera_ocr_engine_warmup_duration_seconds",
+    "Worker process OCR warm-up duration (engine load and dummy inference)",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0),
+)
+OCR_WORKER_READY = Gauge(
+    "vera_ocr_worker_ready",
+    "Whether this worker process has finished OCR warm-up",
+)
+OCR_ENGINE_LEASES = Counter(
+    "vera_ocr_engine_leases_total",
+    "OCR engine leases by pool state",
+    ["state"],
+)
+OCR_ENGINE_POOL_IDLE = Gauge(
+    "vera_ocr_engine_pool_idle",
+    "Warm OCR engines idle in the pool",
+    ["language"],
+)
+OCR_ENGINE_LANGUAGES_LOADED = Gauge(
+    "vera_ocr_engine_languages_loaded",
+    "OCR languages with a loaded engine pool in this process",
+)
+OCR_ENGINE_MODEL_BYTES = Gauge(
+    "vera_ocr_engine_model_rss_bytes",
+    "RSS growth attributed to loading OCR engines",
+    ["language"],
+)
+OCR_ENGINE_EVICTIONS = Counter(
+    "vera_ocr_engine_evictions_total",
+    "OCR language pools evicted to stay under the model RSS budget",
+    ["language"],
+)
+OCR_CACHE_LOOKUPS = Counter(
+    "vera_ocr_cache_lookups_total",
+    "OCR result cache lookups",
+    ["result"],
+)
+PDF_RASTER_PEAK_BYTES = Histogram(
+    "vera_pdf_raster_peak_image_bytes",
+    "Peak decoded page image bytes held while rasterizing a PDF",
+    buckets=(2**20, 2**22, 2**24, 2**25, 2**26, 2**27, 2**28, 2**29, 2**30, 2**31),
+)
 SUMMARY_DURATION = Histogram(
     "vera_summary_duration_seconds",
     "Summary generation duration",
@@ -1,20 +1,33 @@
 from __future__ import annotations
 
+import logging
 import os
-from datetime import timedelta
+import time
+import uuid
+from datetime import timedelta, timezone
 
 try:
     from celery import Celery
+    from celery.signals import worker_init, worker_process_init, worker_ready
 except ImportError:  # pragma: no cover
     Celery = None
+    worker_init = None
+    worker_process_init = None
+    worker_ready = None
 
-from app.db.session import Base, engine, get_session
-from sqlalchemy import select
+import numpy as np
+
+from app.db.session import engine, ensure_schema, get_session
+from sqlalchemy import func, select
 
 from app.models.documents import AuditLog, Document, DocumentPage
 from app.schemas.documents import DocumentStatus
-from app.services.ocr import run_ocr_for_page
+from app.services.events import publish_status_change
+from app.services.ocr import run_ocr_for_page, warm_engine_pool
 from app.services.retention import cleanup_documents
+from app.services.storage import source_pdf_path, split_pages
+from app.utils.metrics import FIRST_PAGE_REVIEWABLE_DURATION, OCR_ENGINE_WARMUP_DURATION, OCR_WORKER_READY
+from app.utils.time import utcnow
 
 if Celery is None:  # pragma: no cover
     class _CeleryStub:
@@ -42,6 +55,8 @@ else:
         result_serializer="json",
         accept_content=["json"],
         task_track_started=True,
+        worker_prefetch_multiplier=int(os.getenv("CELERY_PREFETCH_MULTIPLIER", "1")),
+        worker_proc_alive_timeout=float(os.getenv("WORKER_PROC_ALIVE_TIMEOUT", "120")),
     )
     cleanup_interval_minutes = int(os.getenv("RETENTION_INTERVAL_MINUTES", "1440"))
     if cleanup_interval_minutes > 0:
@@ -54,14 +69,238 @@ else:
             }
         )
 
+logger = logging.getLogger("vera.worker")
+
+IN_PROCESS_POOLS = ("celery.concurrency.thread", "celery.concurrency.solo")
+
+
+def _bootstrap_schema(**_kwargs) -> None:
+    ready_file = os.getenv("WORKER_READY_FILE")
+    if ready_file and os.path.exists(ready_file):
+        os.remove(ready_file)
+    ensure_schema()
+    engine.dispose()
+
+
+def _mark_ready() -> None:
+    OCR_WORKER_READY.set(1)
+    ready_file = os.getenv("WORKER_READY_FILE")
+    if ready_file:
+        with open(ready_file, "a", encoding="utf-8") as handle:
+            handle.write(f"{os.getpid()}\n")
+
+
+def _warm_ocr_engines(**_kwargs) -> None:
+    OCR_WORKER_READY.set(0)
+    if os.getenv("OCR_ENGINE_PRELOAD", "1") != "1":
+        _mark_ready()
+        return
+    start_time = time.perf_counter()
+    try:
+        warm_count = warm_engine_pool()
+    except Exception:  # pragma: no cover
+        logger.exception("OCR engine preload failed")
+        return
+    duration = time.perf_counter() - start_time
+    OCR_ENGINE_WARMUP_DURATION.observe(duration)
+    _mark_ready()
+    logger.info("OCR engines warmed count=%s duration_s=%.2f", warm_count, duration)
+
+
+def _warm_in_process_pool(sender=None, **_kwargs) -> None:
+    if type(getattr(sender, "pool", None)).__module__ in IN_PROCESS_POOLS:
+        _warm_ocr_engines()
+
+
+if worker_init is not None:
+    worker_init.connect(_bootstrap_schema, weak=False)
+if worker_process_init is not None:
+    worker_process_init.connect(_warm_ocr_engines, weak=False)
+if worker_ready is not None:
+    worker_ready.connect(_warm_in_process_pool, weak=False)
+
+
+def _mark_failed(document_id: str, detail: str, page_id: str | None = None) -> None:
+    with get_session() as session:
+        session.execute(
+            Document.__table__.update()
+            .where(Document.id == document_id)
+            .where(Document.status != DocumentStatus.canceled.value)
+            .values(status=DocumentStatus.failed.value, processing_task_id=None)
+        )
+        page_query = DocumentPage.__table__.update().where(DocumentPage.document_id == document_id)
+        if page_id is not None:
+            page_query = page_query.where(DocumentPage.id == page_id)
+        session.execute(
+            page_query.where(DocumentPage.status != DocumentStatus.canceled.value).values(
+                status=DocumentStatus.failed.value, processing_task_id=None
+            )
+        )
+        session.add(
+            AuditLog(
+                id=os.urandom(16).hex(),
+                document_id=document_id,
+                page_id=page_id,
+                event_type="ocr_failed",
+                detail=detail,
+            )
+        )
+        session.commit()
+    publish_status_change(document_id, page_id)
+
+
+def _page_priority(page_index: int) -> int:
+    if page_index == 0:
+        return int(os.getenv("FIRST_PAGE_TASK_PRIORITY", "0"))
+    return int(os.getenv("PAGE_TASK_PRIORITY", "6"))
+
+
+def _dispatch_page(document_id: str, page_id: str, task_id: str, page_index: int) -> None:
+    process_page.apply_async(args=[document_id, page_id], task_id=task_id, priority=_page_priority(page_index))
+
+
+def _observe_first_page(document_id: str) -> None:
+    with get_session() as session:
+        created_at = session.execute(select(Document.created_at).where(Document.id == document_id)).scalar_one_or_none()
+    if created_at is None:
+        return
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    FIRST_PAGE_REVIEWABLE_DURATION.observe(max(0.0, (utcnow() - created_at).total_seconds()))
+
+
+def _split_document_pages(document_id: str, source_path: str, start_page: int = 0) -> int:
+    page_count = 0
+    inline_first_page = 1 if os.getenv("OCR_INLINE_FIRST_PAGE", "1") == "1" else 0
+    for page in split_pages(document_id, source_path, keep_pixels=inline_first_page, start_page=start_page):
+        page_id = uuid.uuid4().hex
+        task_id = None if "pixels" in page else uuid.uuid4().hex
+        with get_session() as session:
+            session.add(
+                DocumentPage(
+                    id=page_id,
+                    document_id=document_id,
+                    page_index=page["page_index"],
+                    image_path=page["image_path"],
+                    image_width=page["image_width"],
+                    image_height=page["image_height"],
+                    status=DocumentStatus.processing.value,
+                    processing_task_id=task_id,
+                )
+            )
+            document_values: dict[str, object] = {"page_count": page["page_count"]}
+            if page["page_index"] == 0:
+                document_values["image_path"] = page["image_path"]
+            session.execute(
+                Document.__table__.update().where(Document.id == document_id).values(**document_values)
+            )
+            session.commit()
+        page_count += 1
+        if task_id is not None:
+            publish_status_change(document_id, page_id)
+            _dispatch_page(document_id, page_id, task_id, page["page_index"])
+            continue
+
+        try:
+            result = _ocr_page(
+                document_id,
+                page_id,
+                page["image_path"],
+                page["page_index"],
+                (page["image_width"], page["image_height"]),
+                pixels=page.pop("pixels"),
+                publish=False,
+            )
+        except Exception:
+            page["encoded"].exception()
+            publish_status_change(document_id, page_id)
+            raise
+        page["encoded"].result()
+        publish_status_change(document_id, page_id)
+        if result == {"status": "completed"}:
+            _observe_first_page(document_id)
+    logger.info("Pages split document_id=%s count=%s", document_id, page_count)
+    return page_count
+
+
+def _ocr_page(
+    document_id: str,
+    page_id: str,
+    image_path: str,
+    page_index: int,
+    image_size: tuple[int, int] | None,
+    pixels: np.ndarray | None = None,
+    publish: bool = True,
+) -> dict[str, str]:
+    image_url = f"/files/{os.path.basename(image_path)}"
+    try:
+        result = run_ocr_for_page(
+            document_id,
+            page_id,
+            image_path,
+            image_url,
+            pdf_path=source_pdf_path(document_id),
+            page_index=page_index,
+            image_size=image_size,
+            pixels=pixels,
+        )
+    except Exception as exc:
+        logger.exception("Page OCR failed document_id=%s page_id=%s", document_id, page_id)
+        _mark_failed(document_id, str(exc), page_id=page_id)
+        raise
+    if result.status == DocumentStatus.canceled:
+        return {"status": "canceled"}
+
+    with get_session() as session:
+        session.execute(
+            DocumentPage.__table__.update()
+            .where(DocumentPage.id == page_id)
+            .values(processing_task_id=None)
+        )
+        session.commit()
+    if publish:
+        publish_status_change(document_id, page_id)
+        if page_index == 0:
+            _observe_first_page(document_id)
+    return {"status": "completed"}
+
+
+def _dispatch_pending_pages(document_id: str) -> int:
+    with get_session() as session:
+        pages = session.execute(
+            select(DocumentPage.id, DocumentPage.page_index)
+            .where(DocumentPage.document_id == document_id)
+            .where(DocumentPage.status == DocumentStatus.processing.value)
+            .order_by(DocumentPage.page_index.asc())
+        ).all()
+        page_task_ids = {page_id: uuid.uuid4().hex for page_id, _page_index in pages}
+        for page_id, task_id in page_task_ids.items():
+            session.execute(
+                DocumentPage.__table__.update()
+                .where(DocumentPage.id == page_id)
+                .values(processing_task_id=task_id)
+            )
+        session.commit()
+
+    for page_id, page_index in pages:
+        _dispatch_page(document_id, page_id, page_task_ids[page_id], page_index)
+    logger.info("Pages dispatched document_id=%s count=%s", document_id, len(pages))
+    return len(pages)
+
 
 @celery_app.task(name="vera.process_document")
 def process_document(document_id: str) -> dict[str, str]:
-    Base.metadata.create_all(bind=engine)
     with get_session() as session:
         document = session.get(Document, document_id)
         if document is None:
             return {"status": "missing"}
+        source_path = str(getattr(document, "image_path"))
+        expected_pages = int(getattr(document, "page_count") or 0)
+        existing_pages, last_page_index = session.execute(
+            select(func.count(DocumentPage.id), func.max(DocumentPage.page_index)).where(
+                DocumentPage.document_id == document_id
+            )
+        ).one()
         session.execute(
             Document.__table__.update()
             .where(Document.id == document_id)
@@ -70,55 +309,91 @@ def process_document(document_id: str) -> dict[str, str]:
         session.execute(
             DocumentPage.__table__.update()
             .where(DocumentPage.document_id == document_id)
+            .where(DocumentPage.status != DocumentStatus.ocr_done.value)
             .values(status=DocumentStatus.processing.value)
         )
         session.commit()
 
     try:
-        with get_session() as session:
-            pages = session.execute(
-                select(DocumentPage)
-                .where(DocumentPage.document_id == document_id)
-                .order_by(DocumentPage.page_index.asc())
-            ).scalars().all()
-
-        for page in pages:
-            image_path = str(getattr(page, "image_path"))
-            image_url = f"/files/{os.path.basename(image_path)}"
-            result = run_ocr_for_page(document_id, page.id, image_path, image_url)
-            if result.status == DocumentStatus.canceled:
-                return {"status": "canceled"}
+        if not existing_pages:
+            _split_document_pages(document_id, source_path)
+        else:
+            _dispatch_pending_pages(document_id)
+            if existing_pages < expected_pages:
+                logger.info(
+                    "Resuming page split document_id=%s pages=%s expected=%s",
+                    document_id,
+                    existing_pages,
+                    expected_pages,
+                )
+                _split_document_pages(
+                    document_id, source_pdf_path(document_id) or source_path, start_page=last_page_index + 1
+                )
 
-        with get_session() as session:
-            session.execute(
-                Document.__table__.update()
-                .where(Document.id == document_id)
-                .values(status=DocumentStatus.ocr_done.value, processing_task_id=None)
-            )
-            session.commit()
-        return {"status": "completed"}
+        result = finalize_document(document_id)
+        if result["status"] == "incomplete":
+            return {"status": "dispatched"}
+        return result
+    except ValueError as exc:
+        logger.warning("Upload rejected document_id=%s reason=%s", document_id, exc)
+        _mark_failed(document_id, str(exc))
+        return {"status": "rejected"}
     except Exception as exc:  # pragma: no cover
-        with get_session() as session:
-            session.execute(
-                Document.__table__.update()
-                .where(Document.id == document_id)
-                .values(status=DocumentStatus.failed.value, processing_task_id=None)
-            )
+        _mark_failed(document_id, str(exc))
+        raise
+
+
+@celery_app.task(name="vera.process_page")
+def process_page(document_id: str, page_id: str) -> dict[str, str]:
+    with get_session() as session:
+        page = session.get(DocumentPage, page_id)
+        if page is None or page.document_id != document_id:
+            return {"status": "missing"}
+        if page.status == DocumentStatus.canceled.value:
+            return {"status": "canceled"}
+        image_path = str(getattr(page, "image_path"))
+        page_index = int(getattr(page, "page_index"))
+        image_size = (int(getattr(page, "image_width") or 0), int(getattr(page, "image_height") or 0))
+
+    result = _ocr_page(document_id, page_id, image_path, page_index, image_size if all(image_size) else None)
+    if result["status"] == "completed":
+        finalize_document(document_id)
+    return result
+
+
+@celery_app.task(name="vera.finalize_document")
+def finalize_document(document_id: str) -> dict[str, str]:
+    with get_session() as session:
+        expected_pages = session.execute(
+            select(Document.page_count).where(Document.id == document_id)
+        ).scalar_one_or_none()
+        status_counts = dict(
             session.execute(
-                DocumentPage.__table__.update()
+                select(DocumentPage.status, func.count(DocumentPage.id))
                 .where(DocumentPage.document_id == document_id)
-                .values(status=DocumentStatus.failed.value)
-            )
-            session.add(
-                AuditLog(
-                    id=os.urandom(16).hex(),
-                    document_id=document_id,
-                    event_type="ocr_failed",
-                    detail=str(exc),
-                )
-            )
-            session.commit()
-        raise
+                .group_by(DocumentPage.status)
+            ).all()
+        )
+        if status_counts.get(DocumentStatus.canceled.value):
+            return {"status": "canceled"}
+        if status_counts.get(DocumentStatus.failed.value):
+            return {"status": "failed"}
+        if set(status_counts) != {DocumentStatus.ocr_done.value}:
+            return {"status": "incomplete"}
+        if sum(status_counts.values()) < (expected_pages or 0):
+            return {"status": "incomplete"}
+
+        result = session.execute(
+            Document.__table__.update()
+            .where(Document.id == document_id)
+            .where(Document.status == DocumentStatus.processing.value)
+            .values(status=DocumentStatus.ocr_done.value, processing_task_id=None)
+        )
+        session.commit()
+    if result.rowcount == 0:
+        return {"status": "skipped"}
+    publish_status_change(document_id)
+    return {"status": "completed"}
 
 
 @celery_app.task(name="vera.cleanup_documents")
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+if not os.getenv("DATABASE_URL"):
+    data_dir = tempfile.mkdtemp(prefix="vera-bench-")
+    os.environ["SQLITE_PATH"] = os.path.join(data_dir, "bench.db")
+    os.environ.setdefault("DATA_DIR", data_dir)
+
+import httpx  # noqa: E402
+from sqlalchemy import event, select  # noqa: E402
+
+from app.db.session import async_engine, engine, ensure_schema, get_session  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.documents import Document, DocumentPage  # noqa: E402
+from sqlalchemy.util import await_only  # noqa: E402
+
+logging.disable(logging.INFO)
+
+
+@app.get("/bench/blocking/{document_id}")
+async def _blocking_status(document_id: str):
+    with get_session() as session:
+        document = session.get(Document, document_id)
+        pages = session.execute(select(DocumentPage).where(DocumentPage.document_id == document_id)).scalars().all()
+        return {"status": document.status, "pages": len(pages)}
+
+
+def _inject_latency(latency: float) -> None:
+    def blocking_latency(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(latency)
+
+    def awaited_latency(conn, cursor, statement, parameters, context, executemany):
+        await_only(asyncio.sleep(latency))
+
+    event.listen(engine, "before_cursor_execute", blocking_latency)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", awaited_latency)
+
+
+def _create_document(page_count: int) -> str:
+    document_id = uuid.uuid4().hex
+    with get_session() as session:
+        session.add(
+            Document(
+                id=document_id,
+                image_path="bench.png",
+                image_width=0,
+                image_height=0,
+                status="ocr_done",
+                structured_fields="{}",
+                page_count=page_count,
+            )
+        )
+        for index in range(page_count):
+            session.add(
+                DocumentPage(
+                    id=uuid.uuid4().hex,
+                    document_id=document_id,
+                    page_index=index,
+                    image_path="bench.png",
+                    image_width=0,
+                    image_height=0,
+                    status="ocr_done",
+                )
+            )
+        session.commit()
+    return document_id
+
+
+async def _run(path: str, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def fetch() -> None:
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        start_time = time.perf_counter()
+        await asyncio.gather(*(fetch() for _ in range(requests)))
+        return time.perf_counter() - start_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark API throughput under simulated DB latency")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--pages", type=int, default=5)
+    args = parser.parse_args()
+
+    ensure_schema()
+    document_id = _create_document(args.pages)
+    _inject_latency(args.latency_ms / 1000)
+
+    print(
+        f"database={engine.url.get_backend_name()} requests={args.requests} "
+        f"concurrency={args.concurrency} latency_ms={args.latency_ms}"
+    )
+    for name, path in (
+        ("blocking", f"/bench/blocking/{document_id}"),
+        ("async", f"/documents/{document_id}/pages/status"),
+    ):
+        elapsed = asyncio.run(_run(path, args.requests, args.concurrency))
+        print(f"{name:>8}: {args.requests / elapsed:,.1f} requests/sec ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.services.token_batch import TokenBatch  # noqa: E402
+
+
+def _legacy_line_group(raw_tokens: list[dict]) -> list[dict]:
+    sorted_tokens = sorted(raw_tokens, key=lambda t: (t["bbox"][1], t["bbox"][0]))
+    lines: list[list[dict]] = []
+    current: list[dict] = []
+    current_y: float | None = None
+    for token in sorted_tokens:
+        y = token["bbox"][1]
+        if current_y is None or abs(y - current_y) <= 12.0:
+            current.append(token)
+            current_y = y if current_y is None else (current_y + y) / 2
+        else:
+            lines.append(sorted(current, key=lambda t: t["bbox"][0]))
+            current = [token]
+            current_y = y
+    if current:
+        lines.append(sorted(current, key=lambda t: t["bbox"][0]))
+    return [
+        {**token, "line_index": line_index, "token_index": token_index, "line_id": f"line-{line_index}"}
+        for line_index, line in enumerate(lines)
+        for token_index, token in enumerate(line)
+    ]
+
+
+def _synthetic_page(token_count: int, line_height: float, jitter: float) -> list[dict]:
+    tokens = []
+    per_line = 20
+    for index in range(token_count):
+        line, column = divmod(index, per_line)
+        tokens.append(
+            {
+                "text": f"w{index}",
+                "confidence": random.uniform(0.5, 1.0),
+                "bbox": (
+                    column * 90.0 + random.uniform(0, 5),
+                    line * line_height * 1.4 + random.uniform(0, jitter),
+                    80.0,
+                    line_height,
+                ),
+            }
+        )
+    random.shuffle(tokens)
+    return tokens
+
+
+def _time(callback, repeat: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        callback()
+    return (time.perf_counter() - start_time) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark OCR line grouping")
+    parser.add_argument("--tokens", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(7)
+    for name, line_height, jitter in (("150dpi", 18.0, 4.0), ("300dpi", 40.0, 32.0)):
+        tokens = _synthetic_page(args.tokens, line_height, jitter)
+        legacy_seconds = _time(lambda: _legacy_line_group([dict(token) for token in tokens]), args.repeat)
+        batch = TokenBatch.from_dicts(tokens)
+        batch_seconds = _time(batch.group_lines, args.repeat)
+        legacy_lines = len({token["line_index"] for token in _legacy_line_group([dict(token) for token in tokens])})
+        batch_lines = len(set(batch.group_lines().line_indices.tolist()))
+        expected_lines = -(-args.tokens // 20)
+        print(
+            f"{name}: legacy {legacy_seconds * 1000:.1f} ms ({legacy_lines} lines), "
+            f"vectorized {batch_seconds * 1000:.1f} ms ({batch_lines} lines), expected {expected_lines} lines"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+from app.services.ocr_engines import create_ocr_engine  # noqa: E402
+
+logging.disable(logging.CRITICAL)
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".tif", ".tiff"}
+
+
+def _synthetic_fixtures(count: int, directory: str) -> list[str]:
+    words = ["Invoice", "Total", "£24.60", "31/01/2026", "Widget", "Qty", "12", "Acme", "Ltd", "VAT"]
+    paths = []
+    for page in range(count):
+        image = Image.new("RGB", (1240, 1754), "white")
+        draw = ImageDraw.Draw(image)
+        for line in range(40):
+            text = "  ".join(words[(page + line + column) % len(words)] for column in range(8))
+            draw.text((60, 60 + line * 40), text, fill="black")
+        path = str(Path(directory) / f"page-{page}.png")
+        image.save(path, "PNG")
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare OCR engine throughput (pages/sec) on one fixture set")
+    parser.add_argument("--fixtures", help="Directory of page images; synthetic pages are generated when omitted")
+    parser.add_argument("--pages", type=int, default=5, help="Synthetic page count")
+    parser.add_argument("--engines", default="paddleocr,onnxruntime,fake")
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="vera-bench-") as temp_dir:
+        if args.fixtures:
+            fixtures = sorted(str(path) for path in Path(args.fixtures).iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)
+        else:
+            fixtures = _synthetic_fixtures(args.pages, temp_dir)
+        print(f"fixtures={len(fixtures)} repeat={args.repeat}")
+
+        for engine_name in args.engines.split(","):
+            try:
+                engine = create_ocr_engine({"engine": engine_name, "lang": "en", "use_angle_cls": True})
+            except (RuntimeError, ValueError) as error:
+                print(f"{engine_name:>12}: skipped ({error})")
+                continue
+            engine.recognize(fixtures[0])
+
+            tokens = 0
+            start_time = time.perf_counter()
+            for _ in range(args.repeat):
+                for path in fixtures:
+                    tokens += len(engine.recognize(path))
+            elapsed = time.perf_counter() - start_time
+            pages = len(fixtures) * args.repeat
+            print(
+                f"{engine_name:>12}: {pages / elapsed:8.2f} pages/s  "
+                f"{elapsed / pages * 1000:8.1f} ms/page  tokens/page={tokens / pages:.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
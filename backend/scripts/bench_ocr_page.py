@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+if not os.getenv("DATABASE_URL"):
+    data_dir = tempfile.mkdtemp(prefix="vera-bench-")
+    os.environ["SQLITE_PATH"] = os.path.join(data_dir, "bench.db")
+    os.environ.setdefault("DATA_DIR", data_dir)
+os.environ["OCR_CACHE_MAX_MB"] = "0"
+
+from PIL import Image  # noqa: E402
+
+from app.db.session import ensure_schema, engine, get_session  # noqa: E402
+from app.models.documents import Document, DocumentPage  # noqa: E402
+from app.services import ocr as ocr_service  # noqa: E402
+from app.services.ocr_engines import FakeOcrEngine  # noqa: E402
+from app.services.ocr_pool import OcrEngineRegistry  # noqa: E402
+from app.services.token_batch import TokenBatch  # noqa: E402
+
+logging.disable(logging.INFO)
+
+
+def _synthetic_polygons(count: int) -> tuple[list, list[str], list[float]]:
+    words = ["Invoice", "Total", "£24.60", "31/01/2026", "Widget", "Qty", "12", "Acme", "Ltd", "VAT"]
+    polygons, texts, confidences = [], [], []
+    for index in range(count):
+        line, column = divmod(index, 25)
+        x, y = column * 80.0 + random.uniform(0, 4), line * 30.0 + random.uniform(0, 3)
+        polygons.append([[x, y], [x + 70.0, y], [x + 70.0, y + 18.0], [x, y + 18.0]])
+        texts.append(random.choice(words))
+        confidences.append(random.uniform(0.6, 1.0))
+    return polygons, texts, confidences
+
+
+def _create_page(image_path: str) -> tuple[str, str]:
+    document_id = uuid.uuid4().hex
+    page_id = uuid.uuid4().hex
+    with get_session() as session:
+        session.add(
+            Document(
+                id=document_id,
+                image_path=image_path,
+                image_width=0,
+                image_height=0,
+                status="processing",
+                structured_fields="{}",
+                page_count=1,
+            )
+        )
+        session.add(
+            DocumentPage(
+                id=page_id,
+                document_id=document_id,
+                page_index=0,
+                image_path=image_path,
+                image_width=0,
+                image_height=0,
+                status="processing",
+            )
+        )
+        session.commit()
+    return document_id, page_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark time and peak memory of one OCR page after inference")
+    parser.add_argument("--tokens", type=int, default=5000)
+    parser.add_argument("--pages", type=int, default=5)
+    args = parser.parse_args()
+
+    ensure_schema()
+    random.seed(11)
+    polygons, texts, confidences = _synthetic_polygons(args.tokens)
+    tokens = TokenBatch.from_polygons(polygons, texts, confidences)
+    ocr_service._engine_registry = OcrEngineRegistry(lambda language: FakeOcrEngine(tokens))
+    image_path = os.path.join(tempfile.mkdtemp(prefix="vera-bench-"), "page.png")
+    Image.new("RGB", (2000, 2000), "white").save(image_path, "PNG")
+
+    warmup_page, *timed_pages, traced_page = [_create_page(image_path) for _ in range(args.pages + 2)]
+    ocr_service.run_ocr_for_page(*warmup_page, image_path, "/files/page.png")
+
+    start_time = time.perf_counter()
+    for document_id, page_id in timed_pages:
+        ocr_service.run_ocr_for_page(document_id, page_id, image_path, "/files/page.png")
+    elapsed = (time.perf_counter() - start_time) / args.pages
+
+    tracemalloc.start()
+    ocr_service.run_ocr_for_page(*traced_page, image_path, "/files/page.png")
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(f"database={engine.url.get_backend_name()} tokens_per_page={args.tokens}")
+    print(f"time per page: {elapsed * 1000:.1f} ms, peak traced memory: {peak_bytes / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from PIL import Image, ImageDraw, ImageFont  # noqa: E402
+
+from app.services.ocr_engines import create_ocr_engine  # noqa: E402
+from app.services.preprocess import preprocess_page  # noqa: E402
+
+logging.disable(logging.CRITICAL)
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".tif", ".tiff"}
+
+
+def _synthetic_photos(count: int, directory: str) -> list[str]:
+    font = ImageFont.load_default(size=56)
+    paths = []
+    for page in range(count):
+        image = Image.new("RGB", (4000, 3000), "white")
+        draw = ImageDraw.Draw(image)
+        for line in range(24):
+            text = f"Invoice {page}-{line} Total £24.60 Widget Qty 12 VAT"
+            draw.text((200, 150 + line * 110), text, fill="black", font=font)
+        path = str(Path(directory) / f"photo-{page}.png")
+        image.rotate(2.5 - page, fillcolor=(255, 255, 255)).save(path, "PNG")
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time saved per page by deskew/downscale preprocessing before OCR")
+    parser.add_argument("--fixtures", help="Directory of page images; synthetic 12 MP photos are generated when omitted")
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--engine", default="paddleocr")
+    args = parser.parse_args()
+
+    engine = create_ocr_engine({"engine": args.engine, "lang": "en", "use_angle_cls": True})
+    with tempfile.TemporaryDirectory(prefix="vera-bench-") as temp_dir:
+        if args.fixtures:
+            fixtures = sorted(str(path) for path in Path(args.fixtures).iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)
+        else:
+            fixtures = _synthetic_photos(args.pages, temp_dir)
+        engine.recognize(fixtures[0])
+
+        total_saved = 0.0
+        for path in fixtures:
+            start_time = time.perf_counter()
+            baseline_tokens = len(engine.recognize(path))
+            baseline = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            prepared = preprocess_page(path)
+            prepare = time.perf_counter() - start_time
+            tokens = len(engine.recognize(prepared.pixels))
+            processed = time.perf_counter() - start_time
+            total_saved += baseline - processed
+            print(
+                f"{Path(path).name}: baseline={baseline * 1000:.0f} ms tokens={baseline_tokens}  "
+                f"preprocessed={processed * 1000:.0f} ms (prep {prepare * 1000:.0f} ms) tokens={tokens}  "
+                f"scale={prepared.transform.scale:.2f} angle={prepared.transform.angle:.1f}  "
+                f"saved={(baseline - processed) * 1000:.0f} ms"
+            )
+        print(f"mean saved per page: {total_saved / len(fixtures) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
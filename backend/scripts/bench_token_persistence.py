@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="vera-bench-"), "bench.db")
+
+from app.db.bulk import bulk_insert  # noqa: E402
+from app.db.session import ensure_schema, engine, get_session  # noqa: E402
+from app.models.documents import Document, DocumentPage, Token  # noqa: E402
+from app.schemas.documents import TokenConfidenceLabel, TokenSchema  # noqa: E402
+from app.services.confidence import classify_confidence, detect_forced_flags  # noqa: E402
+from app.services.ocr import _bbox_hash, _build_token_rows  # noqa: E402
+from app.services.token_batch import TokenBatch  # noqa: E402
+
+
+def _synthetic_tokens(count: int) -> TokenBatch:
+    words = ["Invoice", "Total", "£24.60", "31/01/2026", "Widget", "Qty", "12", "Acme", "Ltd", "VAT"]
+    tokens = []
+    for index in range(count):
+        line, column = divmod(index, 12)
+        tokens.append(
+            {
+                "text": random.choice(words),
+                "confidence": random.uniform(0.6, 1.0),
+                "bbox": (column * 80.0, line * 24.0, 70.0, 18.0),
+            }
+        )
+    return TokenBatch.from_dicts(tokens).group_lines()
+
+
+def _persist_orm(document_id: str, page_id: str, grouped_tokens: TokenBatch) -> None:
+    with get_session() as session:
+        session.execute(Token.__table__.delete().where(Token.page_id == page_id))
+        for raw in grouped_tokens.to_dicts():
+            confidence_label = TokenConfidenceLabel(classify_confidence(raw["confidence"]))
+            flags = detect_forced_flags(raw["text"])
+            forced_review = confidence_label != TokenConfidenceLabel.trusted or len(flags) > 0
+            bbox = raw["bbox"]
+            token_id = f"{document_id}-p{page_id}-l{raw['line_index']}-t{raw['token_index']}-{_bbox_hash(bbox)}"
+            session.add(
+                Token(
+                    id=token_id,
+                    document_id=document_id,
+                    page_id=page_id,
+                    line_index=raw["line_index"],
+                    token_index=raw["token_index"],
+                    text=raw["text"],
+                    confidence=raw["confidence"],
+                    confidence_label=confidence_label.value,
+                    forced_review=forced_review,
+                    line_id=raw["line_id"],
+                    bbox=json.dumps(bbox),
+                    flags=json.dumps(flags),
+                )
+            )
+            TokenSchema(
+                id=token_id,
+                line_id=raw["line_id"],
+                line_index=raw["line_index"],
+                token_index=raw["token_index"],
+                text=raw["text"],
+                confidence=raw["confidence"],
+                confidence_label=confidence_label,
+                forced_review=forced_review,
+                bbox=bbox,
+                flags=flags,
+            )
+        session.commit()
+
+
+def _persist_bulk(document_id: str, page_id: str, grouped_tokens: TokenBatch) -> None:
+    with get_session() as session:
+        session.execute(Token.__table__.delete().where(Token.page_id == page_id))
+        token_rows = _build_token_rows(document_id, page_id, grouped_tokens)
+        bulk_insert(session, Token.__table__, token_rows)
+        session.commit()
+
+
+def _create_page() -> tuple[str, str]:
+    document_id = uuid.uuid4().hex
+    page_id = uuid.uuid4().hex
+    with get_session() as session:
+        session.add(
+            Document(
+                id=document_id,
+                image_path="bench.png",
+                image_width=0,
+                image_height=0,
+                status="processing",
+                structured_fields="{}",
+                page_count=1,
+            )
+        )
+        session.add(
+            DocumentPage(
+                id=page_id,
+                document_id=document_id,
+                page_index=0,
+                image_path="bench.png",
+                image_width=0,
+                image_height=0,
+                status="processing",
+            )
+        )
+        session.commit()
+    return document_id, page_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark per-page token persistence")
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--pages", type=int, default=10)
+    args = parser.parse_args()
+
+    ensure_schema()
+    grouped_tokens = _synthetic_tokens(args.tokens)
+    print(f"database={engine.url.get_backend_name()} tokens_per_page={args.tokens} pages={args.pages}")
+    for name, persist in (("orm", _persist_orm), ("bulk", _persist_bulk)):
+        document_id, page_id = _create_page()
+        start_time = time.perf_counter()
+        for _ in range(args.pages):
+            persist(document_id, page_id, grouped_tokens)
+        elapsed = time.perf_counter() - start_time
+        print(f"{name:>5}: {args.tokens * args.pages / elapsed:,.0f} tokens/sec ({elapsed / args.pages * 1000:.1f} ms/page)")
+
+
+if __name__ == "__main__":
+    main()
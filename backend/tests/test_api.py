@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import io
 import json
 import uuid
 
 from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy import event
 
-from app.db.session import Base, engine, get_session
+from app.db.session import Base, async_engine, engine, get_session
 from app.main import app
 from app.models.documents import AuditLog, Correction, Document, DocumentPage, Token
 from app.schemas.documents import DocumentStatus
+from app.services import ocr as ocr_service
 from app.services import summary as summary_service
+from app.services.ocr_pool import OcrEngineRegistry
+from app.worker import celery_app
 
 
 client = TestClient(app)
@@ -407,3 +413,374 @@ def test_document_status_endpoint_returns_pages():
     payload = response.json()
     assert payload["document_id"] == document_id
     assert len(payload["pages"]) == 2
+
+
+def test_cancel_revokes_page_tasks(monkeypatch):
+    _reset_db()
+    document_id, page_ids = _create_document_with_pages(DocumentStatus.processing.value, 2)
+    with get_session() as session:
+        session.execute(
+            Document.__table__.update()
+            .where(Document.id == document_id)
+            .values(processing_task_id="document-task")
+        )
+        for index, page_id in enumerate(page_ids):
+            session.execute(
+                DocumentPage.__table__.update()
+                .where(DocumentPage.id == page_id)
+                .values(processing_task_id=f"page-task-{index}")
+            )
+        session.commit()
+
+    revoked: list[str] = []
+    monkeypatch.setattr(
+        celery_app.control, "revoke", lambda task_ids, terminate=False: revoked.extend(task_ids)
+    )
+
+    response = client.post(f"/documents/{document_id}/cancel")
+
+    assert response.status_code == 200
+    assert sorted(revoked) == ["document-task", "page-task-0", "page-task-1"]
+    with get_session() as session:
+        pages = session.query(DocumentPage).filter(DocumentPage.document_id == document_id).all()
+        assert {page.status for page in pages} == {DocumentStatus.canceled.value}
+        assert {page.processing_task_id for page in pages} == {None}
+
+
+def test_upload_only_stores_file_and_queues_processing(tmp_path, monkeypatch):
+    _reset_db()
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    buffer = io.BytesIO()
+    Image.new("RGB", (20, 10), "white").save(buffer, "PNG")
+
+    class FakeTask:
+        id = "task-upload"
+
+    sent: list[list[str]] = []
+
+    def fake_send_task(name: str, args: list[str]) -> FakeTask:
+        sent.append(args)
+        return FakeTask()
+
+    monkeypatch.setattr(celery_app, "send_task", fake_send_task)
+
+    response = client.post("/documents/upload", files={"file": ("scan.png", buffer.getvalue(), "image/png")})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["pages"] == []
+    assert payload["status"] == DocumentStatus.uploaded.value
+    assert sent == [[payload["document_id"]]]
+    with get_session() as session:
+        document = session.get(Document, payload["document_id"])
+        assert document.processing_task_id == "task-upload"
+        assert session.query(DocumentPage).filter(DocumentPage.document_id == document.id).count() == 0
+
+
+def test_upload_points_pdfs_at_their_first_page_image(tmp_path, monkeypatch):
+    _reset_db()
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("STRICT_MIME_VALIDATION", "0")
+
+    class FakeTask:
+        id = "task-upload"
+
+    monkeypatch.setattr(celery_app, "send_task", lambda name, args: FakeTask())
+    buffer = io.BytesIO()
+    Image.new("RGB", (20, 10), "white").save(buffer, "PNG")
+
+    pdf = client.post("/documents/upload", files={"file": ("scan.pdf", b"%PDF-1.4", "application/pdf")})
+    png = client.post("/documents/upload", files={"file": ("scan.png", buffer.getvalue(), "image/png")})
+
+    assert pdf.json()["image_url"] == f"/files/{pdf.json()['document_id']}-page-0.png"
+    assert png.json()["image_url"] == f"/files/{png.json()['document_id']}.png"
+
+
+def test_upload_stores_requested_language(tmp_path, monkeypatch):
+    _reset_db()
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    buffer = io.BytesIO()
+    Image.new("RGB", (20, 10), "white").save(buffer, "PNG")
+
+    class FakeTask:
+        id = "task-upload"
+
+    monkeypatch.setattr(celery_app, "send_task", lambda name, args: FakeTask())
+
+    response = client.post(
+        "/documents/upload",
+        files={"file": ("scan.png", buffer.getvalue(), "image/png")},
+        data={"language": "de-DE"},
+    )
+    rejected = client.post(
+        "/documents/upload",
+        files={"file": ("scan.png", buffer.getvalue(), "image/png")},
+        data={"language": "xx"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["language"] == "de"
+    with get_session() as session:
+        assert session.get(Document, response.json()["document_id"]).language == "de"
+    assert rejected.status_code == 422
+
+
+def _count_statements(callback) -> int:
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        callback()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return len(statements)
+
+
+def test_document_status_query_count_is_constant():
+    _reset_db()
+    small_document_id, small_page_ids = _create_document_with_pages(DocumentStatus.ocr_done.value, 2)
+    large_document_id, large_page_ids = _create_document_with_pages(DocumentStatus.ocr_done.value, 20)
+    for page_id in small_page_ids:
+        _create_token(small_document_id, page_id, forced_review=True)
+    for page_id in large_page_ids:
+        _create_token(large_document_id, page_id, forced_review=True)
+        _create_token(large_document_id, page_id, forced_review=False)
+
+    small_count = _count_statements(lambda: client.get(f"/documents/{small_document_id}/pages/status"))
+    large_response = None
+
+    def fetch_large() -> None:
+        nonlocal large_response
+        large_response = client.get(f"/documents/{large_document_id}/pages/status")
+
+    large_count = _count_statements(fetch_large)
+
+    assert small_count == large_count == 2
+    pages = large_response.json()["pages"]
+    assert len(pages) == 20
+    assert {(page["token_count"], page["forced_review_count"]) for page in pages} == {(2, 1)}
+
+
+def _create_reocr_page(tmp_path) -> tuple[str, str]:
+    image_path = str(tmp_path / "page.png")
+    Image.new("RGB", (200, 100), "white").save(image_path, "PNG")
+    document_id = uuid.uuid4().hex
+    page_id = uuid.uuid4().hex
+    with get_session() as session:
+        session.add(
+            Document(
+                id=document_id,
+                image_path=image_path,
+                image_width=200,
+                image_height=100,
+                status=DocumentStatus.ocr_done.value,
+                structured_fields=json.dumps({}),
+                page_count=1,
+            )
+        )
+        session.add(
+            DocumentPage(
+                id=page_id,
+                document_id=document_id,
+                page_index=0,
+                image_path=image_path,
+                image_width=200,
+                image_height=100,
+                status=DocumentStatus.ocr_done.value,
+            )
+        )
+        for token_index, (text, x) in enumerate([("T0tal", 10.0), ("£2", 60.0), ("4.60", 80.0)]):
+            session.add(
+                Token(
+                    id=f"token-{token_index}",
+                    document_id=document_id,
+                    page_id=page_id,
+                    line_index=0,
+                    token_index=token_index,
+                    text=text,
+                    confidence=0.5,
+                    confidence_label="low",
+                    forced_review=True,
+                    line_id="line-0",
+                    bbox=json.dumps([x, 10.0, 20.0, 10.0]),
+                    flags=json.dumps([]),
+                )
+            )
+        session.commit()
+    return document_id, page_id
+
+
+class _CropEngine:
+    def __init__(self, readings: list[tuple[str, float]]) -> None:
+        self.readings = readings
+        self.crop_shapes: list[tuple] = []
+
+    def recognize_crops(self, crops):
+        self.crop_shapes.extend(crop.shape for crop in crops)
+        return self.readings[: len(crops)]
+
+
+def test_reocr_updates_selected_tokens_only(tmp_path, monkeypatch):
+    _reset_db()
+    monkeypatch.setenv("OCR_REFINE_PADDING", "0")
+    document_id, page_id = _create_reocr_page(tmp_path)
+    crop_engine = _CropEngine([("Total", 0.98)])
+    monkeypatch.setattr(ocr_service, "_engine_registry", OcrEngineRegistry(lambda language: crop_engine))
+
+    response = client.post(
+        f"/documents/{document_id}/pages/{page_id}/reocr",
+        json={"token_ids": ["token-0"], "scale": 2, "page_version": 1},
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["page_version"] == 2
+    assert payload["removed_token_ids"] == []
+    assert [(token["id"], token["text"], token["confidence_label"]) for token in payload["tokens"]] == [
+        ("token-0", "Total", "trusted")
+    ]
+    assert crop_engine.crop_shapes == [(20, 40, 3)]
+    with get_session() as session:
+        texts = [token.text for token in session.query(Token).order_by(Token.token_index).all()]
+        assert texts == ["Total", "£2", "4.60"]
+        assert session.get(DocumentPage, page_id).version == 2
+
+    stale = client.post(
+        f"/documents/{document_id}/pages/{page_id}/reocr",
+        json={"token_ids": ["token-0"], "page_version": 1},
+    )
+    assert stale.status_code == 409
+
+
+def test_reocr_crops_exif_rotated_pages_upright(tmp_path, monkeypatch):
+    _reset_db()
+    monkeypatch.setenv("OCR_REFINE_PADDING", "0")
+    document_id, page_id = _create_reocr_page(tmp_path)
+    photo_path = str(tmp_path / "photo.jpg")
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new("RGB", (100, 200), "white").save(photo_path, "JPEG", exif=exif)
+    with get_session() as session:
+        session.execute(
+            DocumentPage.__table__.update().where(DocumentPage.id == page_id).values(image_path=photo_path)
+        )
+        session.execute(
+            Token.__table__.update().where(Token.id == "token-2").values(bbox=json.dumps([170.0, 10.0, 20.0, 10.0]))
+        )
+        session.commit()
+    crop_engine = _CropEngine([("4.60", 0.98)])
+    monkeypatch.setattr(ocr_service, "_engine_registry", OcrEngineRegistry(lambda language: crop_engine))
+
+    response = client.post(
+        f"/documents/{document_id}/pages/{page_id}/reocr",
+        json={"token_ids": ["token-2"], "scale": 2},
+    )
+
+    assert response.status_code == 200
+    assert crop_engine.crop_shapes == [(20, 40, 3)]
+
+
+def test_reocr_bbox_merges_covered_tokens(tmp_path, monkeypatch):
+    _reset_db()
+    document_id, page_id = _create_reocr_page(tmp_path)
+    monkeypatch.setattr(
+        ocr_service, "_engine_registry", OcrEngineRegistry(lambda language: _CropEngine([("£24.60", 0.95)]))
+    )
+
+    response = client.post(
+        f"/documents/{document_id}/pages/{page_id}/reocr",
+        json={"bbox": [55.0, 5.0, 60.0, 20.0]},
+    )
+    empty = client.post(
+        f"/documents/{document_id}/pages/{page_id}/reocr",
+        json={"bbox": [150.0, 60.0, 20.0, 20.0]},
+    )
+    missing_region = client.post(f"/documents/{document_id}/pages/{page_id}/reocr", json={})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["removed_token_ids"] == ["token-2"]
+    assert payload["tokens"][0]["id"] == "token-1"
+    assert payload["tokens"][0]["bbox"] == [55.0, 5.0, 60.0, 20.0]
+    assert "currency_amount" in payload["tokens"][0]["flags"]
+    with get_session() as session:
+        assert [token.text for token in session.query(Token).order_by(Token.token_index).all()] == ["T0tal", "£24.60"]
+    assert empty.status_code == 422
+    assert missing_region.status_code == 400
+
+
+def test_reocr_bbox_rejects_multiple_lines_and_corrected_tokens(tmp_path, monkeypatch):
+    _reset_db()
+    document_id, page_id = _create_reocr_page(tmp_path)
+    with get_session() as session:
+        session.add(
+            Token(
+                id="token-3",
+                document_id=document_id,
+                page_id=page_id,
+                line_index=1,
+                token_index=0,
+                text="Due",
+                confidence=0.5,
+                confidence_label="low",
+                forced_review=True,
+                line_id="line-1",
+                bbox=json.dumps([60.0, 30.0, 20.0, 10.0]),
+                flags=json.dumps([]),
+            )
+        )
+        session.add(
+            Correction(
+                id="correction-1",
+                document_id=document_id,
+                page_id=page_id,
+                token_id="token-2",
+                original_text="4.6O",
+                corrected_text="4.60",
+            )
+        )
+        session.commit()
+    monkeypatch.setattr(
+        ocr_service, "_engine_registry", OcrEngineRegistry(lambda language: _CropEngine([("£24.60", 0.95)]))
+    )
+
+    multiline = client.post(
+        f"/documents/{document_id}/pages/{page_id}/reocr",
+        json={"bbox": [55.0, 5.0, 60.0, 40.0]},
+    )
+    corrected = client.post(
+        f"/documents/{document_id}/pages/{page_id}/reocr",
+        json={"bbox": [55.0, 5.0, 60.0, 20.0]},
+    )
+
+    assert multiline.status_code == 422
+    assert corrected.status_code == 409
+    with get_session() as session:
+        assert session.query(Token).count() == 4
+        assert session.get(Correction, "correction-1") is not None
+        assert session.get(DocumentPage, page_id).version == 1
+
+
+def test_reocr_reports_engine_failure_without_changing_tokens(tmp_path, monkeypatch):
+    _reset_db()
+    document_id, page_id = _create_reocr_page(tmp_path)
+
+    class FailingEngine:
+        def recognize_crops(self, crops):
+            raise ValueError("recognizer crashed")
+
+    monkeypatch.setattr(ocr_service, "_engine_registry", OcrEngineRegistry(lambda language: FailingEngine()))
+
+    response = client.post(
+        f"/documents/{document_id}/pages/{page_id}/reocr",
+        json={"token_ids": ["token-0"], "page_version": 1},
+    )
+
+    assert response.status_code == 502
+    assert response.json()["detail"] == "OCR engine failed to read the region"
+    with get_session() as session:
+        assert session.get(Token, "token-0").text == "T0tal"
+        assert session.get(DocumentPage, page_id).version == 1
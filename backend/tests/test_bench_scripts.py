@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+SCRIPT_ARGS = {
+    "bench_api_concurrency.py": ["--requests", "4", "--concurrency", "2", "--latency-ms", "1", "--pages", "1"],
+    "bench_line_grouping.py": ["--tokens", "50", "--repeat", "1"],
+    "bench_ocr_engines.py": ["--pages", "1", "--engines", "fake", "--repeat", "1"],
+    "bench_ocr_page.py": ["--tokens", "20", "--pages", "1"],
+    "bench_preprocess.py": ["--engine", "fake"],
+    "bench_token_persistence.py": ["--tokens", "20", "--pages", "1"],
+}
+
+
+def test_every_bench_script_has_smoke_arguments():
+    assert sorted(path.name for path in (BACKEND_DIR / "scripts").glob("bench_*.py")) == sorted(SCRIPT_ARGS)
+
+
+@pytest.mark.parametrize("script", sorted(SCRIPT_ARGS))
+def test_bench_script_runs_with_tiny_inputs(script, tmp_path):
+    args = list(SCRIPT_ARGS[script])
+    if script == "bench_preprocess.py":
+        Image.new("RGB", (400, 300), "white").save(tmp_path / "page.png", "PNG")
+        args += ["--fixtures", str(tmp_path)]
+    env = {key: value for key, value in os.environ.items() if key != "DATABASE_URL"}
+    env["DATA_DIR"] = str(tmp_path)
+    env["SQLITE_PATH"] = str(tmp_path / "bench.db")
+
+    result = subprocess.run(
+        [sys.executable, str(BACKEND_DIR / "scripts" / script), *args],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip()
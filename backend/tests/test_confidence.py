@@ -1,4 +1,10 @@
-from app.services.confidence import classify_confidence, detect_forced_flags
+import json
+
+import numpy as np
+
+from app.services import confidence as confidence_module
+from app.services import rules as rules_module
+from app.services.confidence import classify_confidence, detect_forced_flags, get_confidence_rules
 
 
 def test_confidence_thresholds():
@@ -20,3 +26,45 @@ def test_forced_flags_date():
 def test_forced_flags_total_keyword():
     flags = detect_forced_flags("Total")
     assert "total_keyword" in flags
+
+
+def test_forced_flags_combined_scan_returns_all_flags_in_order():
+    assert detect_forced_flags("Invoice #1042") == ["invoice_number"]
+    assert detect_forced_flags("Grand Total 24.6") == ["total_keyword", "malformed_price"]
+    assert detect_forced_flags("  2026-01-31 ") == ["date"]
+    assert detect_forced_flags("Widget") == []
+
+
+def test_batch_rules_match_single_token_rules():
+    rules = get_confidence_rules()
+    texts = ["£24.60", "Total", "Widget", "£24.60", "12.5"]
+    scores = np.array([0.95, 0.92, 0.80, 0.79, 0.5])
+
+    assert rules.flags_batch(texts) == [detect_forced_flags(text) for text in texts]
+    assert rules.classify_batch(scores) == [classify_confidence(score) for score in scores.tolist()]
+
+
+def test_rules_load_per_doc_type(tmp_path, monkeypatch):
+    rules_path = tmp_path / "rules.json"
+    rules_path.write_text(
+        json.dumps(
+            {
+                "confidence_rules": {
+                    "receipt": {
+                        "thresholds": {"trusted": 0.85},
+                        "flags": {"malformed_price": None, "tip": {"pattern": r"^tip$", "ignore_case": True}},
+                    }
+                }
+            }
+        )
+    )
+    monkeypatch.setenv("EXTRACTION_RULES_PATH", str(rules_path))
+    monkeypatch.setattr(rules_module, "_RULES_CACHE", {})
+    monkeypatch.setattr(confidence_module, "_rules_by_doc_type", {})
+
+    receipt = get_confidence_rules("receipt")
+    assert receipt.classify(0.86) == "trusted"
+    assert receipt.flags("TIP") == ["tip"]
+    assert receipt.flags("12.5") == []
+    assert get_confidence_rules().classify(0.86) == "medium"
+    assert get_confidence_rules("receipt") is receipt
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+
+from app.db.session import Base, engine, get_session
+from app.main import _status_event_stream
+from app.models.documents import Document, DocumentPage
+from app.schemas.documents import DocumentStatus
+from app.services.events import InProcessStatusBroker, publish_status_change, set_status_broker
+
+
+def _create_processing_document(page_count: int) -> tuple[str, list[str]]:
+    Base.metadata.create_all(bind=engine)
+    document_id = uuid.uuid4().hex
+    page_ids = [uuid.uuid4().hex for _ in range(page_count)]
+    with get_session() as session:
+        session.add(
+            Document(
+                id=document_id,
+                image_path="/tmp/sample.png",
+                image_width=100,
+                image_height=200,
+                status=DocumentStatus.processing.value,
+                page_count=page_count,
+            )
+        )
+        for index, page_id in enumerate(page_ids):
+            session.add(
+                DocumentPage(
+                    id=page_id,
+                    document_id=document_id,
+                    page_index=index,
+                    image_path="/tmp/sample.png",
+                    image_width=100,
+                    image_height=200,
+                    status=DocumentStatus.processing.value,
+                )
+            )
+        session.commit()
+    return document_id, page_ids
+
+
+def _parse(message: str) -> dict:
+    assert message.startswith("data: ")
+    return json.loads(message[len("data: "):])
+
+
+def test_status_stream_sends_snapshot_then_page_deltas():
+    set_status_broker(InProcessStatusBroker())
+    document_id, page_ids = _create_processing_document(3)
+
+    async def scenario() -> list[str]:
+        stream = _status_event_stream(document_id, heartbeat=5.0, resync=60.0)
+        messages = [await anext(stream)]
+        with get_session() as session:
+            session.execute(
+                DocumentPage.__table__.update()
+                .where(DocumentPage.id == page_ids[1])
+                .values(status=DocumentStatus.ocr_done.value)
+            )
+            session.commit()
+        publish_status_change(document_id, page_ids[1])
+        messages.append(await asyncio.wait_for(anext(stream), 2.0))
+        await stream.aclose()
+        return messages
+
+    try:
+        snapshot, delta = (_parse(message) for message in asyncio.run(scenario()))
+    finally:
+        set_status_broker(None)
+
+    assert [page["page_id"] for page in snapshot["pages"]] == page_ids
+    assert [page["page_id"] for page in delta["pages"]] == [page_ids[1]]
+    assert delta["pages"][0]["status"] == DocumentStatus.ocr_done.value
+    assert delta["status"] == DocumentStatus.processing.value
+
+
+def test_status_stream_sends_heartbeat_when_idle():
+    set_status_broker(InProcessStatusBroker())
+    document_id, _ = _create_processing_document(1)
+
+    async def scenario() -> list[str]:
+        stream = _status_event_stream(document_id, heartbeat=0.01, resync=60.0)
+        messages = [await anext(stream), await anext(stream)]
+        await stream.aclose()
+        return messages
+
+    try:
+        messages = asyncio.run(scenario())
+    finally:
+        set_status_broker(None)
+
+    assert messages[1] == ": heartbeat\n\n"
+
+
+def test_publish_without_subscribers_is_noop():
+    broker = InProcessStatusBroker()
+    broker.publish("missing", {"document_id": "missing"})
+    assert broker._subscriptions == {}
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services.language import detect_language, normalize_language
+
+
+def test_detect_language_from_stopwords():
+    assert detect_language(["Rechnung für die Lieferung", "Bitte zahlen Sie den Betrag"]) == "de"
+    assert detect_language(["Facture pour la livraison", "Montant dû avec les frais"]) == "fr"
+    assert detect_language(["Invoice for the delivery", "Please pay the amount due"]) == "en"
+
+
+def test_detect_language_needs_enough_evidence():
+    assert detect_language(["Total", "£24.60", "31/01/2026"]) is None
+    assert detect_language([]) is None
+
+
+def test_normalize_language_accepts_locales_and_rejects_unknown(monkeypatch):
+    monkeypatch.setenv("OCR_LANGUAGES", "en,de")
+    assert normalize_language("DE-de") == "de"
+    assert normalize_language("  ") is None
+    with pytest.raises(ValueError) as error:
+        normalize_language("fr")
+    assert str(error.value) == "unsupported_language"
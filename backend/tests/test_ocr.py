@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import json
+import types
+import uuid
+from typing import Any
+
+import numpy as np
+from PIL import Image
+from sqlalchemy import event
+
+from app.db import bulk
+from app.db import session as db_session
+from app.db.session import Base, engine, get_session
+from app.models.documents import AuditLog, Document, DocumentPage, Token
+from app.schemas.documents import DocumentStatus
+from app.services import ocr as ocr_service
+from app.services.ocr_pool import OcrEngineRegistry
+from app.services.token_batch import TokenBatch
+
+SCHEMA_STATEMENT_PREFIXES = ("CREATE", "ALTER", "DROP", "PRAGMA")
+
+
+def _reset_db() -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def _create_page(image_path: str) -> tuple[str, str]:
+    document_id = uuid.uuid4().hex
+    page_id = uuid.uuid4().hex
+    with get_session() as session:
+        session.add(
+            Document(
+                id=document_id,
+                image_path=image_path,
+                image_width=0,
+                image_height=0,
+                status=DocumentStatus.processing.value,
+                structured_fields=json.dumps({}),
+                page_count=1,
+            )
+        )
+        session.add(
+            DocumentPage(
+                id=page_id,
+                document_id=document_id,
+                page_index=0,
+                image_path=image_path,
+                image_width=0,
+                image_height=0,
+                status=DocumentStatus.processing.value,
+            )
+        )
+        session.commit()
+    return document_id, page_id
+
+
+def _capture_statements(callback) -> list[str]:
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        callback()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def _schema_statements(statements: list[str]) -> list[str]:
+    return [
+        statement
+        for statement in statements
+        if statement.lstrip().upper().startswith(SCHEMA_STATEMENT_PREFIXES)
+        or "sqlite_master" in statement
+        or "information_schema" in statement
+        or "pg_catalog" in statement
+    ]
+
+
+def test_run_ocr_for_page_issues_no_schema_queries(tmp_path, monkeypatch):
+    _reset_db()
+    monkeypatch.setenv("OCR_CACHE_MAX_MB", "0")
+    monkeypatch.setattr(
+        ocr_service,
+        "_extract_tokens",
+        lambda image_path, language=None, use_cls=True: TokenBatch.from_columns(
+            ["Total"], [0.99], [(1.0, 2.0, 30.0, 10.0)]
+        ),
+    )
+    image_path = str(tmp_path / "page.png")
+    Image.new("RGB", (40, 20), "white").save(image_path, "PNG")
+    document_id, page_id = _create_page(image_path)
+
+    statements = _capture_statements(
+        lambda: ocr_service.run_ocr_for_page(document_id, page_id, image_path, "/files/page.png")
+    )
+
+    assert statements
+    assert _schema_statements(statements) == []
+
+
+def test_ensure_schema_runs_once(monkeypatch):
+    monkeypatch.setattr(db_session, "_schema_ready", False)
+    first = _capture_statements(db_session.ensure_schema)
+    second = _capture_statements(db_session.ensure_schema)
+
+    assert _schema_statements(first)
+    assert second == []
+
+
+def _write_page_image(tmp_path) -> str:
+    image_path = str(tmp_path / "page.png")
+    Image.new("RGB", (40, 20), "white").save(image_path, "PNG")
+    return image_path
+
+
+def test_run_ocr_for_page_persists_in_one_commit(tmp_path, monkeypatch):
+    _reset_db()
+    monkeypatch.setenv("OCR_CACHE_MAX_MB", "0")
+    monkeypatch.setattr(
+        ocr_service,
+        "_extract_tokens",
+        lambda image_path, language=None, use_cls=True: TokenBatch.from_columns(
+            ["Total"], [0.99], [(1.0, 2.0, 30.0, 10.0)]
+        ),
+    )
+    image_path = _write_page_image(tmp_path)
+    document_id, page_id = _create_page(image_path)
+    commits: list[object] = []
+
+    def on_commit(conn) -> None:
+        commits.append(conn)
+
+    event.listen(engine, "commit", on_commit)
+    try:
+        result = ocr_service.run_ocr_for_page(document_id, page_id, image_path, "/files/page.png")
+    finally:
+        event.remove(engine, "commit", on_commit)
+
+    assert result.status == DocumentStatus.ocr_done
+    assert len(commits) == 1
+    with get_session() as session:
+        assert session.get(DocumentPage, page_id).status == DocumentStatus.ocr_done.value
+        assert session.query(Token).filter(Token.page_id == page_id).count() == 1
+        assert session.query(AuditLog).filter(AuditLog.page_id == page_id).count() == 1
+
+
+def test_bulk_insert_writes_token_rows_on_sqlite(tmp_path, monkeypatch):
+    _reset_db()
+    monkeypatch.setenv("DB_BULK_COPY", "1")
+
+    def unexpected_copy(*args, **kwargs) -> None:
+        raise AssertionError("COPY is only used with postgresql+psycopg")
+
+    monkeypatch.setattr(bulk, "_copy_rows", unexpected_copy)
+    document_id, page_id = _create_page(_write_page_image(tmp_path))
+    tokens = TokenBatch.from_columns(
+        ["Total", "24.60"], [0.99, 0.4], [(1.0, 2.0, 30.0, 10.0), (40.0, 2.0, 30.0, 10.0)]
+    ).group_lines()
+    rows = ocr_service._build_token_rows(document_id, page_id, tokens)
+
+    with get_session() as session:
+        bulk.bulk_insert(session, Token.__table__, rows)
+        bulk.bulk_insert(session, Token.__table__, [])
+        session.commit()
+
+    with get_session() as session:
+        stored = session.query(Token).filter(Token.page_id == page_id).order_by(Token.token_index).all()
+        assert [(token.id, token.text, token.confidence) for token in stored] == [
+            (row["id"], row["text"], row["confidence"]) for row in rows
+        ]
+        assert [json.loads(token.bbox) for token in stored] == [[1.0, 2.0, 30.0, 10.0], [40.0, 2.0, 30.0, 10.0]]
+        assert [token.forced_review for token in stored] == [row["forced_review"] for row in rows]
+
+
+def _dialect_session(name: str, driver: str, executed: list) -> Any:
+    dialect = types.SimpleNamespace(name=name, driver=driver)
+    return types.SimpleNamespace(
+        get_bind=lambda: types.SimpleNamespace(dialect=dialect),
+        execute=lambda statement, rows: executed.append(rows),
+    )
+
+
+def test_bulk_insert_uses_copy_only_for_psycopg(monkeypatch):
+    copied: list = []
+    executed: list = []
+    monkeypatch.setattr(bulk, "_copy_rows", lambda session, table, rows: copied.append(rows))
+    rows = [{"id": "token-0", "text": "Total"}]
+
+    bulk.bulk_insert(_dialect_session("postgresql", "psycopg", executed), Token.__table__, rows)
+    assert (copied, executed) == ([rows], [])
+
+    for name, driver in (("postgresql", "psycopg2"), ("sqlite", "pysqlite")):
+        bulk.bulk_insert(_dialect_session(name, driver, executed), Token.__table__, rows)
+    monkeypatch.setenv("DB_BULK_COPY", "0")
+    bulk.bulk_insert(_dialect_session("postgresql", "psycopg", executed), Token.__table__, rows)
+
+    assert copied == [rows]
+    assert executed == [rows, rows, rows]
+
+
+def test_run_ocr_for_page_skips_persistence_when_canceled_during_inference(tmp_path, monkeypatch):
+    _reset_db()
+    monkeypatch.setenv("OCR_CACHE_MAX_MB", "0")
+    image_path = _write_page_image(tmp_path)
+    document_id, page_id = _create_page(image_path)
+
+    def cancel_during_inference(image_path: str, language: str | None = None, use_cls: bool = True) -> TokenBatch:
+        with get_session() as session:
+            session.execute(
+                DocumentPage.__table__.update()
+                .where(DocumentPage.id == page_id)
+                .values(status=DocumentStatus.canceled.value)
+            )
+            session.commit()
+        return TokenBatch.from_columns(["Total"], [0.99], [(1.0, 2.0, 30.0, 10.0)])
+
+    monkeypatch.setattr(ocr_service, "_extract_tokens", cancel_during_inference)
+    result = ocr_service.run_ocr_for_page(document_id, page_id, image_path, "/files/page.png")
+
+    assert result.status == DocumentStatus.canceled
+    with get_session() as session:
+        assert session.get(DocumentPage, page_id).status == DocumentStatus.canceled.value
+        assert session.query(Token).filter(Token.page_id == page_id).count() == 0
+        assert session.query(AuditLog).filter(AuditLog.page_id == page_id).count() == 0
+
+
+def test_run_ocr_for_page_detects_language_and_reruns_with_its_model(tmp_path, monkeypatch):
+    _reset_db()
+    monkeypatch.setenv("OCR_CACHE_MAX_MB", "0")
+    image_path = _write_page_image(tmp_path)
+    document_id, page_id = _create_page(image_path)
+    languages: list[str | None] = []
+
+    def fake_extract(image_path: str, language: str | None = None, use_cls: bool = True) -> TokenBatch:
+        languages.append(language)
+        texts = ["Rechnung", "für", "die", "Lieferung", "und", "den", "Versand"]
+        boxes = [(index * 40.0, 2.0, 30.0, 10.0) for index in range(len(texts))]
+        return TokenBatch.from_columns(texts, [0.99] * len(texts), boxes)
+
+    monkeypatch.setattr(ocr_service, "_extract_tokens", fake_extract)
+    ocr_service.run_ocr_for_page(document_id, page_id, image_path, "/files/page.png")
+    ocr_service.run_ocr_for_page(document_id, page_id, image_path, "/files/page.png")
+
+    assert languages == [None, "de", "de"]
+    with get_session() as session:
+        assert session.get(Document, document_id).language == "de"
+
+
+def test_run_ocr_for_page_refines_low_confidence_regions(tmp_path, monkeypatch):
+    _reset_db()
+    monkeypatch.setenv("OCR_CACHE_MAX_MB", "0")
+    monkeypatch.setenv("OCR_REFINE", "1")
+    monkeypatch.setenv("OCR_REFINE_SCALE", "2")
+    monkeypatch.setenv("OCR_REFINE_PADDING", "0")
+    image_path = _write_page_image(tmp_path)
+    document_id, page_id = _create_page(image_path)
+    monkeypatch.setattr(
+        ocr_service,
+        "_extract_tokens",
+        lambda image_path, language=None, use_cls=True: TokenBatch.from_columns(
+            ["Tota1", "Invoice", "N0"],
+            [0.5, 0.99, 0.85],
+            [(1.0, 2.0, 10.0, 5.0), (15.0, 2.0, 10.0, 5.0), (28.0, 2.0, 8.0, 5.0)],
+        ),
+    )
+    crop_batches: list[list[tuple]] = []
+
+    class RefiningEngine:
+        def recognize_crops(self, crops):
+            crop_batches.append([crop.shape for crop in crops])
+            return [("Total", 0.97), ("NO", 0.6)]
+
+    monkeypatch.setattr(ocr_service, "_engine_registry", OcrEngineRegistry(lambda language: RefiningEngine()))
+
+    result = ocr_service.run_ocr_for_page(document_id, page_id, image_path, "/files/page.png")
+
+    assert crop_batches == [[(10, 20, 3), (10, 16, 3)]]
+    assert result.tokens.texts == ["Total", "Invoice", "N0"]
+    assert result.tokens.confidences.tolist() == [0.97, 0.99, 0.85]
+
+
+def test_refinement_keeps_tokens_when_engine_drops_crops(tmp_path, monkeypatch):
+    monkeypatch.setenv("OCR_REFINE_PADDING", "0")
+    tokens = TokenBatch.from_columns(
+        ["Tota1", "N0"], [0.5, 0.6], [(1.0, 2.0, 10.0, 5.0), (28.0, 2.0, 8.0, 5.0)]
+    )
+
+    class ShortEngine:
+        def recognize_crops(self, crops):
+            return [("NO", 0.97)]
+
+    monkeypatch.setattr(ocr_service, "_engine_registry", OcrEngineRegistry(lambda language: ShortEngine()))
+
+    refined = ocr_service._refine_low_confidence(np.zeros((20, 40, 3), dtype=np.uint8), tokens, "en")
+
+    assert refined.texts == ["Tota1", "N0"]
+    assert refined.confidences.tolist() == [0.5, 0.6]
+
+
+def test_run_ocr_for_page_skips_angle_classifier_for_rendered_pages(tmp_path, monkeypatch):
+    _reset_db()
+    monkeypatch.setenv("OCR_CACHE_MAX_MB", "0")
+    calls: list[bool] = []
+
+    def fake_extract(image_path, language=None, use_cls=True) -> TokenBatch:
+        calls.append(use_cls)
+        return TokenBatch.from_columns(["Total"], [0.99], [(1.0, 2.0, 30.0, 10.0)])
+
+    monkeypatch.setattr(ocr_service, "_extract_tokens", fake_extract)
+    image_path = str(tmp_path / "page.png")
+    Image.new("RGB", (40, 20), "white").save(image_path, "PNG")
+    document_id, page_id = _create_page(image_path)
+
+    ocr_service.run_ocr_for_page(
+        document_id, page_id, image_path, "/files/page.png", pixels=np.zeros((20, 40, 3), dtype=np.uint8)
+    )
+    _reset_db()
+    document_id, page_id = _create_page(image_path)
+    ocr_service.run_ocr_for_page(document_id, page_id, image_path, "/files/page.png")
+
+    assert calls == [False, True]
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import os
+import signal
+import threading
+import time
+
+import numpy as np
+import pytest
+from prometheus_client import REGISTRY
+
+from app.services import ocr as ocr_service
+from app.services.ocr_batcher import RecognitionBatcher
+from app.services.ocr_engines import FakeOcrEngine
+from app.services.ocr_pool import OcrEngineRegistry
+from app.services.token_batch import TokenBatch
+
+
+def _crops(count: int, value: int) -> list[np.ndarray]:
+    return [np.full((4, 8, 3), value, dtype=np.uint8) for _ in range(count)]
+
+
+def _recorder(calls: list[tuple[str, int]]):
+    def recognize(language: str, crops: list[np.ndarray]) -> list[tuple[str, float]]:
+        calls.append((language, len(crops)))
+        return [(str(int(crop[0, 0, 0])), 0.9) for crop in crops]
+
+    return recognize
+
+
+def test_batcher_merges_pages_and_scatters_results():
+    calls: list[tuple[str, int]] = []
+    batcher = RecognitionBatcher(_recorder(calls), max_crops=64, max_wait=0.2)
+    batch_count = REGISTRY.get_sample_value("vera_ocr_batch_crops_count") or 0.0
+
+    futures = [batcher.submit("en", _crops(count, value)) for count, value in ((2, 1), (3, 2), (1, 3))]
+
+    assert [future.result(timeout=5) for future in futures] == [
+        [("1", 0.9)] * 2,
+        [("2", 0.9)] * 3,
+        [("3", 0.9)],
+    ]
+    assert calls == [("en", 6)]
+    assert REGISTRY.get_sample_value("vera_ocr_batch_crops_count") == batch_count + 1
+    assert REGISTRY.get_sample_value("vera_ocr_batch_pages_sum") >= 3
+
+
+def test_batcher_flushes_at_size_limit_and_keeps_languages_apart():
+    calls: list[tuple[str, int]] = []
+    release = threading.Event()
+
+    def slow_recognize(language: str, crops: list[np.ndarray]) -> list[tuple[str, float]]:
+        release.wait(5)
+        return _recorder(calls)(language, crops)
+
+    batcher = RecognitionBatcher(slow_recognize, max_crops=4, max_wait=0.05)
+    futures = [
+        batcher.submit("en", _crops(3, 1)),
+        batcher.submit("en", _crops(3, 2)),
+        batcher.submit("de", _crops(1, 3)),
+    ]
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    assert sorted(calls) == [("de", 1), ("en", 3), ("en", 3)]
+
+
+def test_batcher_propagates_recognizer_errors():
+    def failing(language: str, crops: list[np.ndarray]) -> list[tuple[str, float]]:
+        raise RuntimeError("boom")
+
+    batcher = RecognitionBatcher(failing, max_crops=8, max_wait=0.0)
+
+    with pytest.raises(RuntimeError):
+        batcher.submit("en", _crops(2, 1)).result(timeout=5)
+    assert batcher.submit("en", []).result(timeout=5) == []
+
+
+def test_batcher_fails_every_page_when_results_do_not_match_crops():
+    batcher = RecognitionBatcher(lambda language, crops: [("Total", 0.9)] * (len(crops) - 1), 64, 0.2)
+
+    futures = [batcher.submit("en", _crops(2, 1)), batcher.submit("en", _crops(1, 2))]
+
+    for future in futures:
+        with pytest.raises(RuntimeError) as error:
+            future.result(timeout=5)
+        assert str(error.value) == "ocr_result_mismatch"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+def test_batcher_restarts_its_thread_in_forked_children():
+    calls: list[tuple[str, int]] = []
+    batcher = RecognitionBatcher(_recorder(calls), max_crops=8, max_wait=0.0)
+    assert batcher.submit("en", _crops(1, 1)).result(timeout=5) == [("1", 0.9)]
+    held, release = threading.Event(), threading.Event()
+
+    def hold_lock() -> None:
+        with batcher._condition:
+            held.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    held.wait(5)
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            ok = batcher.submit("en", _crops(2, 2)).result(timeout=5) == [("2", 0.9)] * 2
+        except Exception:
+            ok = False
+        os._exit(0 if ok else 1)
+    release.set()
+    holder.join(5)
+    deadline = time.monotonic() + 10
+    finished, status = os.waitpid(pid, os.WNOHANG)
+    while not finished and time.monotonic() < deadline:
+        time.sleep(0.05)
+        finished, status = os.waitpid(pid, os.WNOHANG)
+    if not finished:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+
+    assert finished and os.waitstatus_to_exitcode(status) == 0
+
+
+def test_extract_tokens_fails_when_batch_times_out(monkeypatch):
+    tokens = TokenBatch.from_columns(["Total"], [0.9], [(2, 2, 20, 8)])
+    release = threading.Event()
+    monkeypatch.setenv("OCR_BATCH", "1")
+    monkeypatch.setenv("OCR_BATCH_TIMEOUT_S", "0.05")
+    monkeypatch.setattr(ocr_service, "_engine_registry", OcrEngineRegistry(lambda language: FakeOcrEngine(tokens)))
+
+    def stuck(language: str, crops: list[np.ndarray]) -> list[tuple[str, float]]:
+        release.wait(5)
+        return [("Total", 0.9)] * len(crops)
+
+    monkeypatch.setattr(ocr_service, "_recognition_batcher", RecognitionBatcher(stuck, 64, 0.0))
+
+    with pytest.raises(RuntimeError) as error:
+        ocr_service._extract_tokens(np.full((20, 80, 3), 255, dtype=np.uint8), "en", use_cls=False)
+    release.set()
+
+    assert str(error.value) == "ocr_failed"
+
+
+def test_extract_tokens_batches_recognition_for_upright_pages(monkeypatch):
+    tokens = TokenBatch.from_columns(
+        ["Total", "?", "24.60"], [0.9, 0.2, 0.8], [(2, 2, 20, 8), (30, 2, 6, 8), (40, 2, 20, 8)]
+    )
+    calls: list[tuple[str, int]] = []
+    monkeypatch.setenv("OCR_BATCH", "1")
+    monkeypatch.setattr(ocr_service, "_engine_registry", OcrEngineRegistry(lambda language: FakeOcrEngine(tokens)))
+
+    def recognize(language: str, crops: list[np.ndarray]) -> list[tuple[str, float]]:
+        calls.append((language, len(crops)))
+        return ocr_service._recognize_crops(language, crops)
+
+    monkeypatch.setattr(ocr_service, "_recognition_batcher", RecognitionBatcher(recognize, 64, 0.0))
+    page = np.full((20, 80, 3), 255, dtype=np.uint8)
+
+    batched = ocr_service._extract_tokens(page, "en", use_cls=False)
+
+    assert calls == [("en", 3)]
+    assert batched.texts == ["Total", "24.60"]
+    assert batched.boxes.tolist() == [[2.0, 2.0, 20.0, 8.0], [40.0, 2.0, 20.0, 8.0]]
+    assert ocr_service._extract_tokens(page, "en", use_cls=True).texts == ["Total", "?", "24.60"]
+    assert calls == [("en", 3)]
+    assert ocr_service._engine_settings("en")["rec_batch_num"] == 64
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+import os
+import uuid
+
+from PIL import Image
+
+from app.db.session import Base, engine, get_session
+from app.models.documents import Document, DocumentPage, Token
+from app.schemas.documents import DocumentStatus
+from app.services import ocr as ocr_service
+from app.services.token_batch import TokenBatch
+from app.services import ocr_cache
+
+
+def _reset_db() -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def _write_image(path, color: str = "white") -> str:
+    Image.new("RGB", (40, 20), color).save(path, "PNG")
+    return str(path)
+
+
+def _create_page(image_path: str) -> tuple[str, str]:
+    document_id = uuid.uuid4().hex
+    page_id = uuid.uuid4().hex
+    with get_session() as session:
+        session.add(
+            Document(
+                id=document_id,
+                image_path=image_path,
+                image_width=0,
+                image_height=0,
+                status=DocumentStatus.processing.value,
+                structured_fields=json.dumps({}),
+                page_count=1,
+            )
+        )
+        session.add(
+            DocumentPage(
+                id=page_id,
+                document_id=document_id,
+                page_index=0,
+                image_path=image_path,
+                image_width=0,
+                image_height=0,
+                status=DocumentStatus.processing.value,
+            )
+        )
+        session.commit()
+    return document_id, page_id
+
+
+def test_cache_key_depends_on_bytes_and_settings(tmp_path):
+    first = _write_image(tmp_path / "a.png")
+    second = _write_image(tmp_path / "b.png")
+    third = _write_image(tmp_path / "c.png", "black")
+
+    settings = {"engine": "paddleocr", "lang": "en"}
+    assert ocr_cache.cache_key(first, settings) == ocr_cache.cache_key(second, settings)
+    assert ocr_cache.cache_key(first, settings) != ocr_cache.cache_key(third, settings)
+    assert ocr_cache.cache_key(first, settings) != ocr_cache.cache_key(first, {**settings, "lang": "de"})
+
+
+def test_cache_round_trip_and_lru_eviction(tmp_path, monkeypatch):
+    monkeypatch.setenv("OCR_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("OCR_CACHE_MAX_MB", "0.00015")
+    tokens = TokenBatch.from_columns(["Total"], [0.97], [(1.0, 2.0, 3.0, 4.0)])
+
+    assert ocr_cache.get_tokens("first") is None
+    ocr_cache.put_tokens("first", tokens)
+    assert ocr_cache.get_tokens("first").to_dicts() == tokens.to_dicts()
+
+    os.utime(tmp_path / "cache" / "first.json", (1, 1))
+    ocr_cache.put_tokens("second", tokens)
+    ocr_cache.put_tokens("third", tokens)
+
+    assert not (tmp_path / "cache" / "first.json").exists()
+    assert ocr_cache.get_tokens("third").to_dicts() == tokens.to_dicts()
+
+
+def test_run_ocr_for_page_reuses_cached_tokens(tmp_path, monkeypatch):
+    _reset_db()
+    monkeypatch.setenv("OCR_CACHE_DIR", str(tmp_path / "cache"))
+    calls: list[str] = []
+
+    def fake_extract(image_path: str, language: str | None = None, use_cls: bool = True) -> TokenBatch:
+        calls.append(image_path)
+        return TokenBatch.from_columns(["Total"], [0.99], [(1.0, 2.0, 30.0, 10.0)])
+
+    monkeypatch.setattr(ocr_service, "_extract_tokens", fake_extract)
+    first_path = _write_image(tmp_path / "first.png")
+    repeat_path = _write_image(tmp_path / "repeat.png")
+    first_document, first_page = _create_page(first_path)
+    repeat_document, repeat_page = _create_page(repeat_path)
+
+    ocr_service.run_ocr_for_page(first_document, first_page, first_path, "/files/first.png")
+    result = ocr_service.run_ocr_for_page(repeat_document, repeat_page, repeat_path, "/files/repeat.png")
+
+    assert calls == [first_path]
+    assert result.tokens.texts == ["Total"]
+    with get_session() as session:
+        assert session.query(Token).filter(Token.page_id == repeat_page).count() == 1
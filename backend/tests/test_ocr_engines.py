@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import sys
+import types
+from typing import Any, cast
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.services import ocr as ocr_service
+from app.services.ocr_engines import FakeOcrEngine, OnnxOcrEngine, PaddleOcrEngine, create_ocr_engine
+from app.services.ocr_pool import OcrEngineRegistry
+from app.services.token_batch import TokenBatch
+
+POLYGON = [[10, 20], [50, 22], [52, 40], [8, 38]]
+
+
+def _fake_module(name: str, attribute: str, engine_class: type) -> Any:
+    module = cast(Any, types.ModuleType(name))
+    setattr(module, attribute, engine_class)
+    return module
+
+
+def test_fake_engine_covers_the_page(tmp_path):
+    image_path = str(tmp_path / "page.png")
+    Image.new("RGB", (40, 20), "white").save(image_path, "PNG")
+    engine = create_ocr_engine({"engine": "fake", "lang": "en", "use_angle_cls": True})
+
+    assert engine.recognize(image_path).to_dicts() == [{"text": "FAKE", "confidence": 0.99, "bbox": (0.0, 0.0, 40.0, 20.0)}]
+    assert engine.recognize(np.zeros((30, 60, 3), dtype=np.uint8)).boxes.tolist() == [[0.0, 0.0, 60.0, 30.0]]
+
+
+def test_fake_engine_returns_copies_of_configured_tokens():
+    tokens = TokenBatch.from_columns(["Total"], [0.5], [(1.0, 2.0, 3.0, 4.0)])
+    engine = FakeOcrEngine(tokens)
+
+    first = engine.recognize("unused.png")
+    first.texts[0] = "changed"
+
+    assert engine.recognize("unused.png").texts == ["Total"]
+
+
+def test_create_ocr_engine_rejects_unknown_backend():
+    with pytest.raises(ValueError) as error:
+        create_ocr_engine({"engine": "tesseract", "lang": "en", "use_angle_cls": True})
+    assert str(error.value) == "unsupported_ocr_engine"
+
+
+def test_paddle_engine_flattens_result_lines():
+    class FakePaddleOCR:
+        def __init__(self, **kwargs) -> None:
+            self.kwargs = kwargs
+
+        def ocr(self, image, cls: bool, det: bool = True, rec: bool = True) -> list:
+            if not rec:
+                return [[POLYGON]]
+            if not det:
+                return [[("Total", 0.9) for _ in crops] for crops in image]
+            return [[(POLYGON, ("Total", 0.75))], None]
+
+    with patch.dict(sys.modules, {"paddleocr": _fake_module("paddleocr", "PaddleOCR", FakePaddleOCR)}):
+        engine = PaddleOcrEngine()
+        tokens = engine.recognize("page.png")
+
+    assert tokens.to_dicts() == [{"text": "Total", "confidence": 0.75, "bbox": (8.0, 20.0, 44.0, 20.0)}]
+    assert engine.recognize_crops([np.zeros((4, 8, 3), dtype=np.uint8)] * 2) == [("Total", 0.9), ("Total", 0.9)]
+    assert engine.detect("page.png") == [POLYGON]
+    assert engine._ocr.kwargs["rec_batch_num"] == 6
+
+
+def test_onnx_engine_passes_thread_settings_and_reads_results(monkeypatch):
+    created: list[dict] = []
+
+    class FakeRapidOCR:
+        def __init__(self, **kwargs) -> None:
+            created.append(kwargs)
+
+        def __call__(self, image, use_cls: bool, use_det: bool = True, use_rec: bool = True) -> tuple:
+            if not use_rec:
+                return [POLYGON], 0.1
+            if isinstance(image, np.ndarray):
+                return None, None
+            return [(POLYGON, "Total", "0.75")], [0.1, 0.1, 0.1]
+
+    monkeypatch.setenv("OCR_ENGINE", "onnxruntime")
+    monkeypatch.setenv("OCR_ONNX_THREADS", "3")
+    monkeypatch.setenv("OCR_ONNX_REC_MODEL", "/models/rec.onnx")
+    monkeypatch.setenv("OCR_ONNX_REC_MODEL_DE", "/models/rec_german.onnx")
+    fake_module = _fake_module("rapidocr_onnxruntime", "RapidOCR", FakeRapidOCR)
+    with patch.dict(sys.modules, {"rapidocr_onnxruntime": fake_module}):
+        engine = ocr_service._create_engine("de")
+
+    assert isinstance(engine, OnnxOcrEngine)
+    assert created[0]["intra_op_num_threads"] == 3
+    assert created[0]["rec_model_path"] == "/models/rec_german.onnx"
+    assert "det_model_path" not in created[0]
+    assert engine.recognize("page.png").to_dicts() == [
+        {"text": "Total", "confidence": 0.75, "bbox": (8.0, 20.0, 44.0, 20.0)}
+    ]
+    assert len(engine.recognize(np.zeros((4, 4, 3), dtype=np.uint8))) == 0
+    assert engine.detect("page.png") == [POLYGON]
+
+
+def test_extract_tokens_uses_configured_engine(monkeypatch):
+    monkeypatch.setenv("OCR_ENGINE", "fake")
+    monkeypatch.setattr(ocr_service, "_engine_registry", OcrEngineRegistry(ocr_service._create_engine))
+
+    tokens = ocr_service._extract_tokens(np.zeros((20, 40, 3), dtype=np.uint8))
+
+    assert tokens.texts == ["FAKE"]
+    assert ocr_service._engine_settings()["engine"] == "fake"
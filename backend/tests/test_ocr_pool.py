@@ -0,0 +1,116 @@
+from app.services import ocr_pool as ocr_pool_module
+from app.services.ocr_pool import OcrEnginePool, OcrEngineRegistry
+from app.utils.metrics import OCR_ENGINE_EVICTIONS, OCR_ENGINE_LEASES
+
+
+def _lease_count(state: str) -> float:
+    return OCR_ENGINE_LEASES.labels(state)._value.get()
+
+
+def test_pool_warm_builds_engines_once():
+    built: list[object] = []
+
+    def factory() -> object:
+        engine = object()
+        built.append(engine)
+        return engine
+
+    pool = OcrEnginePool(factory, max_idle=2)
+    assert pool.warm() == 2
+    assert pool.warm() == 2
+    assert len(built) == 2
+
+
+def test_pool_warm_primes_each_new_engine():
+    primed: list[object] = []
+    pool = OcrEnginePool(object, max_idle=2)
+
+    pool.warm(prime=primed.append)
+    pool.warm(prime=primed.append)
+
+    assert len(primed) == 2
+    with pool.lease():
+        pass
+    assert len(primed) == 2
+
+
+def test_pool_lease_reuses_warm_engine():
+    built: list[object] = []
+
+    def factory() -> object:
+        engine = object()
+        built.append(engine)
+        return engine
+
+    pool = OcrEnginePool(factory, max_idle=1)
+    pool.warm()
+    warm_before = _lease_count("warm")
+    cold_before = _lease_count("cold")
+
+    with pool.lease() as first:
+        with pool.lease() as second:
+            assert first is built[0]
+            assert second is not first
+    with pool.lease() as third:
+        assert third in built
+
+    assert len(built) == 2
+
+    assert _lease_count("warm") - warm_before == 2
+    assert _lease_count("cold") - cold_before == 1
+    assert pool.idle_count == 1
+
+
+def test_pool_footprint_drops_engines_it_does_not_keep(monkeypatch):
+    rss = {"bytes": 0}
+
+    def factory() -> object:
+        rss["bytes"] += 100
+        return object()
+
+    monkeypatch.setattr(ocr_pool_module, "current_rss_bytes", lambda: rss["bytes"])
+    pool = OcrEnginePool(factory, max_idle=1)
+    pool.warm()
+
+    with pool.lease():
+        with pool.lease():
+            assert pool.footprint_bytes == 200
+
+    assert pool.footprint_bytes == 100
+    assert pool.idle_count == 1
+
+
+def test_registry_evicts_least_recently_used_language_over_budget(monkeypatch):
+    rss = {"bytes": 0}
+    built: list[str] = []
+
+    def factory(language: str) -> object:
+        built.append(language)
+        rss["bytes"] += 40 * 1024 * 1024
+        return object()
+
+    monkeypatch.setenv("OCR_MODEL_RSS_BUDGET_MB", "100")
+    monkeypatch.setattr(ocr_pool_module, "current_rss_bytes", lambda: rss["bytes"])
+    evictions_before = OCR_ENGINE_EVICTIONS.labels("de")._value.get()
+    registry = OcrEngineRegistry(factory)
+
+    registry.warm("en")
+    registry.warm("de")
+    with registry.lease("en"):
+        pass
+    with registry.lease("fr"):
+        pass
+
+    assert built == ["en", "de", "fr"]
+    assert registry.languages == ["en", "fr"]
+    assert OCR_ENGINE_EVICTIONS.labels("de")._value.get() - evictions_before == 1
+
+
+def test_registry_without_budget_keeps_every_language(monkeypatch):
+    monkeypatch.delenv("OCR_MODEL_RSS_BUDGET_MB", raising=False)
+    registry = OcrEngineRegistry(lambda language: object())
+
+    for language in ("en", "de", "fr"):
+        registry.warm(language)
+
+    assert registry.languages == ["en", "de", "fr"]
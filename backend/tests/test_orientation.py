@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from app.services.orientation import EXIF_ORIENTATION_TAG, detect_orientation
+
+
+def _text_page(path: str, angle: int = 0) -> None:
+    font = ImageFont.load_default(size=28)
+    image = Image.new("RGB", (1400, 1000), "white")
+    draw = ImageDraw.Draw(image)
+    for line in range(12):
+        draw.text((80, 60 + line * 70), f"Invoice {line} Total 24.60 Widget qty paid", fill="black", font=font)
+    image.rotate(angle).save(path, "PNG")
+
+
+def test_probe_tells_upright_from_upside_down_pages(tmp_path):
+    upright_path = str(tmp_path / "upright.png")
+    flipped_path = str(tmp_path / "flipped.png")
+    _text_page(upright_path)
+    _text_page(flipped_path, angle=180)
+
+    assert detect_orientation(upright_path).source == "probe"
+    assert detect_orientation(upright_path).upright
+    assert detect_orientation(flipped_path).source == "unknown"
+    assert not detect_orientation(flipped_path).upright
+
+
+def test_exif_and_pdf_pages_are_known_upright(tmp_path):
+    image_path = str(tmp_path / "photo.jpg")
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION_TAG] = 6
+    Image.new("RGB", (40, 20), "white").save(image_path, "JPEG", exif=exif)
+
+    assert detect_orientation(image_path).source == "exif"
+    assert detect_orientation(np.zeros((20, 40, 3), dtype=np.uint8), rendered_from_pdf=True).source == "pdf"
+
+
+def test_detection_can_be_disabled(tmp_path, monkeypatch):
+    monkeypatch.setenv("OCR_ORIENTATION_DETECT", "0")
+
+    orientation = detect_orientation(np.zeros((20, 40, 3), dtype=np.uint8), rendered_from_pdf=True)
+
+    assert orientation.source == "disabled"
+    assert not orientation.upright
+
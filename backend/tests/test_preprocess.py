@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from app.services import ocr as ocr_service
+from app.services.preprocess import PageTransform, preprocess_page
+from app.services.token_batch import TokenBatch
+
+
+def _text_page(path: str, angle: float, line_height: int = 24) -> tuple[int, int, int, int]:
+    image = Image.new("RGB", (1600, 1200), "white")
+    draw = ImageDraw.Draw(image)
+    for line in range(20):
+        top = 100 + line * line_height * 2
+        for word in range(12):
+            left = 100 + word * 110
+            draw.rectangle((left, top, left + 90, top + line_height), fill="black")
+    marker = (700, 1110, 760, 1150)
+    draw.rectangle(marker, fill=(0, 0, 0))
+    image.rotate(angle, fillcolor=(255, 255, 255)).save(path, "PNG")
+    return marker
+
+
+def test_preprocess_deskews_and_downscales(tmp_path, monkeypatch):
+    monkeypatch.setenv("OCR_PREPROCESS_TEXT_HEIGHT", "12")
+    image_path = str(tmp_path / "page.png")
+    _text_page(image_path, angle=-2.0)
+
+    prepared = preprocess_page(image_path)
+
+    assert abs(prepared.transform.angle - 2.0) <= 0.2
+    assert 0.4 <= prepared.transform.scale <= 0.6
+    height, width = prepared.pixels.shape[:2]
+    assert (width, height) == prepared.transform.output_size
+    assert width * height < 1600 * 1200 * 0.5
+
+
+def test_transform_maps_boxes_back_to_source_coordinates():
+    transform = PageTransform(scale=0.5, angle=3.0, source_size=(1600, 1200), output_size=(862, 641))
+    source_box = np.array([[700.0, 1110.0, 60.0, 40.0]])
+    center = np.array([730.0 - 1600 / 2, 1130.0 - 1200 / 2]) * 0.5
+    theta = np.radians(3.0)
+    output_center = np.array(
+        [
+            center[0] * np.cos(theta) + center[1] * np.sin(theta) + 862 / 2,
+            -center[0] * np.sin(theta) + center[1] * np.cos(theta) + 641 / 2,
+        ]
+    )
+
+    mapped = transform.to_source(np.array([[output_center[0] - 5, output_center[1] - 5, 10.0, 10.0]]))
+
+    mapped_center = mapped[0, :2] + mapped[0, 2:] / 2
+    source_center = source_box[0, :2] + source_box[0, 2:] / 2
+    assert np.allclose(mapped_center, source_center, atol=1.0)
+
+
+def test_recognize_page_reports_boxes_in_source_coordinates(tmp_path, monkeypatch):
+    monkeypatch.setenv("OCR_PREPROCESS", "1")
+    monkeypatch.setenv("OCR_PREPROCESS_TEXT_HEIGHT", "12")
+    image_path = str(tmp_path / "page.png")
+    left, top, right, bottom = _text_page(image_path, angle=0.0)
+
+    def find_marker(pixels, language=None, use_cls=True) -> TokenBatch:
+        ink = pixels[:, :, 0] < 128
+        rows = np.flatnonzero(ink.any(axis=1))
+        marker_rows = rows[rows > rows.max() - 30]
+        columns = np.flatnonzero(ink[marker_rows].any(axis=0))
+        box = (
+            columns.min(),
+            marker_rows.min(),
+            columns.max() - columns.min() + 1,
+            marker_rows.max() - marker_rows.min() + 1,
+        )
+        return TokenBatch.from_columns(["marker"], [0.99], [box])
+
+    monkeypatch.setattr(ocr_service, "_extract_tokens", find_marker)
+    tokens = ocr_service._recognize_page(image_path, None)
+
+    assert np.allclose(tokens.boxes[0], [left, top, right - left + 1, bottom - top + 1], atol=3.0)
+    assert "preprocess" in ocr_service._engine_settings()
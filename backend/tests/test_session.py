@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from app.db.session import _async_database_url
+
+
+def test_async_database_url_uses_async_drivers():
+    assert _async_database_url("sqlite:///./data/vera.db") == "sqlite+aiosqlite:///./data/vera.db"
+    assert _async_database_url("postgresql://vera:vera@db/vera") == "postgresql+psycopg://vera:vera@db/vera"
+    assert _async_database_url("postgresql+psycopg://vera:vera@db/vera") == "postgresql+psycopg://vera:vera@db/vera"
@@ -11,7 +11,7 @@ from fastapi import UploadFile
 import pytest
 from PIL import Image
 
-from app.services.storage import UploadLike, save_upload
+from app.services.storage import UploadLike, save_upload, split_pages
 
 
 class DummyUpload(UploadLike):
@@ -20,6 +20,18 @@ class DummyUpload(UploadLike):
         self.file = io.BytesIO(content)
 
 
+def _fake_pdf2image(page_count: int, calls: list[dict] | None = None) -> Any:
+    def convert_from_path(path: str, first_page: int, last_page: int, **kwargs) -> list[Image.Image]:
+        if calls is not None:
+            calls.append({"first_page": first_page, "last_page": last_page, **kwargs})
+        return [Image.new("RGB", (10, 10), "white") for _ in range(first_page, last_page + 1)]
+
+    fake_pdf2image = cast(Any, types.ModuleType("pdf2image"))
+    fake_pdf2image.convert_from_path = convert_from_path
+    fake_pdf2image.pdfinfo_from_path = lambda *args, **kwargs: {"Pages": page_count}
+    return fake_pdf2image
+
+
 def test_save_upload_rejects_unknown_extension(tmp_path, monkeypatch):
     monkeypatch.setenv("STRICT_MIME_VALIDATION", "0")
     monkeypatch.setenv("DATA_DIR", str(tmp_path))
@@ -33,11 +45,7 @@ def test_save_upload_pdf_converts_pages(tmp_path, monkeypatch):
     monkeypatch.setenv("STRICT_MIME_VALIDATION", "0")
     monkeypatch.setenv("DATA_DIR", str(tmp_path))
     upload = cast(UploadFile, DummyUpload("sample.pdf", b"%PDF-1.4"))
-    fake_image = Image.new("RGB", (10, 10), "white")
-    fake_image_two = Image.new("RGB", (10, 10), "white")
-
-    fake_pdf2image = cast(Any, types.ModuleType("pdf2image"))
-    fake_pdf2image.convert_from_path = lambda *args, **kwargs: [fake_image, fake_image_two]
+    fake_pdf2image = _fake_pdf2image(page_count=2)
     with patch.dict(sys.modules, {"pdf2image": fake_pdf2image}):
         document_id, image_path, image_url, pages = save_upload(upload)
 
@@ -49,6 +57,38 @@ def test_save_upload_pdf_converts_pages(tmp_path, monkeypatch):
     assert (tmp_path / f"{document_id}-page-1.png").exists()
 
 
+def test_save_upload_pdf_streams_pages_in_windows(tmp_path, monkeypatch):
+    monkeypatch.setenv("STRICT_MIME_VALIDATION", "0")
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("PDF_RASTER_WINDOW", "2")
+    monkeypatch.setenv("PDF_RASTER_DPI", "150")
+    upload = cast(UploadFile, DummyUpload("sample.pdf", b"%PDF-1.4"))
+    calls: list[dict] = []
+    fake_pdf2image = _fake_pdf2image(page_count=5, calls=calls)
+    with patch.dict(sys.modules, {"pdf2image": fake_pdf2image}):
+        _document_id, _image_path, _image_url, pages = save_upload(upload)
+
+    assert [page["page_index"] for page in pages] == [0, 1, 2, 3, 4]
+    assert [(call["first_page"], call["last_page"]) for call in calls] == [(1, 2), (3, 4), (5, 5)]
+    assert {call["dpi"] for call in calls} == {150}
+    assert pages[0]["image_width"] == 10
+
+
+def test_split_pages_keeps_pixels_for_leading_pages(tmp_path):
+    source_path = str(tmp_path / "doc.pdf")
+    with open(source_path, "wb") as handle:
+        handle.write(b"%PDF-1.4")
+    with patch.dict(sys.modules, {"pdf2image": _fake_pdf2image(page_count=2)}):
+        pages = list(split_pages("doc", source_path, keep_pixels=1))
+
+    assert pages[0]["pixels"].shape == (10, 10, 3)
+    assert pages[0]["pixels"].flags["C_CONTIGUOUS"]
+    pages[0]["encoded"].result()
+    assert (tmp_path / "doc-page-0.png").exists()
+    assert "pixels" not in pages[1]
+    assert (tmp_path / "doc-page-1.png").exists()
+
+
 def test_save_upload_rejects_large_files(tmp_path, monkeypatch):
     monkeypatch.setenv("STRICT_MIME_VALIDATION", "0")
     monkeypatch.setenv("MAX_UPLOAD_MB", "0")
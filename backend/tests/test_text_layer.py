@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+import uuid
+
+from PIL import Image
+
+from app.db.session import Base, engine, get_session
+from app.models.documents import AuditLog, Document, DocumentPage, Token
+from app.schemas.documents import DocumentStatus
+from app.services import ocr as ocr_service
+from app.services.text_layer import parse_bbox_layout
+from app.services.token_batch import TokenBatch
+
+SAMPLE_LAYOUT = """<!DOCTYPE html><html><body><doc>
+  <page width="200.000000" height="100.000000">
+    <word xMin="10.000000" yMin="20.000000" xMax="50.000000" yMax="30.000000">Total</word>
+    <word xMin="60.000000" yMin="20.000000" xMax="90.000000" yMax="30.000000">&#163;24.60</word>
+    <word xMin="10.000000" yMin="40.000000" xMax="30.000000" yMax="50.000000">A&amp;B</word>
+  </page>
+</doc></body></html>"""
+
+
+def _reset_db() -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def _create_page(image_path: str) -> tuple[str, str]:
+    document_id = uuid.uuid4().hex
+    page_id = uuid.uuid4().hex
+    with get_session() as session:
+        session.add(
+            Document(
+                id=document_id,
+                image_path=image_path,
+                image_width=0,
+                image_height=0,
+                status=DocumentStatus.processing.value,
+                structured_fields=json.dumps({}),
+                page_count=1,
+            )
+        )
+        session.add(
+            DocumentPage(
+                id=page_id,
+                document_id=document_id,
+                page_index=0,
+                image_path=image_path,
+                image_width=0,
+                image_height=0,
+                status=DocumentStatus.processing.value,
+            )
+        )
+        session.commit()
+    return document_id, page_id
+
+
+def test_parse_bbox_layout_scales_to_image():
+    tokens = parse_bbox_layout(SAMPLE_LAYOUT, image_width=400, image_height=200)
+
+    assert tokens.texts == ["Total", "£24.60", "A&B"]
+    assert tokens.to_dicts()[0] == {"text": "Total", "confidence": 1.0, "bbox": (20.0, 40.0, 80.0, 20.0)}
+
+
+def test_run_ocr_for_page_prefers_text_layer(tmp_path, monkeypatch):
+    _reset_db()
+    image_path = str(tmp_path / "page.png")
+    Image.new("RGB", (400, 200), "white").save(image_path, "PNG")
+    document_id, page_id = _create_page(image_path)
+    monkeypatch.setenv("TEXT_LAYER_MIN_WORDS", "3")
+    monkeypatch.setattr(
+        ocr_service,
+        "extract_text_layer",
+        lambda pdf_path, page_index, width, height: parse_bbox_layout(SAMPLE_LAYOUT, width, height),
+    )
+
+    def unexpected_ocr(image_path: str) -> TokenBatch:
+        raise AssertionError("OCR should be skipped")
+
+    monkeypatch.setattr(ocr_service, "_extract_tokens", unexpected_ocr)
+
+    result = ocr_service.run_ocr_for_page(
+        document_id, page_id, image_path, "/files/page.png", pdf_path="doc.pdf", page_index=0
+    )
+
+    assert result.tokens.texts == ["Total", "£24.60", "A&B"]
+    with get_session() as session:
+        labels = {token.confidence_label for token in session.query(Token).filter(Token.page_id == page_id)}
+        assert labels == {"trusted"}
+        event = session.query(AuditLog).filter(AuditLog.page_id == page_id).one()
+        assert json.loads(event.detail)["source"] == "text_layer"
+
+
+def test_run_ocr_for_page_falls_back_to_ocr_for_sparse_text(tmp_path, monkeypatch):
+    _reset_db()
+    image_path = str(tmp_path / "scan.png")
+    Image.new("RGB", (400, 200), "white").save(image_path, "PNG")
+    document_id, page_id = _create_page(image_path)
+    monkeypatch.setenv("TEXT_LAYER_MIN_WORDS", "5")
+    monkeypatch.setenv("OCR_CACHE_MAX_MB", "0")
+    monkeypatch.setattr(
+        ocr_service,
+        "extract_text_layer",
+        lambda pdf_path, page_index, width, height: parse_bbox_layout(SAMPLE_LAYOUT, width, height),
+    )
+    monkeypatch.setattr(
+        ocr_service,
+        "_extract_tokens",
+        lambda image_path, language=None, use_cls=True: TokenBatch.from_columns(
+            ["Scanned"], [0.95], [(1.0, 1.0, 10.0, 10.0)]
+        ),
+    )
+
+    result = ocr_service.run_ocr_for_page(
+        document_id, page_id, image_path, "/files/scan.png", pdf_path="doc.pdf", page_index=0
+    )
+
+    assert result.tokens.texts == ["Scanned"]
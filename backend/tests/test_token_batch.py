@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from app.services.token_batch import TokenBatch
+
+
+def _group(tokens: list[dict]) -> list[dict]:
+    return TokenBatch.from_dicts(tokens).group_lines().to_dicts()
+
+
+def _token(text: str, x: float, y: float, height: float = 10.0) -> dict:
+    return {"text": text, "confidence": 0.9, "bbox": (x, y, 30.0, height)}
+
+
+def test_line_grouping_orders_lines_and_tokens():
+    tokens = [
+        _token("Total", 10.0, 52.0),
+        _token("Invoice", 10.0, 10.0),
+        _token("£24.60", 80.0, 50.0),
+        _token("#1042", 90.0, 14.0),
+        _token("Due", 10.0, 90.0),
+        _token("VAT", 45.0, 48.0),
+    ]
+
+    grouped = _group(tokens)
+
+    assert [(token["text"], token["line_index"], token["token_index"]) for token in grouped] == [
+        ("Invoice", 0, 0),
+        ("#1042", 0, 1),
+        ("Total", 1, 0),
+        ("VAT", 1, 1),
+        ("£24.60", 1, 2),
+        ("Due", 2, 0),
+    ]
+    assert grouped[2]["line_id"] == "line-1"
+    assert grouped[2]["bbox"] == (10.0, 52.0, 30.0, 10.0)
+
+
+def test_line_threshold_adapts_to_glyph_height():
+    tokens = [
+        _token("Grand", 10.0, 100.0, height=48.0),
+        _token("total", 90.0, 118.0, height=48.0),
+        _token("Paid", 10.0, 170.0, height=48.0),
+    ]
+
+    grouped = _group(tokens)
+
+    assert [(token["text"], token["line_index"]) for token in grouped] == [
+        ("Grand", 0),
+        ("total", 0),
+        ("Paid", 1),
+    ]
+
+
+def _legacy_lines(tokens: list[dict]) -> list[list[str]]:
+    lines: list[list[dict]] = []
+    current_y: float | None = None
+    for token in sorted(tokens, key=lambda t: (t["bbox"][1], t["bbox"][0])):
+        y = token["bbox"][1]
+        if current_y is None or abs(y - current_y) > 12.0:
+            lines.append([])
+            current_y = y
+        else:
+            current_y = (current_y + y) / 2
+        lines[-1].append(token)
+    return [[token["text"] for token in sorted(line, key=lambda t: t["bbox"][0])] for line in lines]
+
+
+@pytest.mark.parametrize(("pitch", "jitter"), [(14.0, 3.0), (16.0, 5.0)])
+def test_line_grouping_matches_legacy_on_tight_jittered_pages(pitch, jitter):
+    rng = random.Random(7)
+    tokens = [
+        _token(f"w{line}-{column}", column * 40.0 + rng.uniform(0, 5), line * pitch + rng.uniform(0, jitter))
+        for line in range(30)
+        for column in range(8)
+    ]
+    rng.shuffle(tokens)
+
+    grouped = _group(tokens)
+    lines: list[list[str]] = []
+    for token in grouped:
+        if token["token_index"] == 0:
+            lines.append([])
+        lines[-1].append(token["text"])
+
+    assert lines == _legacy_lines(tokens)
+    assert len(lines) > 1
+
+
+def test_from_polygons_computes_axis_aligned_boxes():
+    batch = TokenBatch.from_polygons(
+        [[[10, 20], [50, 22], [52, 40], [8, 38]]],
+        ["Total"],
+        [0.75],
+    )
+
+    assert batch.to_dicts() == [{"text": "Total", "confidence": 0.75, "bbox": (8.0, 20.0, 44.0, 20.0)}]
+    assert len(TokenBatch.from_polygons([], [], [])) == 0
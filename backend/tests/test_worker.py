@@ -0,0 +1,449 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import types
+import uuid
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+from prometheus_client import REGISTRY
+
+from app import worker
+from app.db.session import Base, engine, get_session
+from app.models.documents import AuditLog, Document, DocumentPage
+from app.schemas.documents import DocumentStatus
+from app.services.ocr import OcrResult
+from app.services.token_batch import TokenBatch
+from app.utils.metrics import OCR_WORKER_READY
+
+
+def _reset_db() -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def _create_document(page_statuses: list[str], status: str = DocumentStatus.processing.value) -> tuple[str, list[str]]:
+    document_id = uuid.uuid4().hex
+    page_ids: list[str] = []
+    with get_session() as session:
+        session.add(
+            Document(
+                id=document_id,
+                image_path="/tmp/sample.png",
+                image_width=0,
+                image_height=0,
+                status=status,
+                processing_task_id="task-1",
+                structured_fields=json.dumps({}),
+                page_count=len(page_statuses),
+            )
+        )
+        for index, page_status in enumerate(page_statuses):
+            page_id = uuid.uuid4().hex
+            page_ids.append(page_id)
+            session.add(
+                DocumentPage(
+                    id=page_id,
+                    document_id=document_id,
+                    page_index=index,
+                    image_path=f"/tmp/sample-{index}.png",
+                    image_width=0,
+                    image_height=0,
+                    status=page_status,
+                    processing_task_id=f"page-task-{index}",
+                )
+            )
+        session.commit()
+    return document_id, page_ids
+
+
+def test_finalize_marks_document_done_when_all_pages_done():
+    _reset_db()
+    document_id, _page_ids = _create_document([DocumentStatus.ocr_done.value] * 3)
+
+    assert worker.finalize_document(document_id) == {"status": "completed"}
+
+    with get_session() as session:
+        document = session.get(Document, document_id)
+        assert document.status == DocumentStatus.ocr_done.value
+        assert document.processing_task_id is None
+
+
+def test_finalize_waits_for_pending_pages():
+    _reset_db()
+    document_id, _page_ids = _create_document(
+        [DocumentStatus.ocr_done.value, DocumentStatus.processing.value]
+    )
+
+    assert worker.finalize_document(document_id) == {"status": "incomplete"}
+
+    with get_session() as session:
+        assert session.get(Document, document_id).status == DocumentStatus.processing.value
+
+
+def test_process_page_marks_page_and_document_failed(monkeypatch):
+    _reset_db()
+    document_id, page_ids = _create_document([DocumentStatus.processing.value] * 2)
+
+    def failing_ocr(*args, **kwargs):
+        raise RuntimeError("ocr_failed")
+
+    monkeypatch.setattr(worker, "run_ocr_for_page", failing_ocr)
+
+    with pytest.raises(RuntimeError):
+        worker.process_page(document_id, page_ids[0])
+
+    with get_session() as session:
+        assert session.get(Document, document_id).status == DocumentStatus.failed.value
+        assert session.get(DocumentPage, page_ids[0]).status == DocumentStatus.failed.value
+        assert session.get(DocumentPage, page_ids[1]).status == DocumentStatus.processing.value
+        events = session.query(AuditLog).filter(AuditLog.document_id == document_id).all()
+        assert [event.page_id for event in events] == [page_ids[0]]
+
+
+def test_process_page_skips_canceled_page(monkeypatch):
+    _reset_db()
+    document_id, page_ids = _create_document([DocumentStatus.canceled.value], DocumentStatus.canceled.value)
+    calls: list[str] = []
+    monkeypatch.setattr(worker, "run_ocr_for_page", lambda *args, **kwargs: calls.append("ocr"))
+
+    assert worker.process_page(document_id, page_ids[0]) == {"status": "canceled"}
+    assert calls == []
+
+
+def test_process_page_clears_task_id_on_success(monkeypatch):
+    _reset_db()
+    document_id, page_ids = _create_document([DocumentStatus.processing.value])
+
+    def fake_ocr(document_id: str, page_id: str, image_path: str, image_url: str, **kwargs) -> OcrResult:
+        return OcrResult(
+            document_id=document_id,
+            page_id=page_id,
+            image_url=image_url,
+            tokens=TokenBatch.empty(),
+            status=DocumentStatus.ocr_done,
+            image_width=10,
+            image_height=10,
+        )
+
+    monkeypatch.setattr(worker, "run_ocr_for_page", fake_ocr)
+
+    assert worker.process_page(document_id, page_ids[0]) == {"status": "completed"}
+    with get_session() as session:
+        assert session.get(DocumentPage, page_ids[0]).processing_task_id is None
+
+
+def _create_upload(tmp_path, extension: str = ".png") -> tuple[str, str]:
+    document_id = uuid.uuid4().hex
+    source_path = str(tmp_path / f"{document_id}{extension}")
+    if extension == ".png":
+        Image.new("RGB", (30, 20), "white").save(source_path, "PNG")
+    else:
+        with open(source_path, "wb") as handle:
+            handle.write(b"%PDF-1.4")
+    with get_session() as session:
+        session.add(
+            Document(
+                id=document_id,
+                image_path=source_path,
+                image_width=0,
+                image_height=0,
+                status=DocumentStatus.uploaded.value,
+                processing_task_id="task-1",
+                structured_fields=json.dumps({}),
+                page_count=0,
+            )
+        )
+        session.commit()
+    return document_id, source_path
+
+
+def test_process_document_splits_pages_before_dispatch(tmp_path, monkeypatch):
+    _reset_db()
+    document_id, source_path = _create_upload(tmp_path)
+    dispatched: list[tuple] = []
+    monkeypatch.setattr(worker, "_dispatch_page", lambda *args: dispatched.append(args))
+
+    assert worker.process_document(document_id) == {"status": "dispatched"}
+
+    with get_session() as session:
+        page = session.query(DocumentPage).filter(DocumentPage.document_id == document_id).one()
+        assert (page.image_path, page.image_width, page.image_height) == (source_path, 30, 20)
+        assert dispatched == [(document_id, page.id, page.processing_task_id, 0)]
+        assert session.get(Document, document_id).page_count == 1
+
+
+def test_process_document_rejects_failed_virus_scan(tmp_path, monkeypatch):
+    _reset_db()
+    document_id, source_path = _create_upload(tmp_path)
+    monkeypatch.setenv("VIRUS_SCAN_COMMAND", "false")
+
+    assert worker.process_document(document_id) == {"status": "rejected"}
+
+    assert not os.path.exists(source_path)
+    with get_session() as session:
+        assert session.get(Document, document_id).status == DocumentStatus.failed.value
+
+
+def _first_page_count() -> float:
+    return REGISTRY.get_sample_value("vera_first_page_reviewable_seconds_count") or 0.0
+
+
+def test_process_document_dispatches_each_page_as_it_is_rendered(tmp_path, monkeypatch):
+    _reset_db()
+    document_id, _source_path = _create_upload(tmp_path, ".pdf")
+    monkeypatch.setenv("OCR_INLINE_FIRST_PAGE", "0")
+    events: list[tuple] = []
+    fake_pdf2image = types.ModuleType("pdf2image")
+    fake_pdf2image.pdfinfo_from_path = lambda *args, **kwargs: {"Pages": 3}
+
+    def convert_from_path(path, first_page, last_page, **kwargs):
+        events.append(("render", first_page - 1))
+        return [Image.new("RGB", (40, 30), "white") for _ in range(first_page, last_page + 1)]
+
+    fake_pdf2image.convert_from_path = convert_from_path
+    monkeypatch.setattr(
+        worker,
+        "_dispatch_page",
+        lambda document_id, page_id, task_id, page_index: events.append(
+            ("dispatch", page_index, worker._page_priority(page_index))
+        ),
+    )
+    with patch.dict(sys.modules, {"pdf2image": fake_pdf2image}):
+        assert worker.process_document(document_id) == {"status": "dispatched"}
+
+    assert events == [
+        ("render", 0),
+        ("dispatch", 0, 0),
+        ("render", 1),
+        ("dispatch", 1, 6),
+        ("render", 2),
+        ("dispatch", 2, 6),
+    ]
+    with get_session() as session:
+        assert session.get(Document, document_id).page_count == 3
+
+
+def test_process_document_resumes_a_partial_split(tmp_path, monkeypatch):
+    _reset_db()
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("OCR_INLINE_FIRST_PAGE", "0")
+    document_id, _source_path = _create_upload(tmp_path, ".pdf")
+    first_page_path = str(tmp_path / f"{document_id}-page-0.png")
+    with get_session() as session:
+        session.add(
+            DocumentPage(
+                id=uuid.uuid4().hex,
+                document_id=document_id,
+                page_index=0,
+                image_path=first_page_path,
+                image_width=40,
+                image_height=30,
+                status=DocumentStatus.processing.value,
+            )
+        )
+        session.execute(
+            Document.__table__.update()
+            .where(Document.id == document_id)
+            .values(page_count=3, image_path=first_page_path)
+        )
+        session.commit()
+    rendered: list[int] = []
+    fake_pdf2image = types.ModuleType("pdf2image")
+    fake_pdf2image.pdfinfo_from_path = lambda *args, **kwargs: {"Pages": 3}
+
+    def convert_from_path(path, first_page, last_page, **kwargs):
+        rendered.extend(range(first_page - 1, last_page))
+        return [Image.new("RGB", (40, 30), "white") for _ in range(first_page, last_page + 1)]
+
+    fake_pdf2image.convert_from_path = convert_from_path
+    dispatched: list[tuple] = []
+    monkeypatch.setattr(worker, "_dispatch_page", lambda *args: dispatched.append(args))
+    with patch.dict(sys.modules, {"pdf2image": fake_pdf2image}):
+        assert worker.process_document(document_id) == {"status": "dispatched"}
+
+    assert rendered == [1, 2]
+    assert [args[3] for args in dispatched] == [0, 1, 2]
+    with get_session() as session:
+        page_indices = session.query(DocumentPage.page_index).filter(DocumentPage.document_id == document_id).all()
+        assert sorted(index for (index,) in page_indices) == [0, 1, 2]
+
+
+def test_process_document_retry_keeps_finished_pages(monkeypatch):
+    _reset_db()
+    document_id, page_ids = _create_document([DocumentStatus.ocr_done.value, DocumentStatus.failed.value])
+    dispatched: list[tuple] = []
+    monkeypatch.setattr(worker, "_dispatch_page", lambda *args: dispatched.append(args))
+
+    assert worker.process_document(document_id) == {"status": "dispatched"}
+
+    assert [(args[1], args[3]) for args in dispatched] == [(page_ids[1], 1)]
+    with get_session() as session:
+        assert session.get(DocumentPage, page_ids[0]).status == DocumentStatus.ocr_done.value
+        assert session.get(DocumentPage, page_ids[1]).status == DocumentStatus.processing.value
+
+
+def test_process_page_finalizes_document_after_last_page(monkeypatch):
+    _reset_db()
+    document_id, page_ids = _create_document([DocumentStatus.ocr_done.value, DocumentStatus.processing.value])
+
+    def fake_ocr(document_id: str, page_id: str, image_path: str, image_url: str, **kwargs) -> OcrResult:
+        with get_session() as session:
+            session.execute(
+                DocumentPage.__table__.update()
+                .where(DocumentPage.id == page_id)
+                .values(status=DocumentStatus.ocr_done.value)
+            )
+            session.commit()
+        return OcrResult(
+            document_id=document_id,
+            page_id=page_id,
+            image_url=image_url,
+            tokens=TokenBatch.empty(),
+            status=DocumentStatus.ocr_done,
+            image_width=10,
+            image_height=10,
+        )
+
+    monkeypatch.setattr(worker, "run_ocr_for_page", fake_ocr)
+
+    assert worker.process_page(document_id, page_ids[1]) == {"status": "completed"}
+    with get_session() as session:
+        assert session.get(Document, document_id).status == DocumentStatus.ocr_done.value
+
+
+def test_finalize_waits_for_pages_not_yet_rendered():
+    _reset_db()
+    document_id, _page_ids = _create_document([DocumentStatus.ocr_done.value])
+    with get_session() as session:
+        session.execute(Document.__table__.update().where(Document.id == document_id).values(page_count=3))
+        session.commit()
+
+    assert worker.finalize_document(document_id) == {"status": "incomplete"}
+
+
+def test_process_document_runs_first_pdf_page_from_raster_pixels(tmp_path, monkeypatch):
+    _reset_db()
+    document_id, source_path = _create_upload(tmp_path, ".pdf")
+    monkeypatch.setenv("OCR_INLINE_FIRST_PAGE", "1")
+    fake_pdf2image = types.ModuleType("pdf2image")
+    fake_pdf2image.pdfinfo_from_path = lambda *args, **kwargs: {"Pages": 2}
+    fake_pdf2image.convert_from_path = lambda path, first_page, last_page, **kwargs: [
+        Image.new("RGB", (40, 30), "white") for _ in range(first_page, last_page + 1)
+    ]
+    ocr_calls: list[dict] = []
+
+    def fake_ocr(document_id: str, page_id: str, image_path: str, image_url: str, **kwargs) -> OcrResult:
+        ocr_calls.append(kwargs)
+        with get_session() as session:
+            session.execute(
+                DocumentPage.__table__.update()
+                .where(DocumentPage.id == page_id)
+                .values(status=DocumentStatus.ocr_done.value)
+            )
+            session.commit()
+        return OcrResult(
+            document_id=document_id,
+            page_id=page_id,
+            image_url=image_url,
+            tokens=TokenBatch.empty(),
+            status=DocumentStatus.ocr_done,
+            image_width=40,
+            image_height=30,
+        )
+
+    dispatched: list[tuple] = []
+    monkeypatch.setattr(worker, "run_ocr_for_page", fake_ocr)
+    monkeypatch.setattr(worker, "_dispatch_page", lambda *args: dispatched.append(args))
+    reviewable_before = _first_page_count()
+    with patch.dict(sys.modules, {"pdf2image": fake_pdf2image}):
+        assert worker.process_document(document_id) == {"status": "dispatched"}
+
+    assert len(ocr_calls) == 1
+    assert ocr_calls[0]["pixels"].shape == (30, 40, 3)
+    assert ocr_calls[0]["image_size"] == (40, 30)
+    assert [args[3] for args in dispatched] == [1]
+    assert _first_page_count() == reviewable_before + 1
+    with get_session() as session:
+        pages = (
+            session.query(DocumentPage)
+            .filter(DocumentPage.document_id == document_id)
+            .order_by(DocumentPage.page_index)
+            .all()
+        )
+        assert [page.status for page in pages] == [DocumentStatus.ocr_done.value, DocumentStatus.processing.value]
+        assert all(os.path.exists(page.image_path) for page in pages)
+
+
+def test_process_document_fails_when_inline_first_page_ocr_fails(tmp_path, monkeypatch):
+    _reset_db()
+    document_id, _source_path = _create_upload(tmp_path, ".pdf")
+    monkeypatch.setenv("OCR_INLINE_FIRST_PAGE", "1")
+    fake_pdf2image = types.ModuleType("pdf2image")
+    fake_pdf2image.pdfinfo_from_path = lambda *args, **kwargs: {"Pages": 2}
+    fake_pdf2image.convert_from_path = lambda path, first_page, last_page, **kwargs: [
+        Image.new("RGB", (40, 30), "white") for _ in range(first_page, last_page + 1)
+    ]
+
+    def failing_ocr(*args, **kwargs):
+        raise RuntimeError("ocr_failed")
+
+    dispatched: list[tuple] = []
+    monkeypatch.setattr(worker, "run_ocr_for_page", failing_ocr)
+    monkeypatch.setattr(worker, "_dispatch_page", lambda *args: dispatched.append(args))
+    with patch.dict(sys.modules, {"pdf2image": fake_pdf2image}):
+        with pytest.raises(RuntimeError):
+            worker.process_document(document_id)
+
+    assert dispatched == []
+    with get_session() as session:
+        page = session.query(DocumentPage).filter(DocumentPage.document_id == document_id).one()
+        assert page.status == DocumentStatus.failed.value
+        assert os.path.exists(page.image_path)
+        assert session.get(Document, document_id).status == DocumentStatus.failed.value
+
+
+def _warmup_count() -> float:
+    return REGISTRY.get_sample_value("vera_ocr_engine_warmup_duration_seconds_count") or 0.0
+
+
+def test_warm_ocr_engines_reports_readiness(tmp_path, monkeypatch):
+    ready_file = tmp_path / "worker-ready"
+    ready_file.write_text("stale\n")
+    monkeypatch.setenv("WORKER_READY_FILE", str(ready_file))
+    monkeypatch.setenv("DB_AUTO_CREATE", "0")
+    warmed: list[bool] = []
+
+    def fake_warm() -> int:
+        assert OCR_WORKER_READY._value.get() == 0
+        warmed.append(True)
+        return 1
+
+    monkeypatch.setattr(worker, "warm_engine_pool", fake_warm)
+    warmup_count = _warmup_count()
+    worker._bootstrap_schema()
+    assert not ready_file.exists()
+
+    worker._warm_ocr_engines()
+
+    assert warmed == [True]
+    assert OCR_WORKER_READY._value.get() == 1
+    assert _warmup_count() == warmup_count + 1
+    assert ready_file.read_text() == f"{os.getpid()}\n"
+
+
+def test_thread_pool_workers_warm_engines_when_ready(monkeypatch):
+    from celery.concurrency.prefork import TaskPool as PreforkPool
+    from celery.concurrency.thread import TaskPool as ThreadPool
+
+    warmed: list[str] = []
+    monkeypatch.setattr(worker, "_warm_ocr_engines", lambda **kwargs: warmed.append("warm"))
+
+    worker._warm_in_process_pool(sender=types.SimpleNamespace(pool=PreforkPool.__new__(PreforkPool)))
+    assert warmed == []
+
+    worker._warm_in_process_pool(sender=types.SimpleNamespace(pool=ThreadPool.__new__(ThreadPool)))
+    assert warmed == ["warm"]
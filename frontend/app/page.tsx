@@ -55,6 +55,7 @@ type PagePayload = {
 type PageStatusPayload = {
   page_id: string;
   page_index: number;
+  image_url?: string;
   status: string;
   review_complete: boolean;
   token_count: number;
@@ -162,7 +163,8 @@ export default function HomePage() {
   const [documentSummaryLoading, setDocumentSummaryLoading] = useState(false);
   const [statusStreamActive, setStatusStreamActive] = useState(false);
   const isProcessing = documentData
-    ? documentData.pages.some((page) => ["uploaded", "processing"].includes(page.status))
+    ? ["uploaded", "processing"].includes(documentData.status) ||
+      documentData.pages.some((page) => ["uploaded", "processing"].includes(page.status))
     : false;
   const processingActive = isProcessing && pollingEnabled;
   const interactionDisabled = loading || processingActive;
@@ -354,11 +356,26 @@ export default function HomePage() {
           version: update.version ?? page.version,
         };
       });
+      const knownPageIds = new Set(prev.pages.map((page) => page.page_id));
+      const addedPages = statusData.pages
+        .filter((page) => !knownPageIds.has(page.page_id) && page.image_url)
+        .map((page) => ({
+          page_id: page.page_id,
+          page_index: page.page_index,
+          image_url: `${apiBase}${page.image_url}`,
+          status: page.status,
+          review_complete: page.review_complete,
+          version: page.version,
+        }));
+      const mergedPages = addedPages.length
+        ? [...nextPages, ...addedPages].sort((left, right) => left.page_index - right.page_index)
+        : nextPages;
       return {
         ...prev,
         status: statusData.status ?? prev.status,
         review_complete: statusData.review_complete ?? prev.review_complete,
-        pages: nextPages,
+        page_count: Math.max(prev.page_count, mergedPages.length),
+        pages: mergedPages,
       };
     });
 